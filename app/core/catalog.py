@@ -0,0 +1,143 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+from app.core.db import connect
+from app.core.schema import ensure_schema
+from app.core.versions import bump_version
+
+# Colunas listadas pelas rotas */options de cada dataset
+CATALOG_COLUMNS = {
+    "producao": ("Category", "Product"),
+    "processamento": ("GroupName", "Product", "Cultive"),
+    "comercializacao": ("GroupName", "Product"),
+    "importacao": ("Country",),
+    "exportacao": ("Country", "Product"),
+}
+
+# Catálogos já carregados neste worker: {dataset: {"version": ..., "columns": {...}}}
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def distinct_values(conn: sqlite3.Connection, dataset: str) -> dict:
+    """
+    Lê os valores distintos das colunas do catálogo, em ordem alfabética (a ordem dos índices de cada coluna).
+    """
+    columns = {}
+    for column in CATALOG_COLUMNS[dataset]:
+        rows = conn.execute(f"SELECT DISTINCT {column} FROM {dataset} ORDER BY {column}").fetchall()
+        columns[column] = [row[0] for row in rows]
+    return columns
+
+
+def catalog_version(columns: dict) -> str:
+    """
+    Versão do catálogo: hash do conteúdo, igual em todos os workers enquanto os dados não mudam.
+    """
+    payload = json.dumps(columns, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def rebuild_catalog(conn: sqlite3.Connection, dataset: str) -> str:
+    """
+    Reconstrói o catálogo de opções de um dataset a partir da sua tabela.
+
+    Parâmetros:
+        conn (sqlite3.Connection): Conexão de escrita com o vitibrasil.db.
+        dataset (str): Nome do dataset.
+
+    Retorna:
+        str: Nova versão do catálogo.
+    """
+    columns = distinct_values(conn, dataset)
+    version = catalog_version(columns)
+    conn.execute("DELETE FROM options_catalog WHERE dataset = ?", (dataset,))
+    conn.executemany(
+        "INSERT INTO options_catalog (dataset, column_name, position, value) VALUES (?, ?, ?, ?)",
+        [(dataset, column, position, value) for column, values in columns.items() for position, value in enumerate(values)],
+    )
+    built_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    conn.execute(
+        '''
+        INSERT INTO catalog_version (dataset, version, built_at) VALUES (?, ?, ?)
+        ON CONFLICT (dataset) DO UPDATE SET version = excluded.version, built_at = excluded.built_at
+        ''',
+        (dataset, version, built_at),
+    )
+    return version
+
+
+def rebuild_catalogs(datasets: list = None) -> None:
+    """
+    Reconstrói o catálogo dos datasets informados e incrementa a versão dos seus dados.
+    Chamada ao final de cada coleta que grava dados no banco.
+    """
+    with connect("vitibrasil.db") as conn:
+        ensure_schema(conn, ["options_catalog", "catalog_version", "dataset_version"])
+        for dataset in datasets or CATALOG_COLUMNS:
+            try:
+                rebuild_catalog(conn, dataset)
+            except sqlite3.OperationalError:
+                # tabela do dataset ainda não existe
+                continue
+            bump_version(conn, dataset)
+
+
+def get_catalog(dataset: str) -> dict:
+    """
+    Retorna o catálogo de opções de um dataset.
+
+    A cada chamada apenas a versão é consultada (busca pela chave primária); as opções
+    ficam em memória e só são relidas do banco quando a versão muda.
+
+    Parâmetros:
+        dataset (str): Nome do dataset.
+
+    Retorna:
+        dict: {"version": str, "columns": {coluna: [valores]}}
+    """
+    with connect("vitibrasil.db", readonly=True) as conn:
+        version = _stored_version(conn, dataset)
+        cached = _catalogs.get(dataset)
+        if cached and version is not None and cached["version"] == version:
+            return cached
+
+        if version is None:
+            # banco anterior ao catálogo: calcula a partir da tabela, sem guardar em memória
+            columns = distinct_values(conn, dataset)
+            return {"version": catalog_version(columns), "columns": columns}
+
+        columns = {column: [] for column in CATALOG_COLUMNS[dataset]}
+        rows = conn.execute(
+            "SELECT column_name, value FROM options_catalog WHERE dataset = ? ORDER BY column_name, position",
+            (dataset,),
+        ).fetchall()
+    for column, value in rows:
+        columns[column].append(value)
+
+    catalog = {"version": version, "columns": columns}
+    with _catalogs_lock:
+        _catalogs[dataset] = catalog
+    return catalog
+
+
+def catalog_markers(conn: sqlite3.Connection) -> dict:
+    """
+    Marca de ingestão de cada dataset: a versão e o horário do último catálogo reconstruído.
+    Muda a cada coleta que grava dados, já que todas terminam em rebuild_catalogs.
+    """
+    try:
+        return {row[0]: (row[1], row[2]) for row in conn.execute("SELECT dataset, version, built_at FROM catalog_version")}
+    except sqlite3.OperationalError:
+        return {}
+
+
+def _stored_version(conn: sqlite3.Connection, dataset: str) -> Optional[str]:
+    try:
+        row = conn.execute("SELECT version FROM catalog_version WHERE dataset = ?", (dataset,)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
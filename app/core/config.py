@@ -0,0 +1,64 @@
+import os
+
+# Cache das páginas coletadas do Vitibrasil (app/services/cache.py)
+SCRAPER_CACHE_MAXSIZE = int(os.getenv("SCRAPER_CACHE_MAXSIZE", "512"))
+SCRAPER_CACHE_TTL = float(os.getenv("SCRAPER_CACHE_TTL", "3600"))
+SCRAPER_CACHE_STALE_TTL = float(os.getenv("SCRAPER_CACHE_STALE_TTL", "86400"))
+
+# Cliente HTTP usado para acessar o Vitibrasil (app/services/http_client.py)
+# Pode apontar para o servidor local de benchmarks/mock_vitibrasil.py (ex.: http://127.0.0.1:8081/index.php)
+VITIBRASIL_URL = os.getenv("VITIBRASIL_URL", "http://vitibrasil.cnpuv.embrapa.br/index.php")
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+
+# Crawler de carga completa do banco (app/services/crawler.py)
+CRAWLER_CONCURRENCY = int(os.getenv("CRAWLER_CONCURRENCY", "8"))
+CRAWLER_RATE_LIMIT = float(os.getenv("CRAWLER_RATE_LIMIT", "4"))
+CRAWLER_RETRIES = int(os.getenv("CRAWLER_RETRIES", "3"))
+CRAWLER_BACKOFF = float(os.getenv("CRAWLER_BACKOFF", "1"))
+
+# Modo de atendimento das rotas de dados: "db" (vitibrasil.db, atualizado em segundo plano) ou "live" (scraping a cada requisição)
+SERVING_MODE = os.getenv("SERVING_MODE", "db")
+# Intervalo, em segundos, da atualização incremental do banco em segundo plano (0 desativa)
+REFRESH_INTERVAL = float(os.getenv("REFRESH_INTERVAL", "86400"))
+
+# Pool de conexões SQLite (app/core/db.py)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_CACHED_STATEMENTS = int(os.getenv("DB_CACHED_STATEMENTS", "256"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+
+# Tempo, em segundos, que os clientes podem manter em cache as respostas das rotas */options
+OPTIONS_CACHE_MAX_AGE = int(os.getenv("OPTIONS_CACHE_MAX_AGE", "300"))
+
+# Paginação das rotas de dados: limite padrão de linhas por página (0 = resposta completa, sem paginar)
+# e maior valor aceito no parâmetro limit
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "0"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "5000"))
+
+# Linhas lidas do banco por bloco nas rotas */export
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "2000"))
+
+# Snapshots Parquet das tabelas, gravados após cada ingestão (app/services/snapshots.py)
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_COMPRESSION = os.getenv("SNAPSHOT_COMPRESSION", "zstd")
+
+# Cache das respostas serializadas (e comprimidas) das rotas de dados, em bytes (0 desativa)
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Tokens JWT já verificados mantidos em memória (app/util/auth.py), 0 desativa
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", "10000"))
+# Intervalo, em segundos, entre os registros no log dos acertos e falhas dos caches em memória (0 desativa)
+CACHE_STATS_INTERVAL = float(os.getenv("CACHE_STATS_INTERVAL", "300"))
+
+# Custo do bcrypt nas senhas novas (2^rounds iterações; cada +1 dobra o tempo do signup e do login)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads que calculam e verificam os hashes bcrypt fora do event loop (app/util/auth.py)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Motor das consultas das rotas de dados: "sqlite" (vitibrasil.db) ou "memory" (tabelas em arrays numpy, app/services/memory_engine.py)
+QUERY_ENGINE = os.getenv("QUERY_ENGINE", "sqlite")
+# Intervalo, em segundos, entre as verificações de ingestões feitas por outros processos (motor em memória)
+MEMORY_ENGINE_CHECK_INTERVAL = float(os.getenv("MEMORY_ENGINE_CHECK_INTERVAL", "5"))
@@ -20,6 +20,10 @@ async def init_db():
         logging.info("Banco de dados criado com sucesso.")
     else:
         logging.info("Banco de dados já existe.")
+
+    # import local: permite executar "python -m app.core.migrations" sem importar o módulo duas vezes
+    from app.core.migrations import migrate
+    migrate()
         
     if not os.path.exists("users.db"):
         logging.info("Banco de dados não encontrado. Criando...")
@@ -0,0 +1,121 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+from app.core import config
+
+
+class ConnectionPool:
+    """
+    Pool de conexões SQLite de um worker.
+
+    As conexões são abertas uma vez, configuradas com os PRAGMAs de desempenho e
+    reaproveitadas entre requisições, mantendo o cache de statements preparados
+    (cached_statements) e o cache de páginas de cada conexão.
+    """
+
+    def __init__(self, path: str, readonly: bool = False, size: int = config.DB_POOL_SIZE):
+        self.path = path
+        self.readonly = readonly
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _open(self) -> sqlite3.Connection:
+        if self.readonly:
+            conn = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True,
+                check_same_thread=False, cached_statements=config.DB_CACHED_STATEMENTS,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.path,
+                check_same_thread=False, cached_statements=config.DB_CACHED_STATEMENTS,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={config.DB_BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: str, readonly: bool = False) -> ConnectionPool:
+    """
+    Retorna o pool do banco informado. Os pools são recriados após um fork (cada worker tem os seus).
+    """
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        key = (path, readonly)
+        if key not in _pools:
+            _pools[key] = ConnectionPool(path, readonly)
+        return _pools[key]
+
+
+@contextmanager
+def connect(path: str = "vitibrasil.db", readonly: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    Empresta uma conexão do pool do banco informado.
+
+    Conexões de escrita fazem commit ao final do bloco, ou rollback em caso de erro.
+    Conexões somente leitura (readonly=True) são abertas com mode=ro.
+
+    Parâmetros:
+        path (str): Caminho do banco de dados.
+        readonly (bool): Se a conexão é somente leitura.
+
+    Retorna:
+        sqlite3.Connection: Conexão do pool, devolvida ao final do bloco with.
+    """
+    pool = get_pool(path, readonly)
+    conn = pool.acquire()
+    try:
+        yield conn
+        if conn.in_transaction:
+            conn.commit()
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        pool.release(conn)
+
+
+def close_pools() -> None:
+    """
+    Fecha todas as conexões em pool. Chamado no desligamento da aplicação e antes de migrações.
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
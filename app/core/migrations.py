@@ -0,0 +1,159 @@
+import fcntl
+import logging
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator
+from app.core.catalog import CATALOG_COLUMNS, rebuild_catalog
+from app.core.logging_config import logging_config
+from app.core.schema import NUMERIC_COLUMNS, TABLES, ensure_schema
+from app.core.versions import seed_versions
+
+# Converte em SQL o texto no formato do site ("217.208.604", "-" = 0, "nd"/"*" = NULL) para INTEGER
+BR_NUMBER_TO_INTEGER = '''
+    CASE
+        WHEN TRIM({col}) = '-' THEN 0
+        WHEN TRIM({col}) = '' OR TRIM({col}) GLOB '*[^0-9.]*' THEN NULL
+        ELSE CAST(REPLACE(TRIM({col}), '.', '') AS INTEGER)
+    END
+'''
+
+
+def column_types(conn: sqlite3.Connection, table: str) -> dict:
+    """
+    Retorna {coluna: tipo declarado} de uma tabela.
+    """
+    return {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+@contextmanager
+def immediate_transaction(conn: sqlite3.Connection) -> Iterator[None]:
+    """
+    Transação explícita em uma conexão em modo autocommit (isolation_level=None).
+
+    O módulo sqlite3 faz commit implícito antes de ALTER TABLE e CREATE TABLE quando controla as
+    transações sozinho. Aqui todos os comandos do bloco são confirmados ou desfeitos juntos, e o
+    BEGIN IMMEDIATE reserva a escrita no banco já no início.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def restore_interrupted(conn: sqlite3.Connection, table: str) -> None:
+    """
+    Desfaz uma conversão interrompida por versões anteriores desta migração, que não eram atômicas:
+    as linhas ficaram em <tabela>_text e a tabela nova, vazia ou incompleta. A tabela original volta
+    ao lugar para ser convertida de novo.
+    """
+    if not table_exists(conn, f"{table}_text"):
+        return
+    logging.warning(f"Conversão interrompida da tabela '{table}' encontrada; restaurando {table}_text")
+    with immediate_transaction(conn):
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"ALTER TABLE {table}_text RENAME TO {table}")
+
+
+def add_missing_columns(conn: sqlite3.Connection) -> None:
+    """
+    Acrescenta as colunas criadas depois da primeira versão das tabelas auxiliares.
+    """
+    if "row_count" not in column_types(conn, "sync_state"):
+        # linhas da página na última coleta; 0 marca páginas que o site mostra com a tabela vazia
+        conn.execute("ALTER TABLE sync_state ADD COLUMN row_count INTEGER")
+
+
+def count_indexes(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index'").fetchone()[0]
+
+
+def migrate_numeric_columns(conn: sqlite3.Connection, table: str) -> bool:
+    """
+    Converte as colunas numéricas de uma tabela de TEXT para INTEGER, reescrevendo a tabela em uma
+    única transação: se algo falhar, a tabela original fica intacta.
+
+    Parâmetros:
+        conn (sqlite3.Connection): Conexão com o vitibrasil.db, em modo autocommit (isolation_level=None).
+        table (str): Nome da tabela.
+
+    Retorna:
+        bool: True se a tabela foi convertida, False se já estava convertida ou não existe.
+    """
+    restore_interrupted(conn, table)
+    types = column_types(conn, table)
+    if not types or all(types.get(col) == "INTEGER" for col in NUMERIC_COLUMNS[table] if col in types):
+        return False
+
+    columns = list(types)
+    select = ", ".join(
+        BR_NUMBER_TO_INTEGER.format(col=col) if col in NUMERIC_COLUMNS[table] else col
+        for col in columns
+    )
+    logging.info(f"Convertendo colunas numéricas da tabela '{table}'")
+    with immediate_transaction(conn):
+        conn.execute(f"ALTER TABLE {table} RENAME TO {table}_text")
+        conn.execute(TABLES[table])
+        conn.execute(f"INSERT INTO {table} ({', '.join(columns)}) SELECT {select} FROM {table}_text")
+        conn.execute(f"DROP TABLE {table}_text")
+    return True
+
+
+def migrate(db_path: str = "vitibrasil.db") -> None:
+    """
+    Aplica as migrações pendentes no banco de dados e cria tabelas e índices que
+    ainda não existem, além do catálogo de opções de cada dataset. Pode ser executada várias vezes.
+
+    Um arquivo de lock (<banco>.migrate.lock) faz com que apenas um processo migre por vez: os
+    workers do gunicorn que iniciam juntos esperam o primeiro terminar e encontram o banco migrado.
+
+    Parâmetros:
+        db_path (str): Caminho do banco de dados.
+
+    Retorna:
+        None
+    """
+    with open(f"{db_path}.migrate.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            _migrate(db_path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _migrate(db_path: str) -> None:
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        converted = [table for table in NUMERIC_COLUMNS if migrate_numeric_columns(conn, table)]
+        if converted:
+            conn.execute("VACUUM")
+            logging.info(f"Tabelas convertidas: {', '.join(converted)}")
+        indexes_before = count_indexes(conn)
+        with immediate_transaction(conn):
+            ensure_schema(conn)
+            add_missing_columns(conn)
+            built = {row[0] for row in conn.execute("SELECT dataset FROM catalog_version")}
+            for dataset in CATALOG_COLUMNS:
+                if dataset not in built:
+                    rebuild_catalog(conn, dataset)
+            seed_versions(conn, list(CATALOG_COLUMNS))
+        if converted or count_indexes(conn) != indexes_before:
+            # atualiza as estatísticas usadas pelo planejador de consultas para escolher os índices
+            conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    """
+        Para migrar o banco de dados existente, execute no terminal:
+        python -m app.core.migrations
+    """
+    logging_config()
+    migrate()
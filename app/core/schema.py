@@ -0,0 +1,141 @@
+import sqlite3
+
+# Colunas numéricas de cada tabela. No site vêm no formato brasileiro ("217.208.604", "-" para zero)
+NUMERIC_COLUMNS = {
+    "producao": ["Quantity_L"],
+    "processamento": ["Quantity_Kg"],
+    "comercializacao": ["Quantity_L"],
+    "importacao": ["Quantity_Kg", "Value_USD"],
+    "exportacao": ["Quantity_Kg", "Value_USD"],
+}
+
+# Colunas retornadas pelas rotas de dados, na ordem da resposta
+DATASET_COLUMNS = {
+    "producao": ("Year", "Category", "Product", "Quantity_L"),
+    "processamento": ("Year", "GroupName", "Cultive", "Quantity_Kg", "Product"),
+    "comercializacao": ("Year", "GroupName", "Product", "Quantity_L"),
+    "importacao": ("Year", "Country", "Quantity_Kg", "Value_USD", "Product"),
+    "exportacao": ("Year", "Country", "Quantity_Kg", "Value_USD", "Product"),
+}
+
+TABLES = {
+    "producao": '''
+        CREATE TABLE IF NOT EXISTS producao (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            Year INTEGER,
+            Category TEXT,
+            Product TEXT,
+            Quantity_L INTEGER
+        )
+    ''',
+    "processamento": '''
+        CREATE TABLE IF NOT EXISTS processamento (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            Year INTEGER,
+            GroupName TEXT,
+            Cultive TEXT,
+            Quantity_Kg INTEGER,
+            Product TEXT
+        )
+    ''',
+    "comercializacao": '''
+        CREATE TABLE IF NOT EXISTS comercializacao (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            Year INTEGER,
+            GroupName TEXT,
+            Product TEXT,
+            Quantity_L INTEGER
+        )
+    ''',
+    "importacao": '''
+        CREATE TABLE IF NOT EXISTS importacao (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            Year INTEGER,
+            Country TEXT,
+            Quantity_Kg INTEGER,
+            Value_USD INTEGER,
+            Product TEXT
+        )
+    ''',
+    "exportacao": '''
+        CREATE TABLE IF NOT EXISTS exportacao (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            Year INTEGER,
+            Country TEXT,
+            Quantity_Kg INTEGER,
+            Value_USD INTEGER,
+            Product TEXT
+        )
+    ''',
+    # Estado de cada página coletada, usado pela sincronização incremental (option = 0 quando a aba não tem sub-opção)
+    "sync_state": '''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            dataset TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            option INTEGER NOT NULL,
+            content_hash TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            checked_at TEXT,
+            changed_at TEXT,
+            row_count INTEGER,
+            PRIMARY KEY (dataset, year, option)
+        )
+    ''',
+    # Catálogo das opções listadas pelas rotas */options, reconstruído ao final de cada coleta (app/core/catalog.py)
+    "options_catalog": '''
+        CREATE TABLE IF NOT EXISTS options_catalog (
+            dataset TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            value TEXT,
+            PRIMARY KEY (dataset, column_name, position)
+        )
+    ''',
+    "catalog_version": '''
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            dataset TEXT PRIMARY KEY,
+            version TEXT NOT NULL,
+            built_at TEXT NOT NULL
+        )
+    ''',
+    # Versão dos dados de cada dataset, incrementada a cada ingestão (app/core/versions.py)
+    "dataset_version": '''
+        CREATE TABLE IF NOT EXISTS dataset_version (
+            dataset TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    ''',
+}
+
+# Índices compostos seguindo os filtros das rotas (o ano é sempre o filtro mais seletivo)
+# e as colunas listadas pelas rotas */options
+INDEXES = {
+    "producao": [("Year", "Product"), ("Year", "Category"), ("Category",), ("Product",)],
+    "processamento": [("Year", "GroupName", "Cultive"), ("Product", "Year"), ("GroupName",), ("Cultive",)],
+    "comercializacao": [("Year", "GroupName", "Product"), ("GroupName",), ("Product",)],
+    "importacao": [("Year", "Country", "Product"), ("Product", "Year"), ("Country",)],
+    "exportacao": [("Year", "Country", "Product"), ("Product", "Year"), ("Country",)],
+}
+
+
+def index_name(table: str, columns: tuple) -> str:
+    return f"idx_{table}_{'_'.join(column.lower() for column in columns)}"
+
+
+def ensure_schema(conn: sqlite3.Connection, tables: list = None) -> None:
+    """
+    Cria as tabelas e índices do vitibrasil.db que ainda não existem.
+
+    Parâmetros:
+        conn (sqlite3.Connection): Conexão com o vitibrasil.db.
+        tables (list): Tabelas a criar. Padrão: todas.
+
+    Retorna:
+        None
+    """
+    for name in tables or TABLES:
+        conn.execute(TABLES[name])
+        for columns in INDEXES.get(name, []):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name(name, columns)} ON {name} ({', '.join(columns)})")
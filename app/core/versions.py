@@ -0,0 +1,74 @@
+import os
+import sqlite3
+from datetime import datetime, timezone
+from app.core.db import connect
+
+
+def bump_version(conn: sqlite3.Connection, dataset: str) -> int:
+    """
+    Incrementa a versão dos dados de um dataset. Chamada a cada ingestão que grava linhas no banco.
+
+    A versão nunca volta atrás, nem quando a tabela é recriada pelo crawler (drop_tables), para que
+    um ETag antigo não volte a valer para dados diferentes.
+
+    Parâmetros:
+        conn (sqlite3.Connection): Conexão de escrita com o vitibrasil.db.
+        dataset (str): Nome do dataset.
+
+    Retorna:
+        int: Nova versão.
+    """
+    updated_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    conn.execute(
+        '''
+        INSERT INTO dataset_version (dataset, version, updated_at) VALUES (?, 1, ?)
+        ON CONFLICT (dataset) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+        ''',
+        (dataset, updated_at),
+    )
+    return conn.execute("SELECT version FROM dataset_version WHERE dataset = ?", (dataset,)).fetchone()[0]
+
+
+def seed_versions(conn: sqlite3.Connection, datasets: list) -> None:
+    """
+    Cria a versão 1 dos datasets que ainda não têm versão (bancos anteriores ao versionamento).
+    """
+    updated_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    conn.executemany(
+        "INSERT OR IGNORE INTO dataset_version (dataset, version, updated_at) VALUES (?, 1, ?)",
+        [(dataset, updated_at) for dataset in datasets],
+    )
+
+
+def dataset_versions(conn: sqlite3.Connection) -> dict:
+    """
+    Versão dos dados de cada dataset: {dataset: (versão, horário da última ingestão em ISO 8601)}.
+    """
+    try:
+        return {row[0]: (row[1], row[2]) for row in conn.execute("SELECT dataset, version, updated_at FROM dataset_version")}
+    except sqlite3.OperationalError:
+        return {}
+
+
+def get_version(dataset: str) -> tuple:
+    """
+    Retorna a versão dos dados de um dataset (uma busca pela chave primária).
+
+    Sem versão registrada (banco ainda não migrado), usa a versão 0 e a data de modificação do vitibrasil.db.
+
+    Parâmetros:
+        dataset (str): Nome do dataset.
+
+    Retorna:
+        tuple: (versão, horário da última ingestão em ISO 8601, UTC).
+    """
+    row = None
+    try:
+        with connect("vitibrasil.db", readonly=True) as conn:
+            row = conn.execute("SELECT version, updated_at FROM dataset_version WHERE dataset = ?", (dataset,)).fetchone()
+    except sqlite3.OperationalError:
+        pass
+    if row:
+        return row[0], row[1]
+    modified = os.path.getmtime("vitibrasil.db") if os.path.exists("vitibrasil.db") else 0
+    return 0, datetime.fromtimestamp(modified, tz=timezone.utc).isoformat(timespec="seconds")
@@ -1,21 +1,77 @@
-from fastapi import APIRouter, Query, Depends, HTTPException, Form, Body
-from typing import Optional
+import asyncio
+from fastapi import APIRouter, Query, Depends, HTTPException, Form, Body, Request
+from typing import Annotated, List, Optional
 import sqlite3
-from app.util.auth import verifica_token, cria_token, hash_pass, verifica_pass, oauth2
-from app.core.database_config import init_db
+from app.util.auth import verifica_token, cria_token, hash_pass_async, verifica_pass_async, oauth2
+from app.core.catalog import get_catalog
+from app.core.db import connect
 from app.core.logging_config import logging_config
 import logging
-from pydantic import BaseModel
-from app.services.scraper_producao import get_producao
-from app.services.scraper_processamento import get_processamento
-from app.services.scraper_comercializacao import get_comercializacao
-from app.services.scraper_importacao import get_importacao
-from app.services.scraper_exportacao import get_exportacao
-from fastapi.responses import JSONResponse, RedirectResponse
+from pydantic import BaseModel, Field
+from app.services.scraper_producao import aget_producao
+from app.services.scraper_processamento import aget_processamento
+from app.services.scraper_comercializacao import aget_comercializacao
+from app.services.scraper_importacao import aget_importacao
+from app.services.scraper_exportacao import aget_exportacao
+from app.util.helpers import df_to_records, filter_contains, format_br_number
+from app.services.datasets import OPTION_PRODUCTS, option_for_product
+from app.services.queries import query_page, aggregate_dataset, data_freshness, DATASET_DIMENSIONS
+from app.services.years import resolve_years, scrape_years, concat_pages, ensure_years
+from app.services.pagination import decode_cursor, page_size, paginate_records
+from app.services.export import EXPORT_FORMATS, export_stream
+from app.services.snapshots import get_snapshot
+from app.services.conditional import cache_response, cached_response, data_validators, is_not_modified
+from app.core import config
+from datetime import datetime, timezone
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, RedirectResponse, Response, StreamingResponse
 
 
 router = APIRouter()
 logging_config()
+
+def site_response(data: list, next_cursor: Optional[str] = None) -> JSONResponse:
+    """
+    Resposta das rotas de dados com dados coletados do site (modo "live").
+    """
+    updated_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    return ORJSONResponse(status_code=200, content={"success": True, "total": len(data), "data": data, "next": next_cursor, "updated_at": updated_at})
+
+def options_response(request: Request, dataset: str, keys: dict) -> Response:
+    """
+    Resposta das rotas */options a partir do catálogo de opções, com a versão do catálogo como ETag.
+
+    Parâmetros:
+        request (Request): Requisição, usada para ler o cabeçalho If-None-Match.
+        dataset (str): Nome do dataset.
+        keys (dict): {chave da resposta: coluna do catálogo}.
+
+    Retorna:
+        Response: 200 com as opções, ou 304 se o cliente já tem a versão atual.
+    """
+    catalog = get_catalog(dataset)
+    etag = f'"{catalog["version"]}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={config.OPTIONS_CACHE_MAX_AGE}"}
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    content = {"success": True}
+    for key, column in keys.items():
+        content[key] = catalog["columns"][column]
+    content["version"] = catalog["version"]
+    return JSONResponse(status_code=200, content=content, headers=headers)
+
+def db_response(dataset: str, data: list, next_cursor: Optional[str] = None, headers: Optional[dict] = None) -> JSONResponse:
+    """
+    Resposta das rotas de dados com dados do vitibrasil.db, informando quando foram atualizados pela última vez.
+    Os registros já vêm formatados da consulta (parâmetro numeric de query_page) e são serializados com orjson.
+    O cursor da próxima página vai em "next" (None na última página ou sem paginação) e os validadores
+    (ETag, Last-Modified) em headers.
+    """
+    content = {"success": True, "total": len(data), "data": data, "next": next_cursor, "updated_at": data_freshness(dataset)}
+    if not data:
+        logging.warning("Consulta ao banco realizada, mas nenhum dado encontrado.")
+        content["message"] = "Nenhum dado encontrado no banco para os filtros informados."
+    return ORJSONResponse(status_code=200, content=content, headers=headers)
 class UserRequest(BaseModel):
     username: str
     password: str
@@ -77,25 +133,19 @@ async def sign_up(user: UserRequest = Body(
         ### Retorno:
             Retorna uma mensagem de confirmação de que o usuário foi cadastrado com sucesso.
     """
-    await init_db()
     logging.info('Iniciando sign-up')
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-
-    hashed_pw = hash_pass(user.password)
+    hashed_pw = await hash_pass_async(user.password)
 
     try:
-        cursor.execute('''
-            INSERT INTO users (username, password) VALUES (?, ?)
-        ''', (user.username, hashed_pw))
-        conn.commit()
+        with connect("users.db") as conn:
+            conn.execute('''
+                INSERT INTO users (username, password) VALUES (?, ?)
+            ''', (user.username, hashed_pw))
         logging.info(f"Usuário {user.username} cadastrado com sucesso.")
         return JSONResponse(status_code=200,content={"message": "Usuário cadastrado com sucesso!"})
     except sqlite3.IntegrityError:
         logging.error(f"Usuário {user.username} já existe.")
         raise HTTPException(status_code=202, detail="Usuário já existe.")
-    finally:
-        conn.close()
 
 @router.post(
     "/login", tags=["Usuários"],
@@ -148,14 +198,10 @@ async def login_user (
             Retorna o token de acesso se as credenciais forem válidas.
     """
 
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT password FROM users WHERE username = ?", (username,))
-    result = cursor.fetchone()
-    conn.close()
+    with connect("users.db", readonly=True) as conn:
+        result = conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
 
-    if not result or not verifica_pass(password, result[0]):
+    if not result or not await verifica_pass_async(password, result[0]):
         raise HTTPException(status_code=401, detail="As credenciais são inválidas")
 
     access_token = cria_token(data={"sub": username})
@@ -176,6 +222,7 @@ async def login_user (
                 }
             }
         },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
         422: {
             "description": "Erro de validação dos parâmetros.",
             "content": {
@@ -194,7 +241,7 @@ async def login_user (
         }
     }
 )
-async def producao_opcoes() -> dict:
+async def producao_opcoes(request: Request) -> dict:
     """
         ### Descrição:
             Rota para obter as opções de categorias e produtos disponíveis na produção.
@@ -205,14 +252,7 @@ async def producao_opcoes() -> dict:
             Retorna uma lista de categorias e produtos disponíveis.
     """
     try:
-        conn = sqlite3.connect("vitibrasil.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT Category FROM producao")
-        categories = [row[0] for row in cursor.fetchall()]
-        cursor.execute("SELECT DISTINCT Product FROM producao")
-        products = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return JSONResponse(status_code=200, content={"success": True, "categories": categories, "products": products})
+        return options_response(request, "producao", {"categories": "Category", "products": "Product"})
     except Exception as e:
         logging.error(f"Erro ao acessar o banco de dados: {e}")
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)}) 
@@ -239,6 +279,7 @@ async def producao_opcoes() -> dict:
                 }
             }
         },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
         422: {
             "description": "Erro de validação dos parâmetros.",
             "content": {
@@ -258,9 +299,16 @@ async def producao_opcoes() -> dict:
     }
 )
 async def producao (
+    request: Request,
     year: int = Query(None, ge=1970, le=2023),
     category: Optional[str] = Query(None),
     product: Optional[str] = Query(None),
+    numeric: bool = Query(False),
+    year_from: Optional[int] = Query(None, ge=1970),
+    year_to: Optional[int] = Query(None, ge=1970),
+    years: Optional[List[Annotated[int, Field(ge=1970, le=2023)]]] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=config.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
     token_user: str = Depends(verifica_token)
 ) -> dict:
     """
@@ -269,11 +317,17 @@ async def producao (
        ### Parâmetros:
             - headers:
                 - Authorization: Bearer {token}
+                - If-None-Match: ETag recebido antes (opcional; responde 304 se os dados não mudaram)
             - method: GET
             - parameters:
                 - year: int (obrigatório, ano de 1970 a 2023)
                 - category: str (opcional, categoria do produto)
                 - product: str (opcional, nome do produto)
+                - numeric: bool (opcional, retorna quantidades e valores como números em vez de texto)
+                - year_from, year_to: int (opcional, intervalo de anos, inclusive)
+                - years: int (opcional, repetível, ex.: years=2001&years=2005)
+                - limit: int (opcional, linhas por página)
+                - cursor: str (opcional, valor de "next" da página anterior)
         ### Retorno:
             Retorna dados de produção filtrados por ano, produto e categoria.
         ### Exemplo de uso:
@@ -284,43 +338,44 @@ async def producao (
             Retorna dados de produção de Tinto para o ano de 2001 na categoria Vinho de mesa.
     """
     try:
-        df = get_producao(year)
-        data = df.to_dict(orient="records")
-        logging.info("Dados do site coletados com sucesso")
-        filtered_data = data
-        
-        if product:
-            filtered_data = [row for row in filtered_data if row.get("Product") and product.lower() in row["Product"].lower()]
-        if category:
-            filtered_data = [row for row in filtered_data if row.get("Category") and category.lower() in row["Category"].lower()]
-        return JSONResponse(status_code=200, content={"success": True, "total": len(filtered_data), "data": filtered_data})
-    except Exception as e:
-        logging.error(f"Erro ao capturar dados do banco: {e}")
-        return JSONResponse(status_code=500, content={"Success": False, "error": str(e)})
-    except:
-        logging.info("Erro ao capturar dados do site, tentando coletar do banco")
-        conn = sqlite3.connect("vitibrasil.db") 
-        cursor = conn.cursor()
-
-        if year and product:
-            logging.info(f"Capturando dados do banco para o ano {year} e produto {product}")
-            query = "SELECT Year, Product, Quantity_L FROM producao WHERE Year = ? AND Product LIKE ?"
-            cursor.execute(query, (year, product))
+        selected_years = resolve_years(year, year_from, year_to, years, "producao")
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
 
-        else:
-            query = "SELECT Year, Product, Quantity_L FROM producao WHERE Year = ?"
-            cursor.execute(query,(year,))
+    validators = None
+    if config.SERVING_MODE == "db":
+        validators = data_validators(request, "producao")
+        cached = cached_response(request, validators)
+        if cached is not None:
+            return cached
 
-        rows = cursor.fetchall()
-
-        if not rows:
-            logging.warning("Consulta ao banco realizada, mas nenhum dado encontrado.")
-            conn.close()
-            return JSONResponse(status_code=200, content={"success": True, "total": 0, "data": [], "message": "Nenhum dado encontrado no banco para os filtros informados."})
+    if config.SERVING_MODE == "live":
+        df = concat_pages(await scrape_years("producao", None, selected_years or [None], aget_producao))
+        if not df.empty:
+            df = filter_contains(df, {"Product": product, "Category": category})
+            data = df_to_records(df, "producao", numeric)
+            logging.info("Dados do site coletados com sucesso")
+            return site_response(*paginate_records(data, page_size(limit, after), after))
+        logging.info("Erro ao capturar dados do site, tentando coletar do banco")
 
-        data = [{"Year": row[0], "Product": row[1], "Quantity_L": row[2]} for row in rows]
-        conn.close()
-        return JSONResponse(status_code=200, content={"success": True, "total": len(data), "data": data})
+    try:
+        if selected_years:
+            if await ensure_years("producao", None, selected_years, aget_producao) and validators:
+                # anos coletados agora do site: a versão dos dados mudou
+                validators = data_validators(request, "producao")
+        data, next_cursor = query_page(
+            "producao",
+            page_size(limit, after),
+            after,
+            contains={"Category": category, "Product": product},
+            years=selected_years,
+            numeric=numeric,
+        )
+        return cache_response(request, db_response("producao", data, next_cursor, validators))
+    except Exception as e:
+        logging.error(f"Erro ao capturar dados do banco: {e}")
+        return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
 
 @router.get(
     "/processamento/options", tags=["Vitivinicultura"],
@@ -338,6 +393,7 @@ async def producao (
                 }
             }
         },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
         422: {
             "description": "Erro de validação dos parâmetros.",
             "content": {
@@ -356,7 +412,7 @@ async def producao (
         }
     }
 )
-async def processamento_opcoes() -> dict:
+async def processamento_opcoes(request: Request) -> dict:
     """
         ### Descrição:
             Rota para obter as opções grupo, produtos e cultivos disponíveis na em processamento.
@@ -367,16 +423,7 @@ async def processamento_opcoes() -> dict:
             Retorna uma lista de grupos, produtos e cultivos disponíveis.
     """
     try:
-        conn = sqlite3.connect("vitibrasil.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT GroupName FROM processamento")
-        group_name = [row[0] for row in cursor.fetchall()]
-        cursor.execute("SELECT DISTINCT Product FROM processamento")
-        products = [row[0] for row in cursor.fetchall()]
-        cursor.execute("SELECT DISTINCT Cultive FROM processamento")
-        cultives = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return JSONResponse(status_code=200, content={"success": True, "Grupo": group_name, "Produtos": products, "Cultivos": cultives})
+        return options_response(request, "processamento", {"Grupo": "GroupName", "Produtos": "Product", "Cultivos": "Cultive"})
     except Exception as e:
         logging.error(f"Erro ao acessar o banco de dados: {e}")
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
@@ -402,6 +449,7 @@ async def processamento_opcoes() -> dict:
                 }
             }
         },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
         422: {
             "description": "Erro de validação dos parâmetros.",
             "content": {
@@ -420,10 +468,17 @@ async def processamento_opcoes() -> dict:
         }
     })
 async def processamento (
+    request: Request,
     product: str = Query(None),
     year: int = Query(None, ge=1970, le=2023),
     group:  Optional[str] = Query(None),
     cultive:  Optional[str] = Query(None),
+    numeric: bool = Query(False),
+    year_from: Optional[int] = Query(None, ge=1970),
+    year_to: Optional[int] = Query(None, ge=1970),
+    years: Optional[List[Annotated[int, Field(ge=1970, le=2023)]]] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=config.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
     token_user: str = Depends(verifica_token))  -> dict:
     """
         ### Descrição:
@@ -431,11 +486,17 @@ async def processamento (
        ### Parâmetros:
             - headers:
                 - Authorization: Bearer {token}
+                - If-None-Match: ETag recebido antes (opcional; responde 304 se os dados não mudaram)
             - method: GET
             - parameters:
                 - year: int (obrigatório, ano de 1970 a 2023)
                 - product: str (obrigatório, nome do produto)
                 - cultive: str (opcional, cultivo do produto)
+                - numeric: bool (opcional, retorna quantidades e valores como números em vez de texto)
+                - year_from, year_to: int (opcional, intervalo de anos, inclusive)
+                - years: int (opcional, repetível, ex.: years=2001&years=2005)
+                - limit: int (opcional, linhas por página)
+                - cursor: str (opcional, valor de "next" da página anterior)
         ### Retorno:
             Retorna dados de processamento filtrados por ano, produto e cultivo.
         ### Exemplo de uso:
@@ -448,71 +509,51 @@ async def processamento (
     if product is None:
         return JSONResponse(status_code=400, content={"success": False, "error": "Necessário informar o produto: Viníferas, Uvas de mesa, Americanas e Híbridas ou Sem Classificação"})
     
-    if product.lower() == 'viníferas' or product.lower() == 'viniferas':
-        option = 1
-    elif product.lower() == 'americanas e híbridas' or product.lower() == 'americanas e hibridas':
-        option = 2
-    elif product.lower() == 'uvas de mesa':
-        option = 3
-    elif product.lower() == 'sem classificação' or product.lower() == 'sem classificacao':
-        option = 4
-    else:
+    option = option_for_product("processamento", product)
+    if option is None:
         return JSONResponse(status_code=400, content={"success": False, "error": "Produto inválido. Opções válidas: Viníferas, Uvas de mesa, Americanas e Híbridas ou Sem Classificação."})
     
     try:
-        df = get_processamento(year, option)
-   
-        if group:
-            df = df[df["GroupName"].str.contains(group, case=False, na=False)]
-        if cultive:
-            df = df[df["Cultive"].str.contains(cultive, case=False, na=False)]
-        if product:
-            df = df[df["Product"].str.contains(product, case=False, na=False)]
-        data = df.to_dict(orient="records")
-        logging.info("Dados do site coletados com sucesso")
-        return JSONResponse(status_code=200, content={"success": True, "total": len(data), "data": data})
+        selected_years = resolve_years(year, year_from, year_to, years, "processamento")
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+
+    validators = None
+    if config.SERVING_MODE == "db":
+        validators = data_validators(request, "processamento")
+        cached = cached_response(request, validators)
+        if cached is not None:
+            return cached
+
+    if config.SERVING_MODE == "live":
+        df = concat_pages(await scrape_years("processamento", option, selected_years or [None], lambda y: aget_processamento(y, option)))
+        if not df.empty:
+            df = filter_contains(df, {"GroupName": group, "Cultive": cultive})
+            data = df_to_records(df, "processamento", numeric)
+            logging.info("Dados do site coletados com sucesso")
+            return site_response(*paginate_records(data, page_size(limit, after), after))
+        logging.error("Erro ao capturar dados do site, tentando coletar do banco")
+
+    try:
+        if selected_years:
+            if await ensure_years("processamento", option, selected_years, lambda y: aget_processamento(y, option)) and validators:
+                # anos coletados agora do site: a versão dos dados mudou
+                validators = data_validators(request, "processamento")
+        data, next_cursor = query_page(
+            "processamento",
+            page_size(limit, after),
+            after,
+            exact={"Product": OPTION_PRODUCTS["processamento"][option]},
+            contains={"GroupName": group, "Cultive": cultive},
+            years=selected_years,
+            numeric=numeric,
+        )
+        return cache_response(request, db_response("processamento", data, next_cursor, validators))
     except Exception as e:
         logging.error(f"Erro ao capturar dados do banco: {e}")
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
-    except:
-        logging.error("Erro ao capturar dados do site, tentando coletar do banco")
 
-        conn = sqlite3.connect("vitibrasil.db")
-        cursor = conn.cursor()
-
-        query = "SELECT Year, GroupName, Cultive, Quantity_Kg, Product FROM processamento WHERE 1=1" 
-        params = [] 
-
-        if year is not None:
-            query += " AND Year = ?"
-            params.append(year) 
-
-        if group:
-            query += " AND GroupName LIKE ?"
-            params.append(f"%{group}%")
-
-        if cultive:
-            query += " AND Cultive LIKE ?"
-            params.append(f"%{cultive}%")
-            
-        if product:
-            query += " AND Product LIKE ?"
-            params.append(f"%{product}%")
-
-        if year is not None:
-            query += " AND Year = ?"
-            params.append(year) 
-        
-        logging.info("QUERY:", query)
-        logging.info("PARAMS:", params)
-        cursor.execute(query, params) 
-        rows = cursor.fetchall() 
-
-        data = [{"Year": row[0], "GroupName": row[1], "Cultive": row[2], "Quantity_Kg": row[3]} for row in rows]
-        conn.close() 
-        
-        return JSONResponse(status_code=200, content={"success": True, "total": len(data), "data": data})
-    
 @router.get(
     "/comercializacao/options", tags=["Vitivinicultura"],
     responses={
@@ -527,6 +568,7 @@ async def processamento (
                 }
             }
         },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
         422: {
             "description": "Erro de validação dos parâmetros.",
             "content": {
@@ -545,7 +587,7 @@ async def processamento (
         }
     }
 )
-async def comercializacao_opcoes() -> dict:
+async def comercializacao_opcoes(request: Request) -> dict:
     """
         ### Descrição:
             Rota para obter as opções de grupos e produtos disponíveis na comercialização.
@@ -556,14 +598,7 @@ async def comercializacao_opcoes() -> dict:
             Retorna uma lista de grupos e produtos disponíveis.
     """
     try:
-        conn = sqlite3.connect("vitibrasil.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT GroupName FROM comercializacao")
-        group_name = [row[0] for row in cursor.fetchall()]
-        cursor.execute("SELECT DISTINCT Product FROM comercializacao")
-        products = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return JSONResponse(status_code=200, content={"success": True, "Grupos": group_name, "Produtos": products})
+        return options_response(request, "comercializacao", {"Grupos": "GroupName", "Produtos": "Product"})
     except Exception as e:
         logging.error(f"Erro ao acessar o banco de dados: {e}")
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
@@ -588,6 +623,7 @@ async def comercializacao_opcoes() -> dict:
                 }
             }
         },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
         422: {
             "description": "Erro de validação dos parâmetros.",
             "content": {
@@ -606,9 +642,16 @@ async def comercializacao_opcoes() -> dict:
         }
     })
 async def comercializacao (
+    request: Request,
     year: int = Query(None, ge=1970, le=2023),
     group: Optional[str] = Query(None),
     product: Optional[str] = Query(None),
+    numeric: bool = Query(False),
+    year_from: Optional[int] = Query(None, ge=1970),
+    year_to: Optional[int] = Query(None, ge=1970),
+    years: Optional[List[Annotated[int, Field(ge=1970, le=2023)]]] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=config.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
     token_user: str = Depends(verifica_token))  -> dict:
     """
         ### Descrição:
@@ -616,11 +659,17 @@ async def comercializacao (
        ### Parâmetros:
             - headers:
                 - Authorization: Bearer {token}
+                - If-None-Match: ETag recebido antes (opcional; responde 304 se os dados não mudaram)
             - method: GET
             - parameters:
                 - year: int (obrigatório, ano de 1970 a 2023)
                 - group: str (opcional, nome do grupo)
                 - cultive: str (opcional, cultivo do produto)
+                - numeric: bool (opcional, retorna quantidades e valores como números em vez de texto)
+                - year_from, year_to: int (opcional, intervalo de anos, inclusive)
+                - years: int (opcional, repetível, ex.: years=2001&years=2005)
+                - limit: int (opcional, linhas por página)
+                - cursor: str (opcional, valor de "next" da página anterior)
         ### Retorno:
             Retorna dados de produção em JSON filtrados por ano, grupo e cultivo. 
         ### Exemplo de uso:
@@ -631,32 +680,44 @@ async def comercializacao (
             Retorna dados de comercialização de VINHO FINO DE MESA para o ano de 2002 e cultivo Tinto.
     """
     try:
-        conn = sqlite3.connect("vitibrasil.db")
-        cursor = conn.cursor()
-
-        query = "SELECT Year, GroupName, Product, Quantity_L FROM comercializacao WHERE 1=1" 
-        params = []
+        selected_years = resolve_years(year, year_from, year_to, years, "comercializacao")
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
 
-        if year is not None:
-            query += " AND Year = ?"
-            params.append(year)
-        
-        if group:
-            query += " AND GroupName LIKE ?"
-            params.append(group)
+    validators = None
+    if config.SERVING_MODE == "db":
+        validators = data_validators(request, "comercializacao")
+        cached = cached_response(request, validators)
+        if cached is not None:
+            return cached
 
-        if product:
-            query += " AND Product LIKE ?"
-            params.append(product)
-
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-
-        data = [{"Year": row[0], "GroupName": row[1], "Product": row[2], "Quantity": row[3]} for row in rows]
-        conn.close()
+    if config.SERVING_MODE == "live":
+        df = concat_pages(await scrape_years("comercializacao", None, selected_years or [None], aget_comercializacao))
+        if not df.empty:
+            df = filter_contains(df, {"GroupName": group, "Product": product})
+            data = df_to_records(df, "comercializacao", numeric)
+            logging.info("Dados do site coletados com sucesso")
+            data = [{"Year": row["Year"], "GroupName": row["GroupName"], "Product": row["Product"], "Quantity": row["Quantity_L"]} for row in data]
+            return site_response(*paginate_records(data, page_size(limit, after), after))
+        logging.error("Erro ao capturar dados do site, tentando coletar do banco")
 
-        return JSONResponse(content={"success": True, "total": len(data), "data": data})
-    
+    try:
+        if selected_years:
+            if await ensure_years("comercializacao", None, selected_years, aget_comercializacao) and validators:
+                # anos coletados agora do site: a versão dos dados mudou
+                validators = data_validators(request, "comercializacao")
+        data, next_cursor = query_page(
+            "comercializacao",
+            page_size(limit, after),
+            after,
+            contains={"GroupName": group, "Product": product},
+            years=selected_years,
+            numeric=numeric,
+        )
+        # a rota expõe Quantity_L como "Quantity"
+        data = [{"Year": row["Year"], "GroupName": row["GroupName"], "Product": row["Product"], "Quantity": row["Quantity_L"]} for row in data]
+        return cache_response(request, db_response("comercializacao", data, next_cursor, validators))
     except Exception as e:
         raise HTTPException(status_code=500, detail={"success": False, "error": str(e)})
 
@@ -674,6 +735,7 @@ async def comercializacao (
                 }
             }
         },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
         422: {
             "description": "Erro de validação dos parâmetros.",
             "content": {
@@ -692,7 +754,7 @@ async def comercializacao (
         }
     }
 )
-async def importacao_opcoes() -> dict:
+async def importacao_opcoes(request: Request) -> dict:
     """
         ### Descrição:
             Rota para obter as opções de categorias e produtos disponíveis na importação.
@@ -703,12 +765,7 @@ async def importacao_opcoes() -> dict:
             Retorna uma lista de países disponíveis.
     """
     try:
-        conn = sqlite3.connect("vitibrasil.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT Country FROM importacao")
-        country = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return JSONResponse(status_code=200, content={"success": True, "Países": country})
+        return options_response(request, "importacao", {"Países": "Country"})
     except Exception as e:
         logging.error(f"Erro ao acessar o banco de dados: {e}")
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)}) 
@@ -734,6 +791,7 @@ async def importacao_opcoes() -> dict:
                 }
             }
         },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
         422: {
             "description": "Erro de validação dos parâmetros.",
             "content": {
@@ -752,9 +810,16 @@ async def importacao_opcoes() -> dict:
         }
     })
 async def importacao (
+    request: Request,
     year: int = Query(None, ge= 1970, le= 2024),
     country: Optional[str] = Query(None),
     product: str = Query(None),
+    numeric: bool = Query(False),
+    year_from: Optional[int] = Query(None, ge=1970),
+    year_to: Optional[int] = Query(None, ge=1970),
+    years: Optional[List[Annotated[int, Field(ge=1970, le=2024)]]] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=config.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
     token_user: str = Depends(verifica_token))  -> dict:
     """
         ### Descrição:
@@ -762,11 +827,17 @@ async def importacao (
        ### Parâmetros:
             - headers:
                 - Authorization: Bearer {token}
+                - If-None-Match: ETag recebido antes (opcional; responde 304 se os dados não mudaram)
             - method: GET
             - parameters:
                 - year: int (obrigatório, ano de 1970 a 2023)
                 - country: str (opcional, nome do país importador)
                 - product: str (obrigatório, nome do produto)
+                - numeric: bool (opcional, retorna quantidades e valores como números em vez de texto)
+                - year_from, year_to: int (opcional, intervalo de anos, inclusive)
+                - years: int (opcional, repetível, ex.: years=2001&years=2005)
+                - limit: int (opcional, linhas por página)
+                - cursor: str (opcional, valor de "next" da página anterior)
         ### Retorno:
             Retorna dados de importação filtrados por ano, país e produto.
         ### Exemplo de uso:
@@ -779,61 +850,50 @@ async def importacao (
     if product is None:
         return {"Necessário informar o produto": "Vinhos de mesa, Espumantes, Uvas frescas, Uvas passas ou Suco de uva"}
 
-    if product == 'Vinhos de mesa' or product == 'vinhos de mesa':
-        option = 1
-    elif product == 'Espumantes' or product == 'espumantes':
-        option = 2
-    elif product == 'Uvas frescas' or product == 'uvas frescas':
-        option = 3
-    elif product == 'Uvas passas' or product == 'uvas passas':
-        option = 4
-    elif product == 'Suco de uva' or product == 'suco de uva':
-        option = 5
-    else:
+    option = option_for_product("importacao", product)
+    if option is None:
         return JSONResponse(status_code=400, content={"success": False, "error": "Produto inválido. Opções válidas: Vinhos de mesa, Espumantes, Uvas frescas, Uvas passas ou Suco de uva."})
 
     try:
-        df = get_importacao(year, option)
-        data = df.to_dict(orient="records")
-        logging.info("Dados do site coletados com sucesso")
-        filtered_data = data
-        if product:
-            filtered_data = [row for row in filtered_data if row.get("Product") and product.lower() in row["Product"].lower()]
-        if country:
-            filtered_data = [row for row in filtered_data if row.get("Country") and country.lower() in row["Country"].lower()]
-        return JSONResponse(status_code=200, content={"success": True, "total": len(filtered_data), "data": filtered_data})
-    except Exception as e:
-        logging.error(f"Erro ao capturar dados do banco: {e}")
-        return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
-    except:
-        logging.error("Erro ao capturar dados do site, tentando coletar do banco")
-    
-        conn = sqlite3.connect("vitibrasil.db")
-        cursor = conn.cursor()
-
-        query = "SELECT Year, Country, Quantity_Kg, Value_USD, Product FROM importacao WHERE 1=1"
-        params = []
+        selected_years = resolve_years(year, year_from, year_to, years, "importacao")
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
 
-        if year is not None:
-            query += " AND Year = ?"
-            params.append(year)
-        
-        if country:
-            query += " AND Country LIKE ?"
-            params.append(country)
-            
-        if product:
-            query += " AND Product LIKE ?"
-            params.append(product)
-        
+    validators = None
+    if config.SERVING_MODE == "db":
+        validators = data_validators(request, "importacao")
+        cached = cached_response(request, validators)
+        if cached is not None:
+            return cached
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-
-        data = [{"Year": row[0], "Country": row[1], "Quantity_Kg": row[2], "Value_USD": row[3], "Product": row[4]} for row in rows]
-        conn.close()
+    if config.SERVING_MODE == "live":
+        df = concat_pages(await scrape_years("importacao", option, selected_years or [None], lambda y: aget_importacao(y, option)))
+        if not df.empty:
+            df = filter_contains(df, {"Country": country})
+            data = df_to_records(df, "importacao", numeric)
+            logging.info("Dados do site coletados com sucesso")
+            return site_response(*paginate_records(data, page_size(limit, after), after))
+        logging.error("Erro ao capturar dados do site, tentando coletar do banco")
 
-        return JSONResponse(status_code=200, content={"success": True, "total": len(data), "data": data})
+    try:
+        if selected_years:
+            if await ensure_years("importacao", option, selected_years, lambda y: aget_importacao(y, option)) and validators:
+                # anos coletados agora do site: a versão dos dados mudou
+                validators = data_validators(request, "importacao")
+        data, next_cursor = query_page(
+            "importacao",
+            page_size(limit, after),
+            after,
+            exact={"Product": OPTION_PRODUCTS["importacao"][option]},
+            contains={"Country": country},
+            years=selected_years,
+            numeric=numeric,
+        )
+        return cache_response(request, db_response("importacao", data, next_cursor, validators))
+    except Exception as e:
+        logging.error(f"Erro ao capturar dados do banco: {e}")
+        return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
 
 @router.get(
     "/exportacao/options", tags=["Vitivinicultura"],
@@ -849,6 +909,7 @@ async def importacao (
                 }
             }
         },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
         422: {
             "description": "Erro de validação dos parâmetros.",
             "content": {
@@ -867,7 +928,7 @@ async def importacao (
         }
     }
 )
-async def exportacao_opcoes() -> dict:
+async def exportacao_opcoes(request: Request) -> dict:
     """
         ### Descrição:
             Rota para obter os países disponíveis na exportação.
@@ -878,14 +939,7 @@ async def exportacao_opcoes() -> dict:
             Retorna uma lista de países disponíveis.
     """
     try:
-        conn = sqlite3.connect("vitibrasil.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT Country FROM exportacao")
-        country = [row[0] for row in cursor.fetchall()]
-        cursor.execute("SELECT DISTINCT Product FROM exportacao")
-        products = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return JSONResponse(status_code=200, content={"success": True, "Países": country, "Produtos": products})
+        return options_response(request, "exportacao", {"Países": "Country", "Produtos": "Product"})
     except Exception as e:
         logging.error(f"Erro ao acessar o banco de dados: {e}")
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)}) 
@@ -911,6 +965,7 @@ async def exportacao_opcoes() -> dict:
                 }
             }
         },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
         422: {
             "description": "Erro de validação dos parâmetros.",
             "content": {
@@ -929,9 +984,16 @@ async def exportacao_opcoes() -> dict:
         }
     })
 async def exportacao (
+    request: Request,
     year: int = Query(None, ge= 1970, le= 2024),
     product: str = Query(None),
     country: Optional[str] = Query(None),
+    numeric: bool = Query(False),
+    year_from: Optional[int] = Query(None, ge=1970),
+    year_to: Optional[int] = Query(None, ge=1970),
+    years: Optional[List[Annotated[int, Field(ge=1970, le=2024)]]] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=config.PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
     token_user: str = Depends(verifica_token))  -> dict:
     """
         ### Descrição:
@@ -939,11 +1001,17 @@ async def exportacao (
        ### Parâmetros:
             - headers:
                 - Authorization: Bearer {token}
+                - If-None-Match: ETag recebido antes (opcional; responde 304 se os dados não mudaram)
             - method: GET
             - parameters:
                 - year: int (obrigatório, ano de 1970 a 2023)
                 - country: str (opcional, nome do país exportador)
                 - product: str (obrigatório, nome do produto)
+                - numeric: bool (opcional, retorna quantidades e valores como números em vez de texto)
+                - year_from, year_to: int (opcional, intervalo de anos, inclusive)
+                - years: int (opcional, repetível, ex.: years=2001&years=2005)
+                - limit: int (opcional, linhas por página)
+                - cursor: str (opcional, valor de "next" da página anterior)
         ### Retorno:
             Retorna dados de exportação filtrados por ano, país e produto.
         ### Exemplo de uso:
@@ -956,51 +1024,310 @@ async def exportacao (
     if product is None:
         return {"Necessário informar o produto": "Vinhos de mesa, Espumantes, Uvas frescas ou Suco de uva"}
 
-    if product == 'Vinhos de mesa' or product == 'vinhos de mesa':
-        option = 1
-    elif product == 'Espumantes' or product == 'espumantes':
-        option = 2
-    elif product == 'Uvas frescas' or product == 'uvas frescas':
-        option = 3
-    elif product == 'Suco de uva' or product == 'suco de uva':
-        option = 4
-    else:
+    option = option_for_product("exportacao", product)
+    if option is None:
         return JSONResponse(status_code=400, content={"success": False, "error": "Produto inválido. Opções válidas: Vinhos de mesa, Espumantes, Uvas frescas, Uvas passas ou Suco de uva."})
 
     try:
-        df = get_exportacao(year, option)
-        if country:
-            df = df[df["Country"].str.contains(country, case=False, na=False)]
-        if product:
-            df = df[df["Product"].str.contains(product, case=False, na=False)]
-        data = df.to_dict(orient="records")
-        logging.info("Dados do site coletados com sucesso")
-        return JSONResponse(status_code=200, content={"success": True, "total": len(data), "data": data})
+        selected_years = resolve_years(year, year_from, year_to, years, "exportacao")
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+
+    validators = None
+    if config.SERVING_MODE == "db":
+        validators = data_validators(request, "exportacao")
+        cached = cached_response(request, validators)
+        if cached is not None:
+            return cached
+
+    if config.SERVING_MODE == "live":
+        df = concat_pages(await scrape_years("exportacao", option, selected_years or [None], lambda y: aget_exportacao(y, option)))
+        if not df.empty:
+            df = filter_contains(df, {"Country": country})
+            data = df_to_records(df, "exportacao", numeric)
+            logging.info("Dados do site coletados com sucesso")
+            return site_response(*paginate_records(data, page_size(limit, after), after))
+        logging.error("Erro ao capturar dados do site, tentando coletar do banco")
+
+    try:
+        if selected_years:
+            if await ensure_years("exportacao", option, selected_years, lambda y: aget_exportacao(y, option)) and validators:
+                # anos coletados agora do site: a versão dos dados mudou
+                validators = data_validators(request, "exportacao")
+        data, next_cursor = query_page(
+            "exportacao",
+            page_size(limit, after),
+            after,
+            exact={"Product": OPTION_PRODUCTS["exportacao"][option]},
+            contains={"Country": country},
+            years=selected_years,
+            numeric=numeric,
+        )
+        return cache_response(request, db_response("exportacao", data, next_cursor, validators))
     except Exception as e:
         logging.error(f"Erro ao capturar dados do banco: {e}")
         return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
-    except:
-        logging.error("Erro ao capturar dados do site, tentando coletar do banco")
 
-        conn = sqlite3.connect("vitibrasil.db")
-        cursor = conn.cursor()
 
-        query = "SELECT Year, Country, Quantity_Kg, Value_USD FROM exportacoes WHERE 1=1" 
-        params = [] 
+@router.get("/{dataset}/aggregate", tags=["Vitivinicultura"], responses={
+        200: {
+            "description": "Agregação calculada com sucesso.",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "success": True,
+                        "dataset": "exportacao",
+                        "group_by": ["country"],
+                        "metrics": ["sum"],
+                        "value": "value",
+                        "total": 2,
+                        "data": [
+                            {"Country": "paraguai", "sum": "7.223.564"},
+                            {"Country": "estados unidos", "sum": "1.843.512"}
+                        ],
+                        "updated_at": "2024-05-01T12:00:00+00:00"
+                    }
+                }
+            }
+        },
+        304: {"description": "O cliente já tem a resposta atual da consulta (If-None-Match)."},
+        400: {
+            "description": "Dataset, dimensão, métrica ou filtro de ano inválido.",
+            "content": {
+                "application/json": {
+                    "example": {"success": False, "error": "Dimensões não disponíveis em producao: country. Use: year, group, product"}
+                }
+            }
+        }
+    })
+async def aggregate (
+    request: Request,
+    dataset: str,
+    group_by: List[str] = Query([]),
+    metrics: List[str] = Query(["sum"]),
+    value: str = Query("quantity"),
+    top: Optional[int] = Query(None, ge=1),
+    year: Optional[int] = Query(None, ge=1970),
+    year_from: Optional[int] = Query(None, ge=1970),
+    year_to: Optional[int] = Query(None, ge=1970),
+    years: Optional[List[int]] = Query(None),
+    group: Optional[str] = Query(None),
+    product: Optional[str] = Query(None),
+    cultive: Optional[str] = Query(None),
+    country: Optional[str] = Query(None),
+    numeric: bool = Query(False),
+    token_user: str = Depends(verifica_token)) -> dict:
+    """
+        ### Descrição:
+            Agregações calculadas no banco (vitibrasil.db), sem trazer as linhas para o cliente.
+            As linhas de total do site não entram nas contas, para não somar o mesmo valor duas vezes.
+       ### Parâmetros:
+            - headers:
+                - Authorization: Bearer {token}
+                - If-None-Match: ETag recebido antes (opcional; responde 304 se os dados não mudaram)
+            - method: GET
+            - path:
+                - dataset: producao, processamento, comercializacao, importacao ou exportacao
+            - parameters:
+                - group_by: str (opcional, repetível: year, group, product, cultive ou country, conforme o dataset)
+                - metrics: str (opcional, repetível: sum, avg, min ou max; padrão: sum)
+                - value: str (opcional, quantity ou value, este só em importação e exportação; padrão: quantity)
+                - top: int (opcional, retorna os N grupos com maior valor da primeira métrica)
+                - year, year_from, year_to, years: int (opcional, filtros de ano como nas rotas de dados)
+                - group, product, cultive, country: str (opcional, busca parcial, conforme o dataset)
+                - numeric: bool (opcional, retorna os resultados como números em vez de texto)
+        ### Retorno:
+            Retorna uma linha por grupo, com as dimensões pedidas e uma chave por métrica.
+        ### Exemplo de uso:
+            curl -X 'GET'
+                'exportacao/aggregate?group_by=country&value=value&top=10&year_from=2010&year_to=2023'
+                -H 'accept: application/json'
+                -H 'Authorization: Bearer TOKEN_EXAMPLE'
+            Retorna os 10 países que mais compraram do Brasil, em US$, de 2010 a 2023.
+    """
+    if dataset not in DATASET_DIMENSIONS:
+        return JSONResponse(status_code=400, content={"success": False, "error": f"Dataset inválido. Opções válidas: {', '.join(DATASET_DIMENSIONS)}."})
+
+    validators = data_validators(request, dataset)
+    cached = cached_response(request, validators)
+    if cached is not None:
+        return cached
+
+    filters = {"group": group, "product": product, "cultive": cultive, "country": country}
+    try:
+        selected_years = resolve_years(year, year_from, year_to, years, dataset)
+        data = aggregate_dataset(
+            dataset,
+            group_by,
+            metrics,
+            value,
+            years=selected_years,
+            contains={name: text for name, text in filters.items() if text},
+            top=top,
+        )
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
+    except Exception as e:
+        logging.error(f"Erro ao agregar dados do banco: {e}")
+        return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
+
+    if not numeric:
+        for row in data:
+            for name in metrics:
+                row[name] = format_br_number(None if row[name] is None else round(row[name]))
+    content = {
+        "success": True,
+        "dataset": dataset,
+        "group_by": group_by,
+        "metrics": metrics,
+        "value": value,
+        "total": len(data),
+        "data": data,
+        "updated_at": data_freshness(dataset),
+    }
+    return cache_response(request, ORJSONResponse(status_code=200, content=content, headers=validators))
+
+
+@router.get("/{dataset}/export", tags=["Vitivinicultura"], responses={
+        200: {
+            "description": "Arquivo com as linhas do dataset, enviado em blocos.",
+            "content": {
+                "application/x-ndjson": {
+                    "example": '{"Year": 2020, "Country": "paraguai", "Quantity_Kg": 1234, "Value_USD": 5678, "Product": "vinhos de mesa"}'
+                },
+                "text/csv": {
+                    "example": "Year,Country,Quantity_Kg,Value_USD,Product\n2020,paraguai,1234,5678,vinhos de mesa"
+                }
+            }
+        },
+        400: {
+            "description": "Dataset, formato, filtro ou ano inválido.",
+            "content": {
+                "application/json": {
+                    "example": {"success": False, "error": "Formato inválido. Opções válidas: ndjson, csv."}
+                }
+            }
+        }
+    })
+async def export (
+    dataset: str,
+    format: str = Query("ndjson"),
+    gzip: bool = Query(False),
+    year: Optional[int] = Query(None, ge=1970),
+    year_from: Optional[int] = Query(None, ge=1970),
+    year_to: Optional[int] = Query(None, ge=1970),
+    years: Optional[List[int]] = Query(None),
+    group: Optional[str] = Query(None),
+    product: Optional[str] = Query(None),
+    cultive: Optional[str] = Query(None),
+    country: Optional[str] = Query(None),
+    token_user: str = Depends(verifica_token)) -> Response:
+    """
+        ### Descrição:
+            Exportação completa de um dataset do banco (vitibrasil.db), lida do banco e enviada em blocos.
+            Os números saem como inteiros (vazio/null quando não disponíveis no site).
+       ### Parâmetros:
+            - headers:
+                - Authorization: Bearer {token}
+            - method: GET
+            - path:
+                - dataset: producao, processamento, comercializacao, importacao ou exportacao
+            - parameters:
+                - format: str (opcional, ndjson ou csv; padrão: ndjson)
+                - gzip: bool (opcional, envia o arquivo comprimido, .gz)
+                - year, year_from, year_to, years: int (opcional, filtros de ano como nas rotas de dados)
+                - group, product, cultive, country: str (opcional, busca parcial, conforme o dataset)
+        ### Retorno:
+            Retorna um arquivo NDJSON (um objeto por linha) ou CSV com cabeçalho.
+        ### Exemplo de uso:
+            curl -X 'GET'
+                'exportacao/export?format=csv&gzip=true'
+                -H 'Authorization: Bearer TOKEN_EXAMPLE' -o exportacao.csv.gz
+            Baixa toda a tabela de exportação em CSV comprimido.
+    """
+    if dataset not in DATASET_DIMENSIONS:
+        return JSONResponse(status_code=400, content={"success": False, "error": f"Dataset inválido. Opções válidas: {', '.join(DATASET_DIMENSIONS)}."})
+    if format not in EXPORT_FORMATS:
+        return JSONResponse(status_code=400, content={"success": False, "error": f"Formato inválido. Opções válidas: {', '.join(EXPORT_FORMATS)}."})
 
-        if year is not None:
-            query += " AND Year = ?"
-            params.append(year)
-        
-        if country:
-            query += " AND Country LIKE ?"
-            params.append(country)
+    dimensions = DATASET_DIMENSIONS[dataset]
+    filters = {name: text for name, text in {"group": group, "product": product, "cultive": cultive, "country": country}.items() if text}
+    unknown = [name for name in filters if name not in dimensions]
+    if unknown:
+        return JSONResponse(status_code=400, content={"success": False, "error": f"Filtros não disponíveis em {dataset}: {', '.join(unknown)}."})
+    try:
+        selected_years = resolve_years(year, year_from, year_to, years, dataset)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"success": False, "error": str(e)})
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"{dataset}.{extension}"
+    if gzip:
+        media_type, filename = "application/gzip", f"{filename}.gz"
+    stream = export_stream(
+        dataset,
+        format,
+        gzip,
+        years=selected_years,
+        contains={dimensions[name]: text for name, text in filters.items()},
+    )
+    return StreamingResponse(stream, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
 
-        data = [{"Year": row[0], "Country": row[1], "Quantity_Kg": row[2], "Value_USD": row[3]} for row in rows]
-        conn.close()
 
-        return JSONResponse(status_code=200, content={"success": True, "total": len(data), "data": data})
+@router.get("/{dataset}/snapshot", tags=["Vitivinicultura"], responses={
+        200: {
+            "description": "Arquivo Parquet com a tabela completa do dataset.",
+            "content": {"application/vnd.apache.parquet": {}}
+        },
+        304: {"description": "O cliente já tem a versão atual do snapshot (If-None-Match)."},
+        400: {
+            "description": "Dataset inválido.",
+            "content": {
+                "application/json": {
+                    "example": {"success": False, "error": "Dataset inválido. Opções válidas: producao, processamento, comercializacao, importacao, exportacao."}
+                }
+            }
+        }
+    })
+async def snapshot (
+    request: Request,
+    dataset: str,
+    token_user: str = Depends(verifica_token)) -> Response:
+    """
+        ### Descrição:
+            Snapshot Parquet mais recente de um dataset, gravado ao final de cada ingestão,
+            com Year e as colunas numéricas como inteiros. A versão do snapshot vai no ETag.
+       ### Parâmetros:
+            - headers:
+                - Authorization: Bearer {token}
+                - If-None-Match: ETag recebido antes (opcional; responde 304 se o snapshot não mudou)
+            - method: GET
+            - path:
+                - dataset: producao, processamento, comercializacao, importacao ou exportacao
+        ### Retorno:
+            Retorna o arquivo .parquet, que pode ser lido com pandas.read_parquet.
+        ### Exemplo de uso:
+            curl -X 'GET'
+                'exportacao/snapshot'
+                -H 'Authorization: Bearer TOKEN_EXAMPLE' -o exportacao.parquet
+            Baixa toda a tabela de exportação em um único arquivo.
+    """
+    if dataset not in DATASET_DIMENSIONS:
+        return JSONResponse(status_code=400, content={"success": False, "error": f"Dataset inválido. Opções válidas: {', '.join(DATASET_DIMENSIONS)}."})
+    try:
+        manifest = await asyncio.to_thread(get_snapshot, dataset)
+    except Exception as e:
+        logging.error(f"Erro ao gerar o snapshot de '{dataset}': {e}")
+        return JSONResponse(status_code=500, content={"success": False, "error": str(e)})
 
+    etag = f'"{manifest["version"]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        manifest["path"],
+        media_type="application/vnd.apache.parquet",
+        filename=f"{dataset}.parquet",
+        headers=headers,
+    )
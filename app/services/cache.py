@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import threading
+import time
+import pandas as pd
+from cachetools import LRUCache
+from typing import Awaitable, Callable, Hashable
+from app.core import config
+
+
+class ScraperCache:
+    """
+    Cache read-through em memória para as funções aget_* dos scrapers.
+
+    As entradas são indexadas por (dataset, option, year) e limitadas por LRU.
+    Uma entrada mais nova que o TTL é servida direto da memória. Depois do TTL,
+    e enquanto estiver dentro da janela de stale-while-revalidate, a entrada
+    antiga é servida e uma nova coleta é disparada em segundo plano. Fora dessa
+    janela a coleta é refeita antes de responder.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = LRUCache(maxsize=maxsize)
+        self._refreshing = set()
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+    async def aget(self, key: Hashable, fetch: Callable[[], Awaitable[pd.DataFrame]]) -> pd.DataFrame:
+        """
+        Retorna o DataFrame da chave informada, coletando do site apenas em caso de miss ou expiração.
+        A revalidação em segundo plano roda como uma task no event loop.
+
+        Parâmetros:
+            key (Hashable): Chave (dataset, option, year).
+            fetch (Callable): Função assíncrona que coleta os dados do site.
+
+        Retorna:
+            pd.DataFrame: Dados em cache ou recém coletados.
+        """
+        df, state = self._lookup(key)
+        if state == "fresh":
+            return df
+        if state == "stale":
+            self._arevalidate(key, fetch)
+            return df
+        return self._store(key, await fetch())
+
+    def invalidate(self, dataset: str = None) -> None:
+        """
+        Remove do cache as entradas de um dataset, ou todas se nenhum for informado.
+        """
+        with self._lock:
+            if dataset is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == dataset]:
+                del self._entries[key]
+
+    def _lookup(self, key: Hashable) -> tuple:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None, "miss"
+        df, stored_at = entry
+        age = time.monotonic() - stored_at
+        if age < self.ttl:
+            return df, "fresh"
+        if age < self.ttl + self.stale_ttl:
+            return df, "stale"
+        return None, "miss"
+
+    def _store(self, key: Hashable, df: pd.DataFrame) -> pd.DataFrame:
+        # DataFrame vazio indica falha na coleta: não deve ficar em cache
+        if not df.empty:
+            with self._lock:
+                self._entries[key] = (df, time.monotonic())
+        return df
+
+    def _claim_refresh(self, key: Hashable) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key: Hashable) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def _arevalidate(self, key: Hashable, fetch: Callable[[], Awaitable[pd.DataFrame]]) -> None:
+        if not self._claim_refresh(key):
+            return
+
+        async def refresh():
+            try:
+                self._store(key, await fetch())
+            except Exception as e:
+                logging.error(f"Erro ao revalidar {key} no cache: {e}")
+            finally:
+                self._release_refresh(key)
+
+        # mantém referência à task para que não seja coletada antes de terminar
+        task = asyncio.create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+scraper_cache = ScraperCache(
+    maxsize=config.SCRAPER_CACHE_MAXSIZE,
+    ttl=config.SCRAPER_CACHE_TTL,
+    stale_ttl=config.SCRAPER_CACHE_STALE_TTL,
+)
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from typing import Optional
+from app.core import config
+from app.services.response_cache import response_cache
+from app.util.auth import token_cache
+
+_task: Optional[asyncio.Task] = None
+
+
+def log_cache_stats() -> None:
+    """
+    Registra no log os contadores dos caches em memória do worker: tokens verificados e respostas serializadas.
+    """
+    logging.info(f"Cache de tokens verificados: {token_cache.stats()}")
+    logging.info(f"Cache de respostas: {response_cache.stats()}")
+
+
+async def stats_loop(interval: float) -> None:
+    """
+    Registra os contadores dos caches a cada `interval` segundos.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        log_cache_stats()
+
+
+def start_stats_logger() -> None:
+    """
+    Inicia o registro periódico dos contadores dos caches, se habilitado (CACHE_STATS_INTERVAL > 0).
+    Cada worker do gunicorn tem os seus caches e registra os próprios contadores.
+    """
+    global _task
+    if config.CACHE_STATS_INTERVAL <= 0:
+        return
+    _task = asyncio.create_task(stats_loop(config.CACHE_STATS_INTERVAL))
+
+
+async def stop_stats_logger() -> None:
+    """
+    Interrompe o registro periódico e registra os contadores uma última vez. Chamado no desligamento da aplicação.
+    """
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    log_cache_stats()
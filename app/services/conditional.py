@@ -0,0 +1,140 @@
+"""
+Respostas condicionais das rotas de dados (ETag, Last-Modified e 304 Not Modified).
+
+Os validadores de uma resposta são derivados da versão dos dados do dataset, incrementada a cada
+ingestão (app/core/versions.py), da última verificação do site (o campo "updated_at" da resposta)
+e da consulta normalizada. Assim são calculados antes de qualquer consulta ou coleta, e um cliente
+que já tem a resposta atual recebe 304 sem que os dados sejam lidos nem serializados. Os demais
+recebem, se houver, a resposta já serializada guardada em response_cache para o mesmo ETag.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request
+from fastapi.responses import Response
+from app.core.versions import get_version
+from app.services import memory_engine
+from app.services.queries import data_freshness
+from app.services.response_cache import response_cache, variant_etags
+from app.util.text import fold
+
+# Parâmetros comparados sem acentos nem maiúsculas, como os filtros de texto
+TEXT_PARAMS = {"product", "category", "group", "cultive", "country"}
+
+
+def normalized_query(request: Request) -> list:
+    """
+    Parâmetros da requisição em ordem, sem os vazios e com os filtros de texto normalizados por fold:
+    consultas que retornam a mesma resposta têm o mesmo ETag.
+    """
+    items = []
+    for key, value in request.query_params.multi_items():
+        value = value.strip()
+        if value:
+            items.append((key, fold(value) if key in TEXT_PARAMS else value))
+    return sorted(items)
+
+
+def current_version(dataset: str) -> tuple:
+    """
+    Versão dos dados que vão atender a consulta: a da tabela carregada no motor em memória,
+    se estiver em uso, ou a registrada no banco.
+    """
+    table = memory_engine.get_table(dataset)
+    if table is not None and table.version is not None:
+        return table.version
+    return get_version(dataset)
+
+
+def data_validators(request: Request, dataset: str) -> dict:
+    """
+    Calcula os cabeçalhos ETag (forte), Last-Modified e Cache-Control de uma resposta de dados.
+
+    Parâmetros:
+        request (Request): Requisição, de onde vêm os parâmetros da consulta.
+        dataset (str): Nome do dataset.
+
+    Retorna:
+        dict: Cabeçalhos da resposta, também enviados na resposta 304.
+    """
+    version, ingested_at = current_version(dataset)
+    updated_at = data_freshness(dataset)
+    payload = json.dumps([dataset, version, ingested_at, updated_at, normalized_query(request)], ensure_ascii=False)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+    modified = [datetime.fromisoformat(value) for value in (ingested_at, updated_at) if value]
+    last_modified = max(modified).astimezone(timezone.utc)
+    return {
+        "ETag": f'"{dataset}-{version}-{digest}"',
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+
+
+def requested_etags(request: Request) -> Optional[list]:
+    """
+    ETags do cabeçalho If-None-Match, sem o prefixo W/, ou None se o cabeçalho não veio.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return None
+    return [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+def is_not_modified(request: Request, headers: dict) -> bool:
+    """
+    Verifica se o cliente já tem a resposta atual (If-None-Match ou, na sua falta, If-Modified-Since,
+    quando a resposta tem Last-Modified). No If-None-Match vale o ETag de qualquer variante
+    comprimida da resposta.
+    """
+    tags = requested_etags(request)
+    if tags is not None:
+        return "*" in tags or any(etag in tags for etag in variant_etags(headers["ETag"]))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or "Last-Modified" not in headers:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return parsedate_to_datetime(headers["Last-Modified"]) <= since
+
+
+
+def cache_key(request: Request) -> tuple:
+    return request.url.path, tuple(normalized_query(request))
+
+
+def cached_response(request: Request, headers: dict) -> Optional[Response]:
+    """
+    Resposta que dispensa a consulta aos dados: 304 se o cliente já tem a resposta atual, ou a
+    resposta serializada guardada para o mesmo ETag.
+
+    Parâmetros:
+        request (Request): Requisição.
+        headers (dict): Validadores calculados por data_validators.
+
+    Retorna:
+        Response: Resposta pronta para envio, ou None se for preciso consultar os dados.
+    """
+    if is_not_modified(request, headers):
+        # o 304 repete o ETag da variante que o cliente já tem
+        tags = requested_etags(request) or []
+        etag = next((etag for etag in variant_etags(headers["ETag"]) if etag in tags), headers["ETag"])
+        return Response(status_code=304, headers=dict(headers, ETag=etag))
+    return response_cache.get(cache_key(request), headers["ETag"], request.headers.get("accept-encoding"))
+
+
+def cache_response(request: Request, response: Response) -> Response:
+    """
+    Guarda em response_cache uma resposta de dados recém gerada, se tiver ETag, e a devolve
+    comprimida conforme o Accept-Encoding do cliente.
+    """
+    if response.status_code != 200 or "etag" not in response.headers:
+        return response
+    return response_cache.put(cache_key(request), response, request.headers.get("accept-encoding"))
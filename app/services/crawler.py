@@ -0,0 +1,277 @@
+import argparse
+import asyncio
+import httpx
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Optional
+from urllib.parse import urlsplit
+from app.core import config, logging_config
+from app.core.catalog import rebuild_catalogs
+from app.services import memory_engine
+from app.services.snapshots import write_snapshots
+from app.core.db import connect
+from app.core.migrations import migrate
+from app.core.schema import ensure_schema
+from app.services.datasets import DATASETS, Dataset, page_url, parse_page
+from app.services.http_client import afetch_response, close_clients, decode_html
+from app.services import sync
+
+
+class HostRateLimiter:
+    """
+    Limita o número de requisições por segundo feitas a cada host.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url: str) -> None:
+        host = urlsplit(url).netloc
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Indica se vale a pena tentar de novo: erros de rede, 429 e 5xx.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+async def fetch_with_retry(
+    url: str,
+    limiter: HostRateLimiter,
+    retries: int,
+    backoff: float,
+    headers: Optional[dict] = None,
+) -> httpx.Response:
+    """
+    Baixa uma página respeitando o limite por host, com novas tentativas e backoff exponencial.
+
+    Parâmetros:
+        url (str): URL da página.
+        limiter (HostRateLimiter): Limitador de requisições por host.
+        retries (int): Número máximo de novas tentativas.
+        backoff (float): Espera base, em segundos, entre as tentativas.
+        headers (dict): Cabeçalhos condicionais da requisição, se houver.
+
+    Retorna:
+        httpx.Response: Resposta do site. Lança a última exceção se todas as tentativas falharem.
+    """
+    attempt = 0
+    while True:
+        await limiter.wait(url)
+        try:
+            return await afetch_response(url, headers)
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            delay = backoff * 2 ** attempt * (1 + random.random())
+            logging.warning(f"Erro ao acessar {url} ({e}), nova tentativa em {delay:.1f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+class CrawlProgress:
+    """
+    Acompanha o andamento do crawler e registra progresso e vazão no log.
+    """
+
+    def __init__(self, total: int, log_every: int = 25):
+        self.total = total
+        self.log_every = log_every
+        self.done = 0
+        self.rows = 0
+        self.empty = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+
+    def record(self, rows: Optional[int], unchanged: bool = False) -> None:
+        self.done += 1
+        if unchanged:
+            self.unchanged += 1
+        elif rows is None:
+            self.failed += 1
+        elif rows == 0:
+            self.empty += 1
+        else:
+            self.rows += rows
+        if self.done % self.log_every == 0 or self.done == self.total:
+            logging.info(self.summary())
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started_at
+        rate = self.done / elapsed if elapsed > 0 else 0
+        return (f"{self.done}/{self.total} páginas ({rate:.1f} páginas/s) - "
+                f"{self.rows} linhas, {self.empty} vazias, {self.unchanged} sem alteração, "
+                f"{self.failed} falhas, {elapsed:.0f}s")
+
+
+async def crawl(
+    datasets: list = None,
+    years: range = None,
+    concurrency: int = config.CRAWLER_CONCURRENCY,
+    rate: float = config.CRAWLER_RATE_LIMIT,
+    retries: int = config.CRAWLER_RETRIES,
+    backoff: float = config.CRAWLER_BACKOFF,
+    incremental: bool = False,
+) -> CrawlProgress:
+    """
+    Coleta todas as páginas (dataset, ano, opção) com concorrência limitada e salva no banco.
+
+    Parâmetros:
+        datasets (list): Nomes dos datasets a coletar. Padrão: todos.
+        years (range): Anos a coletar. Padrão: 1970 até o ano anterior ao atual.
+        concurrency (int): Máximo de páginas sendo baixadas ao mesmo tempo.
+        rate (float): Máximo de requisições por segundo ao site Vitibrasil.
+        retries (int): Número de novas tentativas por página.
+        backoff (float): Espera base, em segundos, entre as tentativas.
+        incremental (bool): Envia requisições condicionais, ignora páginas sem alteração
+            e regrava apenas as fatias (ano, opção) cujo conteúdo mudou. Sem ele, todas as
+            fatias coletadas são regravadas (substituídas, sem duplicar as linhas já gravadas).
+
+    Retorna:
+        CrawlProgress: Totais da execução.
+    """
+    selected = [DATASETS[name] for name in (datasets or DATASETS)]
+    years = years or range(1970, datetime.now().year)
+    pages = [(dataset, year, option) for dataset in selected for year in years for option in dataset.options]
+
+    limiter = HostRateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    progress = CrawlProgress(len(pages))
+    states = await asyncio.to_thread(sync.load_states, [dataset.name for dataset in selected]) if incremental else {}
+    changed = set()
+    # parse e gravação rodam em threads, para não travar o event loop da API durante a atualização
+    # em segundo plano; as gravações passam uma por vez, como quando rodavam no event loop
+    write_lock = asyncio.Lock()
+    logging.info(f"Iniciando crawler: {len(pages)} páginas, concorrência {concurrency}, {rate} req/s")
+
+    async def write(function, *args, **kwargs) -> None:
+        async with write_lock:
+            await asyncio.to_thread(function, *args, **kwargs)
+
+    def store(dataset: Dataset, year: int, option: Optional[int], df, content_hash: str, response: httpx.Response) -> None:
+        # a fatia (ano, opção) é substituída, nunca acrescentada: coletar de novo não duplica linhas
+        sync.replace_slice(dataset.name, year, option is not None, df)
+        sync.save_state(dataset.name, year, option, content_hash, response, changed=True, rows=len(df))
+
+    async def worker(dataset: Dataset, year: int, option: Optional[int]) -> None:
+        url = page_url(dataset, year, option)
+        state = states.get(sync.page_key(dataset.name, year, option))
+        async with semaphore:
+            try:
+                response = await fetch_with_retry(url, limiter, retries, backoff, sync.conditional_headers(state))
+            except Exception as e:
+                logging.error(f"Falha definitiva ao acessar {url}: {e}")
+                progress.record(None)
+                return
+
+        if response.status_code == 304:
+            await write(sync.save_state, dataset.name, year, option, None, response, changed=False)
+            progress.record(0, unchanged=True)
+            return
+
+        df = await asyncio.to_thread(lambda: parse_page(dataset, decode_html(response), year, option))
+        if df.empty and not sync.is_empty_table(df):
+            # página sem tabela: não apaga dados existentes nem registra estado, para tentar de novo
+            progress.record(0)
+            return
+
+        content_hash = sync.hash_dataframe(df)
+        if state and state["content_hash"] == content_hash:
+            await write(sync.save_state, dataset.name, year, option, content_hash, response, changed=False)
+            progress.record(0, unchanged=True)
+            return
+
+        if df.empty:
+            # tabela vazia no site: fica registrada (row_count = 0) para a coleta de anos ausentes não pedi-la de novo
+            await write(sync.save_state, dataset.name, year, option, content_hash, response, changed=True, rows=0)
+            progress.record(0)
+            return
+
+        await write(store, dataset, year, option, df, content_hash, response)
+        changed.add(dataset.name)
+        progress.record(len(df))
+
+    await asyncio.gather(*(worker(*page) for page in pages))
+    if changed:
+        await asyncio.to_thread(rebuild_catalogs, sorted(changed))
+        await asyncio.to_thread(write_snapshots, sorted(changed))
+        await asyncio.to_thread(memory_engine.reload, sorted(changed))
+
+    logging.info(f"Crawler finalizado: {progress.summary()}")
+    return progress
+
+
+def drop_tables(datasets: list) -> None:
+    """
+    Remove as tabelas dos datasets informados, para uma recarga completa sem duplicar linhas.
+    """
+    with connect("vitibrasil.db") as conn:
+        ensure_schema(conn, ["sync_state", "options_catalog", "catalog_version"])
+        for name in datasets:
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            for table in ("sync_state", "options_catalog", "catalog_version"):
+                conn.execute(f"DELETE FROM {table} WHERE dataset = ?", (name,))
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Carga completa do vitibrasil.db a partir do site Vitibrasil.")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS))
+    parser.add_argument("--start-year", type=int, default=1970)
+    parser.add_argument("--end-year", type=int, default=datetime.now().year - 1)
+    parser.add_argument("--concurrency", type=int, default=config.CRAWLER_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=config.CRAWLER_RATE_LIMIT, help="requisições por segundo ao site")
+    parser.add_argument("--retries", type=int, default=config.CRAWLER_RETRIES)
+    parser.add_argument("--rebuild", action="store_true", help="apaga as tabelas antes de coletar (remove também fatias que o site não tem mais)")
+    parser.add_argument("--incremental", action="store_true", help="regrava apenas as páginas que mudaram desde a última coleta")
+    args = parser.parse_args(argv)
+
+    # as fatias são gravadas com colunas numéricas: converte um banco antigo antes de coletar
+    migrate("vitibrasil.db")
+    if args.rebuild:
+        drop_tables(args.datasets)
+
+    async def run() -> None:
+        try:
+            await crawl(
+                datasets=args.datasets,
+                years=range(args.start_year, args.end_year + 1),
+                concurrency=args.concurrency,
+                rate=args.rate,
+                retries=args.retries,
+                incremental=args.incremental,
+            )
+        finally:
+            await close_clients()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    """
+        Para extrair os dados de todas as abas do site, execute no terminal:
+        python -m app.services.crawler
+
+        Para apagar as tabelas antes (removendo fatias que o site não tem mais):
+        python -m app.services.crawler --rebuild
+
+        Para atualizar apenas as páginas que mudaram desde a última coleta:
+        python -m app.services.crawler --incremental
+    """
+    logging_config()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    main()
@@ -0,0 +1,62 @@
+import pandas as pd
+from typing import Callable, NamedTuple, Optional
+from app.services.http_client import build_url
+from app.util.text import fold
+from app.services import scraper_producao, scraper_processamento, scraper_comercializacao, scraper_importacao, scraper_exportacao
+
+
+class Dataset(NamedTuple):
+    """
+    Descreve uma aba do site Vitibrasil e a tabela do banco onde seus dados são salvos.
+    """
+    name: str
+    opcao: str
+    options: tuple
+    parse: Callable
+    save: Callable
+
+
+# options = (None,) para abas sem sub-opção de produto
+DATASETS = {
+    "producao": Dataset("producao", "opt_02", (None,), scraper_producao.parse_producao, scraper_producao.save_at_db),
+    "processamento": Dataset("processamento", "opt_03", (1, 2, 3, 4), scraper_processamento.parse_processamento, scraper_processamento.save_data_db),
+    "comercializacao": Dataset("comercializacao", "opt_04", (None,), scraper_comercializacao.parse_comercializacao, scraper_comercializacao.save_data_db),
+    "importacao": Dataset("importacao", "opt_05", (1, 2, 3, 4, 5), scraper_importacao.parse_importacao, scraper_importacao.save_data_db),
+    "exportacao": Dataset("exportacao", "opt_06", (1, 2, 3, 4), scraper_exportacao.parse_exportacao, scraper_exportacao.save_data_db),
+}
+
+
+# Nome do produto gravado na coluna Product para cada sub-opção do site
+OPTION_PRODUCTS = {
+    "processamento": {1: "viníferas", 2: "americanas e híbridas", 3: "uvas de mesa", 4: "sem classificação"},
+    "importacao": {1: "vinhos de mesa", 2: "espumantes", 3: "uvas frescas", 4: "uvas passas", 5: "suco de uva"},
+    "exportacao": {1: "vinhos de mesa", 2: "espumantes", 3: "uvas frescas", 4: "suco de uva"},
+}
+
+
+def option_for_product(dataset: str, product: str) -> Optional[int]:
+    """
+    Sub-opção do site correspondente ao produto informado na rota, sem diferenciar maiúsculas
+    nem acentos ("Viniferas" -> 1 em processamento). Retorna None se o produto não existir.
+    """
+    folded = fold(product)
+    for option, name in OPTION_PRODUCTS[dataset].items():
+        if fold(name) == folded:
+            return option
+    return None
+
+
+def page_url(dataset: Dataset, year: int, option: Optional[int]) -> str:
+    """
+    Monta a URL da página (dataset, ano, opção) no site Vitibrasil.
+    """
+    return build_url(year, dataset.opcao, f"subopt_0{option}" if option else None)
+
+
+def parse_page(dataset: Dataset, html: str, year: int, option: Optional[int]) -> pd.DataFrame:
+    """
+    Extrai a tabela de uma página (dataset, ano, opção) já baixada.
+    """
+    if option is None:
+        return dataset.parse(html, year)
+    return dataset.parse(html, year, option)
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterator, Optional
+from app.core import config
+from app.services.queries import DATASET_COLUMNS, iter_dataset
+
+# Formatos das rotas */export: {formato: (Content-Type, extensão do arquivo)}
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def encode_ndjson(columns: tuple, rows: list) -> bytes:
+    """
+    Um objeto JSON por linha, com as colunas do banco e os números como inteiros (null se não disponível).
+    """
+    return "".join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+def encode_csv(rows: list) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def export_stream(
+    dataset: str,
+    fmt: str,
+    compress: bool = False,
+    years: Optional[list] = None,
+    contains: Optional[dict] = None,
+) -> Iterator[bytes]:
+    """
+    Gera o conteúdo de uma exportação em blocos, à medida que as linhas são lidas do banco.
+
+    A memória usada é a de um bloco de EXPORT_CHUNK_ROWS linhas, qualquer que seja o tamanho da tabela.
+
+    Parâmetros:
+        dataset (str): Nome da tabela.
+        fmt (str): Formato, de EXPORT_FORMATS.
+        compress (bool): Se True, o conteúdo sai comprimido em gzip.
+        years (list): Anos, em ordem crescente, como em query_dataset.
+        contains (dict): {coluna: texto} buscados em qualquer parte do valor.
+
+    Retorna:
+        Iterator[bytes]: Blocos do arquivo exportado.
+    """
+    columns = DATASET_COLUMNS[dataset]
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def output(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    if fmt == "csv":
+        yield output(encode_csv([columns]))
+    for rows in iter_dataset(dataset, config.EXPORT_CHUNK_ROWS, contains=contains, years=years):
+        chunk = output(encode_ndjson(columns, rows) if fmt == "ndjson" else encode_csv(rows))
+        if chunk:
+            yield chunk
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,120 @@
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional
+from app.core import config
+
+_session: Optional[requests.Session] = None
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def build_url(year: int, opcao: str, subopcao: Optional[str] = None) -> str:
+    """
+    Monta a URL de uma página do Vitibrasil.
+
+    Parâmetros:
+        year (int): Ano do filtro da tabela.
+        opcao (str): Aba do site (ex.: opt_02).
+        subopcao (str): Sub-aba do site (ex.: subopt_01), quando existir.
+
+    Retorna:
+        str: URL da página.
+    """
+    url = f"{config.VITIBRASIL_URL}?ano={year}&opcao={opcao}"
+    if subopcao:
+        url += f"&subopcao={subopcao}"
+    return url
+
+
+def get_session() -> requests.Session:
+    """
+    Retorna a sessão HTTP síncrona compartilhada pelo worker (conexões keep-alive reaproveitadas).
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.HTTP_MAX_CONNECTIONS)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Retorna o cliente HTTP assíncrono compartilhado pelo worker (pool de conexões keep-alive).
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(config.HTTP_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.HTTP_MAX_CONNECTIONS,
+            ),
+        )
+    return _async_client
+
+
+def fetch_html(url: str) -> str:
+    """
+    Baixa uma página do Vitibrasil de forma síncrona.
+
+    Parâmetros:
+        url (str): URL da página.
+
+    Retorna:
+        str: HTML da página. Lança exceção em caso de erro HTTP ou timeout.
+    """
+    response = get_session().get(url, timeout=(config.HTTP_CONNECT_TIMEOUT, config.HTTP_TIMEOUT))
+    response.raise_for_status()
+    return response.content.decode("utf-8", errors="replace")
+
+
+async def afetch_html(url: str) -> str:
+    """
+    Baixa uma página do Vitibrasil sem bloquear o event loop.
+
+    Parâmetros:
+        url (str): URL da página.
+
+    Retorna:
+        str: HTML da página. Lança exceção em caso de erro HTTP ou timeout.
+    """
+    return decode_html(await afetch_response(url))
+
+
+async def afetch_response(url: str, headers: Optional[dict] = None) -> httpx.Response:
+    """
+    Faz a requisição de uma página do Vitibrasil e devolve a resposta completa (com cabeçalhos).
+
+    Parâmetros:
+        url (str): URL da página.
+        headers (dict): Cabeçalhos extras, como If-None-Match e If-Modified-Since.
+
+    Retorna:
+        httpx.Response: Resposta do site. 304 Not Modified não é tratado como erro.
+    """
+    response = await get_async_client().get(url, headers=headers)
+    if response.status_code != 304:
+        response.raise_for_status()
+    return response
+
+
+def decode_html(response: httpx.Response) -> str:
+    """
+    Decodifica o corpo da resposta como UTF-8, encoding usado pelo site Vitibrasil.
+    """
+    return response.content.decode("utf-8", errors="replace")
+
+
+async def close_clients() -> None:
+    """
+    Fecha os clientes HTTP compartilhados. Chamado no desligamento da aplicação.
+    """
+    global _session, _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _session is not None:
+        _session.close()
+        _session = None
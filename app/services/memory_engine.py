@@ -0,0 +1,251 @@
+"""
+Motor de consulta em memória para as rotas de dados (QUERY_ENGINE=memory).
+
+Cada tabela do vitibrasil.db é carregada em arrays numpy, uma por coluna, em ordem (Year, id):
+Year e as colunas numéricas como inteiros e as colunas de texto codificadas em dicionário
+(um código inteiro por linha e a lista de valores distintos). Os filtros das rotas viram
+máscaras booleanas vetorizadas; os filtros de texto são resolvidos sobre o dicionário, que
+tem poucas centenas de valores, e aplicados às linhas por indexação dos códigos.
+
+As tabelas são recarregadas ao final de cada ingestão neste processo (reload) e, nos demais
+workers, quando a versão do catálogo (catalog_version) muda, verificada a cada
+MEMORY_ENGINE_CHECK_INTERVAL segundos. A troca é atômica: consultas em andamento continuam
+com a versão anterior da tabela.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+import numpy as np
+from app.core import config
+from app.core.catalog import catalog_markers
+from app.core.db import connect
+from app.core.schema import DATASET_COLUMNS, NUMERIC_COLUMNS
+from app.core.versions import dataset_versions
+from app.services.pagination import encode_cursor
+from app.util.helpers import format_br_number
+from app.util.text import fold
+
+# Textos de filtro resolvidos por coluna, guardados por tabela
+MATCH_CACHE_SIZE = 1024
+
+# Tabelas carregadas: {dataset: ColumnarTable}. Substituído inteiro a cada recarga.
+_tables = {}
+_reload_lock = threading.Lock()
+_last_check = 0.0
+
+
+class ColumnarTable:
+    """
+    Uma tabela do vitibrasil.db em arrays numpy, em ordem (Year, id).
+    """
+
+    def __init__(self, dataset: str, rows: list, marker: Optional[tuple] = None, version: Optional[tuple] = None):
+        self.dataset = dataset
+        self.columns = DATASET_COLUMNS[dataset]
+        self.marker = marker
+        # versão dos dados carregados (app/core/versions.py), usada nos ETags das respostas
+        self.version = version
+        self.size = len(rows)
+        numeric = NUMERIC_COLUMNS[dataset]
+
+        data = list(zip(*rows)) if rows else [()] * (len(self.columns) + 1)
+        self.ids = np.array(data[-1], dtype=np.int64)
+        self.arrays = {}
+        self.nulls = {}
+        self.dictionaries = {}
+        self.folded = {}
+        self.codes_by_value = {}
+        self._matches = {}
+        for column, values in zip(self.columns, data):
+            if column == "Year":
+                # int64, como os inteiros do Python: evita a conversão de tipo a cada busca binária
+                self.arrays[column] = np.array(values, dtype=np.int64)
+            elif column in numeric:
+                nulls = np.array([value is None for value in values], dtype=bool)
+                self.arrays[column] = np.array([0 if value is None else value for value in values], dtype=np.int64)
+                self.nulls[column] = nulls
+            else:
+                dictionary = list(dict.fromkeys(values))
+                codes_by_value = {value: code for code, value in enumerate(dictionary)}
+                self.arrays[column] = np.array([codes_by_value[value] for value in values], dtype=np.int32)
+                self.dictionaries[column] = np.array(dictionary, dtype=object)
+                self.folded[column] = [None if value is None else fold(value) for value in dictionary]
+                self.codes_by_value[column] = codes_by_value
+
+    def _contains(self, column: str, text: str) -> np.ndarray:
+        """
+        Entradas do dicionário da coluna que contêm o texto, sem diferenciar maiúsculas nem acentos
+        (a mesma regra do índice de busca usado nas consultas ao banco).
+        """
+        key = (column, fold(text))
+        hits = self._matches.get(key)
+        if hits is None:
+            hits = np.array([value is not None and key[1] in value for value in self.folded[column]], dtype=bool)
+            if len(self._matches) >= MATCH_CACHE_SIZE:
+                self._matches.clear()
+            self._matches[key] = hits
+        return hits
+
+    def _year_bounds(self, first: int, last: int) -> tuple:
+        """
+        Intervalo [início, fim) das linhas dos anos first..last (as linhas estão em ordem de Year).
+        """
+        year_column = self.arrays["Year"]
+        return int(np.searchsorted(year_column, first, "left")), int(np.searchsorted(year_column, last, "right"))
+
+    def select(
+        self,
+        year: Optional[int] = None,
+        exact: Optional[dict] = None,
+        contains: Optional[dict] = None,
+        years: Optional[list] = None,
+        after: Optional[tuple] = None,
+    ) -> np.ndarray:
+        """
+        Posições das linhas que atendem aos filtros, com a mesma semântica de queries._filters,
+        a partir da chave (Year, id) do cursor, se informada.
+
+        Os filtros de ano e o cursor viram uma fatia contínua (busca binária sobre Year); as
+        máscaras dos demais filtros são calculadas apenas sobre essa fatia.
+        """
+        start, end = 0, self.size
+        if year is not None:
+            start, end = self._year_bounds(year, year)
+        if years:
+            first, last = self._year_bounds(years[0], years[-1])
+            start, end = max(start, first), min(end, last)
+        if after is not None:
+            first, last = self._year_bounds(after[0], after[0])
+            start = max(start, first + int(np.searchsorted(self.ids[first:last], after[1], "right")))
+        if start >= end:
+            return np.empty(0, dtype=np.int64)
+
+        mask = None
+
+        def narrow(condition: np.ndarray) -> None:
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        if years and years[-1] - years[0] + 1 != len(years):
+            # anos avulsos: cada ano é uma fatia contínua dentro do intervalo
+            selected = np.zeros(end - start, dtype=bool)
+            for selected_year in years:
+                first, last = self._year_bounds(selected_year, selected_year)
+                selected[max(first - start, 0):max(last - start, 0)] = True
+            narrow(selected)
+        for column, value in (exact or {}).items():
+            code = self.codes_by_value[column].get(value)
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            narrow(self.arrays[column][start:end] == code)
+        for column, text in (contains or {}).items():
+            if text:
+                narrow(self._contains(column, text)[self.arrays[column][start:end]])
+
+        if mask is None:
+            return np.arange(start, end)
+        return start + np.flatnonzero(mask)
+
+    def records(self, index: np.ndarray, numeric: bool = True) -> list:
+        """
+        Converte as linhas selecionadas em dicionários com as colunas de DATASET_COLUMNS.
+        Com numeric=False, as colunas numéricas são formatadas no texto do site, coluna a coluna.
+        """
+        values = []
+        for column in self.columns:
+            if column in self.dictionaries:
+                values.append(self.dictionaries[column][self.arrays[column][index]].tolist())
+                continue
+            selected = self.arrays[column][index].tolist()
+            nulls = self.nulls.get(column)
+            if nulls is not None:
+                # coluna numérica
+                for position in np.flatnonzero(nulls[index]).tolist():
+                    selected[position] = None
+                if not numeric:
+                    selected = [format_br_number(value) for value in selected]
+            values.append(selected)
+        return [dict(zip(self.columns, row)) for row in zip(*values)]
+
+    def page(self, index: np.ndarray, limit: Optional[int], numeric: bool = True) -> tuple:
+        """
+        Converte as linhas selecionadas em uma página, como queries.query_page.
+
+        Retorna:
+            tuple: (registros, cursor da próxima página ou None).
+        """
+        if not limit or len(index) <= limit:
+            return self.records(index, numeric), None
+        index = index[:limit]
+        last = index[-1]
+        return self.records(index, numeric), encode_cursor(int(self.arrays["Year"][last]), int(self.ids[last]))
+
+
+def load_table(conn: sqlite3.Connection, dataset: str, marker: Optional[tuple] = None, version: Optional[tuple] = None) -> ColumnarTable:
+    columns = DATASET_COLUMNS[dataset]
+    rows = conn.execute(f"SELECT {', '.join(columns)}, id FROM {dataset} ORDER BY Year, id").fetchall()
+    return ColumnarTable(dataset, rows, marker, version)
+
+
+def reload(datasets: list = None) -> None:
+    """
+    Carrega (ou recarrega) em memória as tabelas dos datasets informados, trocando-as de uma vez.
+    Não faz nada se o motor em memória não estiver habilitado.
+
+    Parâmetros:
+        datasets (list): Datasets a recarregar. Padrão: todos.
+    """
+    global _tables, _last_check
+    if config.QUERY_ENGINE != "memory":
+        return
+    start = time.perf_counter()
+    datasets = datasets or list(DATASET_COLUMNS)
+    with _reload_lock:
+        tables = dict(_tables)
+        with connect("vitibrasil.db", readonly=True) as conn:
+            markers = catalog_markers(conn)
+            versions = dataset_versions(conn)
+            for dataset in datasets:
+                try:
+                    tables[dataset] = load_table(conn, dataset, markers.get(dataset), versions.get(dataset))
+                except sqlite3.OperationalError:
+                    # tabela do dataset ainda não existe: as consultas seguem para o banco
+                    tables.pop(dataset, None)
+        _tables = tables
+        _last_check = time.monotonic()
+    rows = sum(tables[dataset].size for dataset in datasets if dataset in tables)
+    logging.info(f"Motor em memória: {', '.join(datasets)} carregados ({rows} linhas) em {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def refresh_if_changed() -> None:
+    """
+    Recarrega as tabelas cuja marca de ingestão mudou no banco (ingestão feita por outro processo).
+    Verifica no máximo a cada MEMORY_ENGINE_CHECK_INTERVAL segundos; se outra thread já estiver
+    recarregando, segue com as tabelas atuais.
+    """
+    global _last_check
+    if time.monotonic() - _last_check < config.MEMORY_ENGINE_CHECK_INTERVAL:
+        return
+    if not _reload_lock.acquire(blocking=False):
+        return
+    try:
+        _last_check = time.monotonic()
+        with connect("vitibrasil.db", readonly=True) as conn:
+            markers = catalog_markers(conn)
+    finally:
+        _reload_lock.release()
+    stale = [dataset for dataset, table in _tables.items() if markers.get(dataset) != table.marker]
+    if stale:
+        reload(stale)
+
+
+def get_table(dataset: str) -> Optional[ColumnarTable]:
+    """
+    Tabela em memória do dataset, ou None se o motor não estiver habilitado ou carregado.
+    """
+    if config.QUERY_ENGINE != "memory" or not _tables:
+        return None
+    refresh_if_changed()
+    return _tables.get(dataset)
@@ -0,0 +1,79 @@
+import base64
+import binascii
+import json
+from typing import Optional
+from app.core import config
+
+
+def encode_cursor(year: int, key: int) -> str:
+    """
+    Gera o cursor opaco de uma página: a posição (ano, chave) da última linha retornada.
+    """
+    payload = json.dumps([year, key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    """
+    Lê um cursor gerado por encode_cursor.
+
+    Retorna:
+        tuple: (ano, chave), ou None se nenhum cursor foi informado.
+
+    Raises:
+        ValueError: Cursor malformado.
+    """
+    if not cursor:
+        return None
+    try:
+        year, key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError("Cursor inválido; use o valor de 'next' da página anterior")
+    if not isinstance(year, int) or not isinstance(key, int):
+        raise ValueError("Cursor inválido; use o valor de 'next' da página anterior")
+    return year, key
+
+
+def page_size(limit: Optional[int], after: Optional[tuple]) -> Optional[int]:
+    """
+    Linhas por página de uma requisição: o limit informado; sem ele, PAGE_SIZE_DEFAULT,
+    ou PAGE_SIZE_MAX quando há cursor. None significa resposta completa.
+    """
+    if limit:
+        return limit
+    if after is not None:
+        return config.PAGE_SIZE_DEFAULT or config.PAGE_SIZE_MAX
+    return config.PAGE_SIZE_DEFAULT or None
+
+
+def paginate_records(data: list, limit: Optional[int], after: Optional[tuple] = None) -> tuple:
+    """
+    Pagina registros coletados do site (modo "live").
+
+    As páginas do site não têm id; a chave de cada registro é sua posição entre os registros
+    do mesmo ano, que se mantém enquanto a página do site em cache não muda.
+
+    Parâmetros:
+        data (list): Registros, agrupados por ano na ordem das páginas do site.
+        limit (int): Linhas por página, ou None para retornar tudo.
+        after (tuple): (ano, posição) do cursor recebido.
+
+    Retorna:
+        tuple: (registros da página, cursor da próxima página ou None).
+    """
+    if not limit:
+        return data, None
+    page = []
+    positions = {}
+    last = None
+    for row in data:
+        year = row["Year"]
+        position = positions.get(year, 0)
+        positions[year] = position + 1
+        if after is not None and (year, position) <= after:
+            continue
+        if len(page) == limit:
+            return page, encode_cursor(*last)
+        page.append(row)
+        last = (year, position)
+    return page, None
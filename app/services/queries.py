@@ -0,0 +1,297 @@
+import os
+import sqlite3
+from app.core.db import connect
+from app.core.schema import DATASET_COLUMNS
+from app.services import memory_engine
+from app.services.pagination import encode_cursor
+from app.services.search_index import match_values
+from app.util.helpers import build_records
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+
+
+# Dimensões aceitas nas agregações e nos filtros da exportação: {nome na rota: coluna}
+DATASET_DIMENSIONS = {
+    "producao": {"year": "Year", "group": "Category", "product": "Product"},
+    "processamento": {"year": "Year", "group": "GroupName", "cultive": "Cultive", "product": "Product"},
+    "comercializacao": {"year": "Year", "group": "GroupName", "product": "Product"},
+    "importacao": {"year": "Year", "country": "Country", "product": "Product"},
+    "exportacao": {"year": "Year", "country": "Country", "product": "Product"},
+}
+
+# Colunas numéricas que podem ser agregadas: {nome na rota: coluna}
+AGGREGATE_VALUES = {
+    "producao": {"quantity": "Quantity_L"},
+    "processamento": {"quantity": "Quantity_Kg"},
+    "comercializacao": {"quantity": "Quantity_L"},
+    "importacao": {"quantity": "Quantity_Kg", "value": "Value_USD"},
+    "exportacao": {"quantity": "Quantity_Kg", "value": "Value_USD"},
+}
+
+AGGREGATE_METRICS = {"sum": "SUM", "avg": "AVG", "min": "MIN", "max": "MAX"}
+
+# As tabelas guardam também as linhas de total do site (total do grupo/categoria e o "total" geral).
+# As agregações usam apenas as linhas de detalhe; a linha do grupo só entra quando o grupo não tem itens.
+DETAIL_ROWS = {
+    "producao": """t.Product <> 'total' AND (t.Product <> 'todos da categoria' OR NOT EXISTS (
+        SELECT 1 FROM producao s WHERE s.Year = t.Year AND s.Category = t.Category AND s.Product NOT IN ('todos da categoria', 'total')))""",
+    "processamento": """(t.Cultive <> t.GroupName OR NOT EXISTS (
+        SELECT 1 FROM processamento s WHERE s.Year = t.Year AND s.GroupName = t.GroupName AND s.Product IS t.Product AND s.Cultive <> s.GroupName))""",
+    "comercializacao": """(t.Product <> t.GroupName OR NOT EXISTS (
+        SELECT 1 FROM comercializacao s WHERE s.Year = t.Year AND s.GroupName = t.GroupName AND s.Product <> s.GroupName))""",
+    "importacao": "t.Country <> 'total'",
+    "exportacao": "t.Country <> 'total'",
+}
+
+def _filters(
+    dataset: str,
+    year: Optional[int] = None,
+    exact: Optional[dict] = None,
+    contains: Optional[dict] = None,
+    years: Optional[list] = None,
+) -> tuple:
+    """
+    Monta as condições WHERE das rotas de dados.
+
+    Retorna:
+        tuple: (trecho SQL começando por " AND", lista de parâmetros).
+    """
+    where = ""
+    params = []
+
+    if year is not None:
+        where += " AND Year = ?"
+        params.append(year)
+
+    if years:
+        if years[-1] - years[0] + 1 == len(years):
+            where += " AND Year BETWEEN ? AND ?"
+            params.extend((years[0], years[-1]))
+        else:
+            where += f" AND Year IN ({', '.join('?' for _ in years)})"
+            params.extend(years)
+
+    for column, value in (exact or {}).items():
+        where += f" AND {column} = ?"
+        params.append(value)
+
+    for column, value in (contains or {}).items():
+        if value:
+            # o índice de busca resolve o texto, sem acentos nem maiúsculas, nos valores gravados
+            values = match_values(dataset, column, value)
+            if not values:
+                where += " AND 0"
+                continue
+            where += f" AND {column} IN ({', '.join('?' for _ in values)})"
+            params.extend(values)
+
+    return where, params
+
+
+def query_dataset(
+    dataset: str,
+    year: Optional[int] = None,
+    exact: Optional[dict] = None,
+    contains: Optional[dict] = None,
+    years: Optional[list] = None,
+    numeric: bool = True,
+) -> list:
+    """
+    Consulta uma tabela do vitibrasil.db com os filtros das rotas de dados.
+
+    Parâmetros:
+        dataset (str): Nome da tabela.
+        year (int): Ano, se informado.
+        exact (dict): {coluna: valor} comparados por igualdade.
+        contains (dict): {coluna: texto} buscados em qualquer parte do valor, sem diferenciar maiúsculas nem acentos.
+        years (list): Anos, em ordem crescente. Um intervalo contínuo vira um único BETWEEN
+            sobre os índices que começam por Year; anos avulsos, um IN.
+        numeric (bool): Se False, as colunas numéricas saem no formato texto do site, formatadas
+            na mesma passada que monta os registros.
+
+    Retorna:
+        list: Lista de dicionários com as colunas de DATASET_COLUMNS.
+    """
+    table = memory_engine.get_table(dataset)
+    if table is not None:
+        return table.records(table.select(year, exact, contains, years), numeric)
+
+    columns = DATASET_COLUMNS[dataset]
+    where, params = _filters(dataset, year, exact, contains, years)
+    # mesma ordem da paginação (query_page) e do motor em memória, qualquer que seja o índice usado
+    query = f"SELECT {', '.join(columns)} FROM {dataset} WHERE 1=1{where} ORDER BY Year, id"
+
+    with connect("vitibrasil.db", readonly=True) as conn:
+        rows = conn.execute(query, params).fetchall()
+    return build_records(columns, rows, dataset, numeric)
+
+
+def query_page(
+    dataset: str,
+    limit: Optional[int] = None,
+    after: Optional[tuple] = None,
+    year: Optional[int] = None,
+    exact: Optional[dict] = None,
+    contains: Optional[dict] = None,
+    years: Optional[list] = None,
+    numeric: bool = True,
+) -> tuple:
+    """
+    Consulta uma página de uma tabela do vitibrasil.db, com paginação por chave (keyset).
+
+    As linhas seguem a ordem (Year, id) e cada página começa logo depois da chave do cursor,
+    com um intervalo sobre os índices que começam por Year: o custo de uma página não depende
+    de quantas páginas vieram antes nem de quantas linhas o filtro alcança.
+
+    Parâmetros:
+        dataset (str): Nome da tabela.
+        limit (int): Linhas por página. Sem ele, retorna todas as linhas, como query_dataset.
+        after (tuple): (Year, id) da última linha da página anterior, lido do cursor.
+        year, exact, contains, years: Filtros, como em query_dataset.
+
+    Retorna:
+        tuple: (lista de dicionários com as colunas de DATASET_COLUMNS, cursor da próxima página ou None).
+    """
+    if not limit:
+        return query_dataset(dataset, year, exact, contains, years, numeric), None
+    table = memory_engine.get_table(dataset)
+    if table is not None:
+        return table.page(table.select(year, exact, contains, years, after), limit, numeric)
+
+    columns = DATASET_COLUMNS[dataset]
+    where, params = _filters(dataset, year, exact, contains, years)
+    if after is not None:
+        where += " AND Year >= ? AND (Year, id) > (?, ?)"
+        params.extend((after[0], after[0], after[1]))
+    query = f"SELECT {', '.join(columns)}, id FROM {dataset} WHERE 1=1{where} ORDER BY Year, id LIMIT ?"
+    params.append(limit + 1)
+
+    with connect("vitibrasil.db", readonly=True) as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0], rows[-1][-1])
+    return build_records(columns, rows, dataset, numeric), next_cursor
+
+
+def iter_dataset(
+    dataset: str,
+    chunk_size: int,
+    year: Optional[int] = None,
+    exact: Optional[dict] = None,
+    contains: Optional[dict] = None,
+    years: Optional[list] = None,
+    ordered: bool = False,
+) -> Iterator[list]:
+    """
+    Lê uma tabela do vitibrasil.db em blocos, direto do cursor, sem carregar o resultado inteiro.
+
+    A conexão fica emprestada do pool enquanto o gerador é consumido, e a leitura inteira vê
+    um único snapshot do banco. Sem `ordered`, não há ORDER BY: as linhas saem na ordem em que
+    o SQLite as percorre, para que nenhuma ordenação precise guardar o resultado.
+
+    Parâmetros:
+        dataset (str): Nome da tabela.
+        chunk_size (int): Linhas por bloco (fetchmany).
+        year, exact, contains, years: Filtros, como em query_dataset.
+        ordered (bool): Se True, as linhas saem na ordem (Year, id).
+
+    Retorna:
+        Iterator[list]: Blocos de tuplas com as colunas de DATASET_COLUMNS.
+    """
+    where, params = _filters(dataset, year, exact, contains, years)
+    query = f"SELECT {', '.join(DATASET_COLUMNS[dataset])} FROM {dataset} WHERE 1=1{where}"
+    if ordered:
+        query += " ORDER BY Year, id"
+    with connect("vitibrasil.db", readonly=True) as conn:
+        cursor = conn.execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+
+def data_freshness(dataset: str) -> Optional[str]:
+    """
+    Retorna quando os dados de um dataset foram verificados no site pela última vez (ISO 8601, UTC).
+
+    Usa a última verificação registrada em sync_state; se não houver, a data de modificação do vitibrasil.db.
+    """
+    try:
+        with connect("vitibrasil.db", readonly=True) as conn:
+            row = conn.execute("SELECT MAX(checked_at) FROM sync_state WHERE dataset = ?", (dataset,)).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+
+    if row and row[0]:
+        return row[0]
+    if os.path.exists("vitibrasil.db"):
+        modified = datetime.fromtimestamp(os.path.getmtime("vitibrasil.db"), tz=timezone.utc)
+        return modified.isoformat(timespec="seconds")
+    return None
+
+
+def aggregate_dataset(
+    dataset: str,
+    group_by: list,
+    metrics: list,
+    value: str = "quantity",
+    years: Optional[list] = None,
+    contains: Optional[dict] = None,
+    top: Optional[int] = None,
+) -> list:
+    """
+    Agrega uma tabela do vitibrasil.db em SQL (GROUP BY), retornando poucas linhas.
+
+    Parâmetros:
+        dataset (str): Nome da tabela.
+        group_by (list): Dimensões de DATASET_DIMENSIONS; vazia agrega a tabela inteira.
+        metrics (list): Funções de AGGREGATE_METRICS. A primeira ordena o top-N.
+        value (str): Coluna agregada, de AGGREGATE_VALUES.
+        years (list): Anos, em ordem crescente, como em query_dataset.
+        contains (dict): {dimensão: texto} buscados em qualquer parte do valor, sem diferenciar maiúsculas nem acentos.
+        top (int): Se informado, retorna os `top` grupos com maior valor da primeira métrica.
+
+    Retorna:
+        list: Lista de dicionários {coluna da dimensão: valor, métrica: resultado}.
+
+    Raises:
+        ValueError: Dimensão, métrica ou coluna não disponível no dataset.
+    """
+    dimensions = DATASET_DIMENSIONS[dataset]
+    unknown = [name for name in list(group_by) + list(contains or {}) if name not in dimensions]
+    if unknown:
+        raise ValueError(f"Dimensões não disponíveis em {dataset}: {', '.join(unknown)}. Use: {', '.join(dimensions)}")
+    unknown = [name for name in metrics if name not in AGGREGATE_METRICS]
+    if unknown or not metrics:
+        raise ValueError(f"Métricas inválidas: {', '.join(unknown) or 'nenhuma'}. Use: {', '.join(AGGREGATE_METRICS)}")
+    if value not in AGGREGATE_VALUES[dataset]:
+        raise ValueError(f"Valor não disponível em {dataset}: {value}. Use: {', '.join(AGGREGATE_VALUES[dataset])}")
+
+    columns = list(dict.fromkeys(dimensions[name] for name in group_by))
+    target = AGGREGATE_VALUES[dataset][value]
+    selected = [f"t.{column}" for column in columns]
+    selected += [f"{AGGREGATE_METRICS[name]}(t.{target}) AS {name}" for name in metrics]
+    # as colunas sem prefixo dos filtros se referem a t: as subconsultas de DETAIL_ROWS têm escopo próprio
+    where, params = _filters(dataset, contains={dimensions[name]: text for name, text in (contains or {}).items()}, years=years)
+    query = f"SELECT {', '.join(selected)} FROM {dataset} AS t WHERE {DETAIL_ROWS[dataset]}{where}"
+
+    if columns:
+        query += f" GROUP BY {', '.join(f't.{column}' for column in columns)}"
+    if top:
+        query += f" ORDER BY {metrics[0]} DESC LIMIT ?"
+        params.append(top)
+    elif columns:
+        query += f" ORDER BY {', '.join(f't.{column}' for column in columns)}"
+
+    with connect("vitibrasil.db", readonly=True) as conn:
+        rows = conn.execute(query, params).fetchall()
+    keys = columns + list(metrics)
+    return [dict(zip(keys, row)) for row in rows]
@@ -0,0 +1,83 @@
+import asyncio
+import fcntl
+import logging
+import sqlite3
+from datetime import datetime, timezone
+from typing import Optional
+from app.core import config
+from app.core.db import connect
+from app.services.crawler import crawl
+
+_task: Optional[asyncio.Task] = None
+_lock_file = None
+
+
+def seconds_since_last_refresh() -> Optional[float]:
+    """
+    Retorna há quantos segundos o banco foi verificado no site pela última vez, ou None se nunca foi.
+    """
+    try:
+        with connect("vitibrasil.db", readonly=True) as conn:
+            row = conn.execute("SELECT MIN(last_check) FROM (SELECT MAX(checked_at) AS last_check FROM sync_state GROUP BY dataset)").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if not row or not row[0]:
+        return None
+    return (datetime.now(timezone.utc) - datetime.fromisoformat(row[0])).total_seconds()
+
+
+def acquire_refresh_lock() -> bool:
+    """
+    Garante que apenas um worker do gunicorn faça a atualização em segundo plano.
+    """
+    global _lock_file
+    _lock_file = open("vitibrasil.refresh.lock", "w")
+    try:
+        fcntl.flock(_lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        _lock_file.close()
+        _lock_file = None
+        return False
+
+
+async def refresh_loop(interval: float) -> None:
+    """
+    Atualiza o vitibrasil.db a partir do site Vitibrasil a cada `interval` segundos, de forma incremental.
+    """
+    while True:
+        elapsed = seconds_since_last_refresh()
+        delay = 30 if elapsed is None else max(30, interval - elapsed)
+        logging.info(f"Próxima atualização do banco em {delay:.0f}s")
+        await asyncio.sleep(delay)
+        try:
+            await crawl(incremental=True)
+        except Exception as e:
+            logging.error(f"Erro na atualização do banco em segundo plano: {e}")
+
+
+def start_refresher() -> None:
+    """
+    Inicia a atualização do banco em segundo plano, se habilitada (REFRESH_INTERVAL > 0).
+    """
+    global _task
+    if config.REFRESH_INTERVAL <= 0 or not acquire_refresh_lock():
+        return
+    _task = asyncio.create_task(refresh_loop(config.REFRESH_INTERVAL))
+
+
+async def stop_refresher() -> None:
+    """
+    Interrompe a atualização em segundo plano. Chamado no desligamento da aplicação.
+    """
+    global _task, _lock_file
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    if _lock_file is not None:
+        _lock_file.close()
+        _lock_file = None
@@ -0,0 +1,200 @@
+"""
+Cache das respostas já serializadas das rotas de dados.
+
+Guarda os bytes finais do corpo JSON de cada consulta (rota e parâmetros normalizados) e, sob
+demanda, as variantes comprimidas em gzip e brotli, escolhidas pelo Accept-Encoding do cliente.
+Cada entrada fica associada ao ETag da resposta: quando a versão dos dados muda, o ETag muda e
+a entrada é descartada na próxima consulta. As variantes comprimidas saem com o ETag da resposta
+acrescido da codificação ("...-gzip", "...-br"), já que o ETag é forte e os bytes são outros. O cache é limitado pelo total de bytes guardados,
+com descarte LRU.
+"""
+import gzip
+import threading
+from typing import Hashable, Optional
+from cachetools import LRUCache
+from fastapi.responses import Response
+from app.core import config
+
+try:
+    import brotli
+except ImportError:  # sem o pacote Brotli, as respostas saem apenas em gzip
+    brotli = None
+
+# Corpos menores que isso saem sem compressão (como no GZipMiddleware do Starlette)
+MIN_COMPRESS_SIZE = 500
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def accepted_encodings(header: str) -> set:
+    """
+    Codificações aceitas pelo cliente no cabeçalho Accept-Encoding (as com q=0 ficam de fora).
+    """
+    encodings = set()
+    for item in header.lower().split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name.strip() and quality > 0:
+            encodings.add(name.strip())
+    return encodings
+
+
+def choose_encoding(header: Optional[str]) -> Optional[str]:
+    """
+    Escolhe a compressão da resposta: brotli, se disponível e aceito, senão gzip, senão nenhuma.
+    """
+    if not header:
+        return None
+    encodings = accepted_encodings(header)
+    if brotli is not None and "br" in encodings:
+        return "br"
+    if "gzip" in encodings or "*" in encodings:
+        return "gzip"
+    return None
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """
+    ETag de uma variante da resposta: o próprio ETag sem compressão, ou com o sufixo da codificação.
+    """
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def variant_etags(etag: str) -> list:
+    """
+    ETags de todas as variantes que uma resposta pode ter (sem compressão, gzip e brotli).
+    """
+    return [variant_etag(etag, encoding) for encoding in (None, "gzip", "br")]
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class CachedResponse:
+    """
+    Corpo serializado de uma resposta, seus cabeçalhos e as variantes comprimidas já calculadas.
+    """
+
+    def __init__(self, body: bytes, headers: dict, media_type: str):
+        self.body = body
+        self.headers = headers
+        self.etag = headers.get("etag")
+        self.media_type = media_type
+        self.variants = {None: body}
+
+    @property
+    def size(self) -> int:
+        return sum(len(body) for body in self.variants.values())
+
+    def render(self, encoding: Optional[str]) -> tuple:
+        """
+        Corpo na codificação pedida, comprimindo-o na primeira vez.
+
+        Retorna:
+            tuple: (corpo, codificação usada, True se a variante foi criada agora).
+        """
+        if encoding is None or len(self.body) < MIN_COMPRESS_SIZE:
+            return self.body, None, False
+        body = self.variants.get(encoding)
+        if body is not None:
+            return body, encoding, False
+        body = compress(self.body, encoding)
+        self.variants[encoding] = body
+        return body, encoding, True
+
+    def response(self, accept_encoding: Optional[str]) -> tuple:
+        body, encoding, created = self.render(choose_encoding(accept_encoding))
+        headers = dict(self.headers, Vary="Accept-Encoding")
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            headers["etag"] = variant_etag(self.etag, encoding)
+        return Response(content=body, status_code=200, media_type=self.media_type, headers=headers), created
+
+
+class ResponseCache:
+    """
+    Cache LRU de respostas serializadas, limitado pelo total de bytes dos corpos guardados.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = LRUCache(maxsize=max(max_bytes, 1), getsizeof=lambda entry: entry.size)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, etag: str, accept_encoding: Optional[str] = None) -> Optional[Response]:
+        """
+        Retorna a resposta guardada para a consulta, se ainda for da versão atual dos dados.
+
+        Parâmetros:
+            key (Hashable): Rota e parâmetros normalizados da consulta.
+            etag (str): ETag atual da consulta.
+            accept_encoding (str): Cabeçalho Accept-Encoding do cliente.
+
+        Retorna:
+            Response: Resposta pronta para envio, ou None se não houver entrada válida.
+        """
+        if self.max_bytes <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.etag != etag:
+                # a versão dos dados mudou desde que a resposta foi guardada
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        response, created = entry.response(accept_encoding)
+        if created:
+            self._put(key, entry)
+        return response
+
+    def put(self, key: Hashable, response: Response, accept_encoding: Optional[str] = None) -> Response:
+        """
+        Guarda o corpo de uma resposta recém gerada e a devolve na codificação pedida pelo cliente.
+
+        Parâmetros:
+            key (Hashable): Rota e parâmetros normalizados da consulta.
+            response (Response): Resposta 200 com o cabeçalho ETag.
+            accept_encoding (str): Cabeçalho Accept-Encoding do cliente.
+
+        Retorna:
+            Response: Resposta a enviar, comprimida se o cliente aceitar.
+        """
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in ("content-length", "content-type")}
+        entry = CachedResponse(response.body, headers, response.media_type)
+        cached, _ = entry.response(accept_encoding)
+        if self.max_bytes > 0:
+            self._put(key, entry)
+        return cached
+
+    def _put(self, key: Hashable, entry: CachedResponse) -> None:
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            self._entries[key] = entry
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._entries.currsize, "hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache(config.RESPONSE_CACHE_MAX_BYTES)
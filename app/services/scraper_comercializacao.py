@@ -1,9 +1,11 @@
 import logging
 import pandas as pd
-import requests
-import sqlite3
+from app.core.catalog import rebuild_catalogs
+from app.services.snapshots import write_snapshots
+from app.services.sync import replace_slice
 from app.core import logging_config, logging
-from bs4 import BeautifulSoup
+from app.services.table_extractor import load_page, table_rows
+from app.services.http_client import build_url, fetch_html, afetch_html
 from datetime import datetime
 
 def get_comercializacao(year: int) -> pd.DataFrame:
@@ -16,55 +18,70 @@ def get_comercializacao(year: int) -> pd.DataFrame:
     Retorna:
         pd.DataFrame: Dados coletados do site para os anos informados.
     """
-    URL = f"http://vitibrasil.cnpuv.embrapa.br/index.php?ano={year}&opcao=opt_04" 
+    URL = build_url(year, "opt_04")
     
     try:
-        response = requests.get(URL)
-        response.raise_for_status()
-        response.encoding ='utf-8'
+        html = fetch_html(URL)
     except Exception as e:
         logging.error(f"Erro ao acessar {URL}: {e}")
         return pd.DataFrame()
+
+    return parse_comercializacao(html, year)
+
+async def aget_comercializacao(year: int) -> pd.DataFrame:
+    """
+    Versão assíncrona de get_comercializacao: aguarda o site sem bloquear o event loop.
+
+    Parâmetros:
+        year (int): Ano do filtro da tabela.
+
+    Retorna:
+        pd.DataFrame: Dados coletados do site para o ano informado.
+    """
+    URL = build_url(year, "opt_04")
     
-    soup = BeautifulSoup(response.text, "html.parser")
-    table = soup.find("table", class_="tb_base tb_dados")
-    
-    if not table:
+    try:
+        html = await afetch_html(URL)
+    except Exception as e:
+        logging.error(f"Erro ao acessar {URL}: {e}")
         return pd.DataFrame()
-    
-    rows = table.find_all("tr")
-    data = []
-    group = None
 
-    for row in rows:
-        cols = row.find_all("td")
-        if len(cols) != 2:
-            continue
+    return parse_comercializacao(html, year)
 
-        col1_class = cols[0].get("class", []) 
+def parse_comercializacao(html: str, year: int) -> pd.DataFrame:
+    """
+    Extrai a tabela de comercialização do HTML de uma página do Vitibrasil.
 
-        if "tb_item" in col1_class: 
-            group = cols[0].text.strip().lower()
-            product = group
-            quantity = cols[1].text.strip().lower()
-        elif "tb_subitem" in col1_class: 
-            product = cols[0].text.strip().lower()
-            quantity = cols[1].text.strip().lower()
-        else:
+    Parâmetros:
+        html (str): HTML da página.
+        year (int): Ano da página.
+
+    Retorna:
+        pd.DataFrame: Dados da tabela.
+    """
+    page = load_page(html)
+    if page.table is None:
+        return pd.DataFrame()
+
+    columns = {"Year": [], "GroupName": [], "Product": [], "Quantity_L": []}
+    group = None
+    for classes, (name, quantity) in table_rows(page.table, 2):
+        if "tb_item" in classes:
+            group = name
+        elif "tb_subitem" not in classes:
             continue
 
-        data.append({
-            "Year": year, 
-            "GroupName": group, 
-            "Product": product,
-            "Quantity_L": quantity
-        })
+        columns["GroupName"].append(group)
+        columns["Product"].append(name)
+        columns["Quantity_L"].append(quantity)
+    columns["Year"] = [year] * len(columns["Product"])
 
-    return pd.DataFrame(data) 
+    return pd.DataFrame(columns)
 
 def save_data_db(df: pd.DataFrame) -> None:
     """
-    Salva os dados coletados do site Vitibrasil no banco de dados SQLite, tabela 'comercializacao'.
+    Salva os dados coletados do site Vitibrasil no banco de dados SQLite, tabela 'comercializacao',
+    substituindo as linhas já gravadas da mesma página (ano, opção): rodar o scraper de novo não duplica linhas.
 
     Parâmetros:
         df (pd.DataFrame): Dados coletados do site.
@@ -72,23 +89,7 @@ def save_data_db(df: pd.DataFrame) -> None:
     Retorna:
         None
     """
-    conn = sqlite3.connect("vitibrasil.db")
-    cursor = conn.cursor()
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS comercializacao (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            Year INTEGER,
-            GroupName TEXT, 
-            Product TEXT,
-            Quantity_L TEXT
-        )
-    ''')
-
-    df.to_sql("comercializacao", conn, if_exists="append", index=False)
-
-    conn.commit()
-    conn.close()
+    replace_slice("comercializacao", int(df["Year"].iloc[0]), False, df)
 
 
 def scrap_comercializacao() -> None:
@@ -110,7 +111,9 @@ def scrap_comercializacao() -> None:
             logging.info(f"{len(df)} dados de salvos em 'comercializacao'.")
         else:
             logging.warning(f"Data not saved - empty DataFrame")
-    
+    rebuild_catalogs(["comercializacao"])
+    write_snapshots(["comercializacao"])
+
 if __name__ == "__main__":
     """
         Para extrair os dados do site, execute no terminal:
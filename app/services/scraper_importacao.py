@@ -1,10 +1,12 @@
+from app.core.catalog import rebuild_catalogs
+from app.services.snapshots import write_snapshots
+from app.services.sync import replace_slice
 from app.core import logging_config
-from bs4 import BeautifulSoup
+from app.services.table_extractor import load_page, option_name, table_rows
+from app.services.http_client import build_url, fetch_html, afetch_html
 from datetime import datetime
 import logging
 import pandas as pd
-import requests
-import sqlite3
 
 def get_importacao(year: int, option: int) -> pd.DataFrame:
     """
@@ -22,53 +24,69 @@ def get_importacao(year: int, option: int) -> pd.DataFrame:
     Retorna:
         pd.DataFrame: Dados coletados do site para o ano e opção informados.
     """
-    data = []   
-    URL = f"http://vitibrasil.cnpuv.embrapa.br/index.php?ano={year}&opcao=opt_05&subopcao=subopt_0{option}"
+    URL = build_url(year, "opt_05", f"subopt_0{option}")
     try:
-        response = requests.get(URL,timeout=15)
-        response.raise_for_status()
-        response.encoding = 'utf-8'
+        html = fetch_html(URL)
     except Exception as e:
         logging.error(f"Erro ao acessar {URL}: {e}")
         return pd.DataFrame()
-        
-     
-    soup = BeautifulSoup(response.text, "html.parser")
-    table = soup.find("table", class_="tb_base tb_dados")
-    
-    if not table: 
-        product_tags = soup.find_all("button", class_="btn_sopt")
-        logging.warning(f"Table not found for year {year}, option {option} (produto: {product_tags[option-1].text.strip().lower() if len(product_tags) >= option else 'desconhecido'})")
+
+    return parse_importacao(html, year, option)
+
+async def aget_importacao(year: int, option: int) -> pd.DataFrame:
+    """
+    Versão assíncrona de get_importacao: aguarda o site sem bloquear o event loop.
+
+    Parâmetros:
+        year (int): Ano do filtro da tabela.
+        option (int): Opção do produto no site (ver get_importacao).
+
+    Retorna:
+        pd.DataFrame: Dados coletados do site para o ano e opção informados.
+    """
+    URL = build_url(year, "opt_05", f"subopt_0{option}")
+    try:
+        html = await afetch_html(URL)
+    except Exception as e:
+        logging.error(f"Erro ao acessar {URL}: {e}")
+        return pd.DataFrame()
+
+    return parse_importacao(html, year, option)
+
+def parse_importacao(html: str, year: int, option: int) -> pd.DataFrame:
+    """
+    Extrai a tabela de importação do HTML de uma página do Vitibrasil.
+
+    Parâmetros:
+        html (str): HTML da página.
+        year (int): Ano da página.
+        option (int): Opção do produto da página.
+
+    Retorna:
+        pd.DataFrame: Dados da tabela.
+    """
+    page = load_page(html)
+    product = option_name(page, option)
+
+    if page.table is None:
+        logging.warning(f"Table not found for year {year}, option {option} (produto: {product or 'desconhecido'})")
         return pd.DataFrame()
 
-    product_tags = soup.find_all("button", class_="btn_sopt")
-    if len(product_tags) >= option:
-        product = product_tags[option-1].text.strip().lower()
-    else:
-        product = None
-    
-    rows = table.find_all("tr")
-    for row in rows:
-        cols = row.find_all("td")
-        if len(cols) != 3:
-            continue
-        
-        country = cols[0].text.strip().lower()
-        quantity = cols[1].text.strip().lower()
-        value = cols[2].text.strip().lower()
-        
-        data.append({
-            "Year": year,
-            "Country": country, 
-            "Quantity_Kg": quantity, 
-            "Value_USD": value,
-            "Product": product
-        })
-    return pd.DataFrame(data)
+    columns = {"Year": [], "Country": [], "Quantity_Kg": [], "Value_USD": [], "Product": []}
+    for _, (country, quantity, value) in table_rows(page.table, 3):
+        columns["Country"].append(country)
+        columns["Quantity_Kg"].append(quantity)
+        columns["Value_USD"].append(value)
+    rows = len(columns["Country"])
+    columns["Year"] = [year] * rows
+    columns["Product"] = [product] * rows
+
+    return pd.DataFrame(columns)
 
 def save_data_db(df: pd.DataFrame) -> None:
     """
-    Salva os dados coletados do site Vitibrasil no banco de dados SQLite, tabela 'importacao'.
+    Salva os dados coletados do site Vitibrasil no banco de dados SQLite, tabela 'importacao',
+    substituindo as linhas já gravadas da mesma página (ano, opção): rodar o scraper de novo não duplica linhas.
 
     Parâmetros:
         df (pd.DataFrame): Dados coletados do site.
@@ -76,21 +94,7 @@ def save_data_db(df: pd.DataFrame) -> None:
     Retorna:
         None
     """
-    conn = sqlite3.connect("vitibrasil.db")
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS importacao (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            Year INTEGER,
-            Country TEXT,
-            Quantity_Kg TEXT, 
-            Value_USD TEXT,
-            Product TEXT
-        )
-    ''')
-    df.to_sql("importacao", conn, if_exists="append", index=False)
-    conn.commit()
-    conn.close()
+    replace_slice("importacao", int(df["Year"].iloc[0]), True, df)
 
 def scrap_importacao() -> None:
     """
@@ -113,6 +117,8 @@ def scrap_importacao() -> None:
                 logging.info(f"{len(df)} dados de {product} salvos em 'importacao'.")
             else:
                 logging.warning("Data not saved")
+    rebuild_catalogs(["importacao"])
+    write_snapshots(["importacao"])
 
 if __name__ == "__main__":
     """
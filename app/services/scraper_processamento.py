@@ -1,10 +1,12 @@
 import logging
 import pandas as pd
-import requests
-import sqlite3
-from bs4 import BeautifulSoup
 from datetime import datetime
+from app.core.catalog import rebuild_catalogs
+from app.services.snapshots import write_snapshots
+from app.services.sync import replace_slice
 from app.core import logging_config
+from app.services.table_extractor import load_page, option_name, table_rows, has_sem_definicao
+from app.services.http_client import build_url, fetch_html, afetch_html
 
 def get_processamento(year: int, option: int) -> pd.DataFrame:
     """
@@ -22,72 +24,81 @@ def get_processamento(year: int, option: int) -> pd.DataFrame:
         pd.DataFrame: Dados coletados do site para o ano e opção informados.
     """
     logging.info("Iniciando scraping de processamento.")
-    URL = f"http://vitibrasil.cnpuv.embrapa.br/index.php?ano={year}&opcao=opt_03&subopcao=subopt_0{option}"
+    URL = build_url(year, "opt_03", f"subopt_0{option}")
     try:
-        response = requests.get(URL,timeout=15)
-        response.raise_for_status()
-        response.encoding ='utf-8'
+        html = fetch_html(URL)
         logging.info("Acesso ao site bem-sucedido.")
     except Exception as e:
         logging.error(f"Erro ao acessar {URL}: {e}")
         return pd.DataFrame()
-    
-    soup = BeautifulSoup(response.text, "html.parser")
-    table = soup.find("table", class_="tb_base tb_dados")
-    
-    if not table: 
-        product_tags = soup.find_all("button", class_="btn_sopt")
-        logging.warning(f"Table not found for year {year}, option {option} (produto: {product_tags[option-1].text.strip().lower() if len(product_tags) >= option else 'desconhecido'})")
+
+    return parse_processamento(html, year, option)
+
+async def aget_processamento(year: int, option: int) -> pd.DataFrame:
+    """
+    Versão assíncrona de get_processamento: aguarda o site sem bloquear o event loop.
+
+    Parâmetros:
+        year (int): Ano do filtro da tabela.
+        option (int): Opção do produto no site (ver get_processamento).
+            
+    Retorna:
+        pd.DataFrame: Dados coletados do site para o ano e opção informados.
+    """
+    logging.info("Iniciando scraping de processamento.")
+    URL = build_url(year, "opt_03", f"subopt_0{option}")
+    try:
+        html = await afetch_html(URL)
+        logging.info("Acesso ao site bem-sucedido.")
+    except Exception as e:
+        logging.error(f"Erro ao acessar {URL}: {e}")
         return pd.DataFrame()
-    
-    product_tags = soup.find_all("button", class_="btn_sopt")
-    if len(product_tags) >= option:
-        product = product_tags[option-1].text.strip().lower()
-    else:
-        product = None
-        
-    rows = table.find_all("tr")
-    data = []
 
-    group = None
-    col_sem_definicao = table.find_all("th",class_="tb_base tb_dados", string="Sem definição ")
+    return parse_processamento(html, year, option)
 
-    for row in rows:
-        cols = row.find_all("td")
-        if len(cols) != 2:
-            continue
+def parse_processamento(html: str, year: int, option: int) -> pd.DataFrame:
+    """
+    Extrai a tabela de processamento do HTML de uma página do Vitibrasil.
 
-        col1_class = cols[0].get("class", [])
+    Parâmetros:
+        html (str): HTML da página.
+        year (int): Ano da página.
+        option (int): Opção do produto da página.
+            
+    Retorna:
+        pd.DataFrame: Dados da tabela.
+    """
+    page = load_page(html)
+    product = option_name(page, option)
 
-        if "tb_item" in col1_class:
-            group = cols[0].text.strip().lower()
-            cultive = group
-            quantity = cols[1].text.strip().lower()
-        elif "tb_subitem" in col1_class:
-            cultive = cols[0].text.strip().lower()
-            quantity = cols[1].text.strip().lower()
-        else:
+    if page.table is None:
+        logging.warning(f"Table not found for year {year}, option {option} (produto: {product or 'desconhecido'})")
+        return pd.DataFrame()
+
+    sem_definicao = has_sem_definicao(page.table)
+    columns = {"Year": [], "GroupName": []} if sem_definicao else {"Year": [], "GroupName": [], "Cultive": [], "Quantity_Kg": [], "Product": []}
+    group = None
+    for classes, (name, quantity) in table_rows(page.table, 2):
+        if "tb_item" in classes:
+            group = name
+        elif "tb_subitem" not in classes:
             continue
-        
-        if col_sem_definicao != []:
-            data.append({
-                "Year": year, 
-                "GroupName": group
-            })
-        else:
-                data.append({
-                "Year": year, 
-                "GroupName": group, 
-                "Cultive": cultive,
-                "Quantity_Kg": quantity,
-                "Product": product
-            })
-
-    return pd.DataFrame(data)
+
+        columns["GroupName"].append(group)
+        if not sem_definicao:
+            columns["Cultive"].append(name)
+            columns["Quantity_Kg"].append(quantity)
+    rows = len(columns["GroupName"])
+    columns["Year"] = [year] * rows
+    if not sem_definicao:
+        columns["Product"] = [product] * rows
+
+    return pd.DataFrame(columns)
 
 def save_data_db(df: pd.DataFrame) -> None:
     """
-    Salva os dados coletados do site Vitibrasil no banco de dados SQLite, tabela 'processamento'.
+    Salva os dados coletados do site Vitibrasil no banco de dados SQLite, tabela 'processamento',
+    substituindo as linhas já gravadas da mesma página (ano, opção): rodar o scraper de novo não duplica linhas.
 
     Parâmetros:
         df (pd.DataFrame): Dados coletados do site.
@@ -95,23 +106,7 @@ def save_data_db(df: pd.DataFrame) -> None:
     Retorna:
         None
     """
-    conn = sqlite3.connect("vitibrasil.db")
-    cursor = conn.cursor()
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS processamento (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            Year INTEGER,
-            GroupName TEXT, 
-            Cultive TEXT,
-            Quantity_Kg TEXT,
-            Product TEXT
-        )
-    ''')
-
-    df.to_sql("processamento", conn, if_exists="append", index=False)
-    conn.commit()
-    conn.close()
+    replace_slice("processamento", int(df["Year"].iloc[0]), True, df)
 
 
 def scrap_processamento() -> None:
@@ -133,7 +128,9 @@ def scrap_processamento() -> None:
                 save_data_db(df)
                 product = df["Product"].iloc[0]
                 logging.info(f"{len(df)} dados de {product} salvos em 'processamento'.")
-    
+    rebuild_catalogs(["processamento"])
+    write_snapshots(["processamento"])
+
 if __name__ == "__main__":
     """
         Para extrair os dados do site, execute no terminal:
@@ -1,10 +1,12 @@
 import logging
 import pandas as pd
-import requests
-import sqlite3
-from bs4 import BeautifulSoup
 from datetime import datetime
+from app.core.catalog import rebuild_catalogs
+from app.services.snapshots import write_snapshots
+from app.services.sync import replace_slice
 from app.core import logging_config
+from app.services.table_extractor import load_page, table_rows
+from app.services.http_client import build_url, fetch_html, afetch_html
 from fastapi.responses import JSONResponse
 
 def get_producao(year: int) -> pd.DataFrame:
@@ -17,53 +19,70 @@ def get_producao(year: int) -> pd.DataFrame:
     Retorna:
         pd.DataFrame: Dados coletados do site para o ano informado.
     """
-    URL = f"http://vitibrasil.cnpuv.embrapa.br/index.php?ano={year}&opcao=opt_02"
+    URL = build_url(year, "opt_02")
     
     try:
         logging.info("Acessando o site Vitibrasil")
-        response = requests.get(URL)
-        response.raise_for_status()
-        response.encoding = 'utf-8' 
+        html = fetch_html(URL)
     except Exception as e:
         logging.error(f"Erro ao acessas {URL}: {e}")
         return pd.DataFrame()
+
+    return parse_producao(html, year)
+
+async def aget_producao(year: int) -> pd.DataFrame:
+    """
+    Versão assíncrona de get_producao: aguarda o site sem bloquear o event loop.
+
+    Parâmetros:
+        year (int): Ano do filtro da tabela.
     
-    soup = BeautifulSoup(response.text, "html.parser") 
-    table = soup.find("table", class_="tb_base tb_dados")
+    Retorna:
+        pd.DataFrame: Dados coletados do site para o ano informado.
+    """
+    URL = build_url(year, "opt_02")
+    
+    try:
+        logging.info("Acessando o site Vitibrasil")
+        html = await afetch_html(URL)
+    except Exception as e:
+        logging.error(f"Erro ao acessas {URL}: {e}")
+        return pd.DataFrame()
+
+    return parse_producao(html, year)
+
+def parse_producao(html: str, year: int) -> pd.DataFrame:
+    """
+    Extrai a tabela de producao do HTML de uma página do Vitibrasil.
+
+    Parâmetros:
+        html (str): HTML da página.
+        year (int): Ano da página.
     
-    if not table:
+    Retorna:
+        pd.DataFrame: Dados da tabela.
+    """
+    page = load_page(html)
+    if page.table is None:
         return pd.DataFrame()
 
-    rows = table.find_all("tr")
-    data = []
-    for row in rows:
-        cols = row.find_all("td")
-        if len(cols) == 2:
-            if "tb_item" in cols[0].get("class", []):
-                current_product = cols[0].text.strip().lower()
-                total_quantity = cols[1].text.strip().lower()
-                data.append({
-                    "Year": year,
-                    "Category": current_product,
-                    "Product": "todos da categoria",
-                    "Quantity_L": total_quantity
-                })
-                continue
-            
-            quantity = cols[1].text.strip().lower()
-            subProduct = cols[0].text.strip().lower()
-            data.append({
-                "Year": year,
-                "Category": current_product if 'current_product' in locals() else None,
-                "Product": subProduct,
-                "Quantity_L": quantity
-            })
-
-    return pd.DataFrame(data)
+    columns = {"Year": [], "Category": [], "Product": [], "Quantity_L": []}
+    category = None
+    for classes, (name, quantity) in table_rows(page.table, 2):
+        if "tb_item" in classes:
+            category = name
+            name = "todos da categoria"
+        columns["Category"].append(category)
+        columns["Product"].append(name)
+        columns["Quantity_L"].append(quantity)
+    columns["Year"] = [year] * len(columns["Product"])
+
+    return pd.DataFrame(columns)
 
 def save_at_db(df: pd.DataFrame) -> None:
     """
-    Salva os dados coletados do site Vitibrasil no banco de dados SQLite, tabela 'producao'.
+    Salva os dados coletados do site Vitibrasil no banco de dados SQLite, tabela 'producao',
+    substituindo as linhas já gravadas da mesma página (ano, opção): rodar o scraper de novo não duplica linhas.
 
     Parâmetros:
         df (pd.DataFrame): Dados coletados do site.
@@ -71,22 +90,7 @@ def save_at_db(df: pd.DataFrame) -> None:
     Retorna:
         None
     """
-    conn = sqlite3.connect("vitibrasil.db")
-    cursor = conn.cursor()
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS producao (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            Year INTEGER,
-            Category TEXT, 
-            Product TEXT,
-            Quantity_L TEXT
-        )
-        ''')
-    
-    df.to_sql("producao", conn, if_exists="append", index=False)
-    conn.commit()
-    conn.close()
+    replace_slice("producao", int(df["Year"].iloc[0]), False, df)
 
 def scrap_producao() -> None:
     """
@@ -104,6 +108,8 @@ def scrap_producao() -> None:
         df = get_producao(year) 
         if not df.empty:
             save_at_db(df)
+    rebuild_catalogs(["producao"])
+    write_snapshots(["producao"])
 
 
 if __name__ == "__main__":
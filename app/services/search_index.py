@@ -0,0 +1,97 @@
+"""
+Índice de busca dos filtros de texto das rotas (produto, país, grupo, cultivo e categoria).
+
+Para cada coluna filtrável, guarda os valores distintos da tabela já normalizados por fold
+(minúsculas, sem acentos). Um filtro vira a lista dos valores originais cuja forma normalizada
+contém o texto pedido, e a consulta ao banco usa `coluna IN (...)`, resolvida pelos índices de
+cada coluna. As listas resolvidas ficam em cache até a próxima ingestão do dataset, detectada
+pela marca de catalog_version.
+"""
+import threading
+from typing import Optional
+from app.core.catalog import catalog_markers
+from app.core.db import connect
+from app.util.text import fold
+
+# Colunas com filtro de texto em cada dataset
+SEARCH_COLUMNS = {
+    "producao": ("Category", "Product"),
+    "processamento": ("GroupName", "Cultive", "Product"),
+    "comercializacao": ("GroupName", "Product"),
+    "importacao": ("Country", "Product"),
+    "exportacao": ("Country", "Product"),
+}
+
+# Filtros resolvidos guardados por índice
+LOOKUP_CACHE_SIZE = 1024
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class SearchIndex:
+    """
+    Valores distintos das colunas filtráveis de um dataset, normalizados por fold.
+    """
+
+    def __init__(self, marker: Optional[tuple], columns: dict):
+        self.marker = marker
+        self.values = {
+            column: [(fold(value), value) for value in values if value is not None]
+            for column, values in columns.items()
+        }
+        self._lookups = {}
+
+    def lookup(self, column: str, text: str) -> list:
+        """
+        Valores da coluna que contêm o texto, sem diferenciar maiúsculas nem acentos.
+        """
+        key = (column, fold(text))
+        values = self._lookups.get(key)
+        if values is None:
+            values = [value for folded, value in self.values[column] if key[1] in folded]
+            if len(self._lookups) >= LOOKUP_CACHE_SIZE:
+                self._lookups.clear()
+            self._lookups[key] = values
+        return values
+
+
+def build_index(dataset: str) -> SearchIndex:
+    with connect("vitibrasil.db", readonly=True) as conn:
+        marker = catalog_markers(conn).get(dataset)
+        columns = {
+            column: [row[0] for row in conn.execute(f"SELECT DISTINCT {column} FROM {dataset}")]
+            for column in SEARCH_COLUMNS[dataset]
+        }
+    return SearchIndex(marker, columns)
+
+
+def get_index(dataset: str) -> SearchIndex:
+    """
+    Índice de busca de um dataset, reconstruído quando o dataset recebe uma nova ingestão.
+    """
+    with connect("vitibrasil.db", readonly=True) as conn:
+        marker = catalog_markers(conn).get(dataset)
+    index = _indexes.get(dataset)
+    if index is not None and index.marker == marker:
+        return index
+    index = build_index(dataset)
+    with _indexes_lock:
+        _indexes[dataset] = index
+    return index
+
+
+def match_values(dataset: str, column: str, text: str) -> list:
+    """
+    Valores de `column` em `dataset` que atendem ao filtro `text` (busca parcial, sem acentos
+    nem diferença de maiúsculas).
+
+    Parâmetros:
+        dataset (str): Nome da tabela.
+        column (str): Coluna de SEARCH_COLUMNS.
+        text (str): Texto do filtro.
+
+    Retorna:
+        list: Valores originais da coluna, na forma em que estão gravados no banco.
+    """
+    return get_index(dataset).lookup(column, text)
@@ -0,0 +1,151 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
+from app.core import config
+from app.core.schema import NUMERIC_COLUMNS
+from app.services.queries import DATASET_COLUMNS, iter_dataset
+
+SNAPSHOT_CHUNK_ROWS = 10000
+
+
+def snapshot_schema(dataset: str) -> pa.Schema:
+    """
+    Tipos das colunas do snapshot: Year e as colunas numéricas como inteiros (nulos quando o site
+    não informa o valor), as demais como texto.
+    """
+    numeric = NUMERIC_COLUMNS[dataset]
+    fields = []
+    for column in DATASET_COLUMNS[dataset]:
+        if column == "Year":
+            fields.append(pa.field(column, pa.int16(), nullable=False))
+        elif column in numeric:
+            fields.append(pa.field(column, pa.int64()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def snapshot_path(dataset: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or config.SNAPSHOT_DIR, f"{dataset}.parquet")
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def read_manifest(dataset: str, directory: Optional[str] = None) -> Optional[dict]:
+    """
+    Lê a descrição do snapshot de um dataset (arquivo .json ao lado do .parquet).
+
+    Retorna:
+        dict: {path, version, rows, size, built_at}, ou None se o snapshot ainda não foi gerado.
+    """
+    path = snapshot_path(dataset, directory)
+    try:
+        with open(f"{path}.json", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(path):
+        return None
+    return dict(manifest, path=path)
+
+
+def write_snapshot(dataset: str, directory: Optional[str] = None) -> dict:
+    """
+    Grava a tabela de um dataset em um arquivo Parquet comprimido, em ordem (Year, id).
+
+    As linhas são lidas do banco e gravadas em blocos, e o arquivo só substitui o anterior
+    (os.replace) depois de completo, para que downloads em andamento não leiam um arquivo pela metade.
+    Se o conteúdo não mudou, o snapshot anterior é mantido com a mesma versão.
+
+    Parâmetros:
+        dataset (str): Nome do dataset.
+        directory (str): Pasta dos snapshots (padrão: SNAPSHOT_DIR).
+
+    Retorna:
+        dict: Descrição do snapshot, como em read_manifest.
+    """
+    path = snapshot_path(dataset, directory)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    schema = snapshot_schema(dataset)
+    partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    rows = 0
+    try:
+        with pq.ParquetWriter(partial, schema, compression=config.SNAPSHOT_COMPRESSION) as writer:
+            for chunk in iter_dataset(dataset, SNAPSHOT_CHUNK_ROWS, ordered=True):
+                columns = [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+                rows += len(chunk)
+    except Exception:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+    version = file_hash(partial)
+    previous = read_manifest(dataset, directory)
+    if previous and previous["version"] == version:
+        os.remove(partial)
+        return previous
+
+    manifest = {
+        "version": version,
+        "rows": rows,
+        "size": os.path.getsize(partial),
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    os.replace(partial, path)
+    with open(f"{partial}.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(f"{partial}.json", f"{path}.json")
+    logging.info(f"Snapshot de '{dataset}' gravado: {rows} linhas, versão {version}")
+    return dict(manifest, path=path)
+
+
+def write_snapshots(datasets: list = None) -> None:
+    """
+    Grava os snapshots dos datasets informados (padrão: todos). Chamado ao final de cada ingestão.
+    Falhas são registradas no log sem interromper a ingestão, que já gravou os dados no banco.
+    """
+    for dataset in datasets or list(DATASET_COLUMNS):
+        try:
+            write_snapshot(dataset)
+        except (OSError, sqlite3.Error, pa.ArrowException) as e:
+            logging.error(f"Erro ao gravar o snapshot de '{dataset}': {e}")
+
+
+def get_snapshot(dataset: str) -> dict:
+    """
+    Retorna o snapshot mais recente de um dataset, gerando-o se ainda não existir.
+    """
+    return read_manifest(dataset) or write_snapshot(dataset)
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Gera os snapshots Parquet das tabelas do vitibrasil.db.")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASET_COLUMNS), default=list(DATASET_COLUMNS))
+    args = parser.parse_args(argv)
+    for dataset in args.datasets:
+        manifest = write_snapshot(dataset)
+        print(f"{dataset}: {manifest['rows']} linhas, {manifest['size']} bytes, versão {manifest['version']}")
+
+
+if __name__ == "__main__":
+    """
+        Para gerar os snapshots manualmente:
+        python -m app.services.snapshots
+    """
+    main()
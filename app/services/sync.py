@@ -0,0 +1,171 @@
+import hashlib
+import httpx
+import pandas as pd
+from datetime import datetime, timezone
+from typing import Optional
+from app.core.db import connect
+from app.core.schema import ensure_schema
+from app.util.helpers import parse_numeric_columns
+
+
+def page_key(dataset: str, year: int, option: Optional[int]) -> tuple:
+    """
+    Chave de uma página na tabela sync_state (option = 0 para abas sem sub-opção).
+    """
+    return (dataset, year, option or 0)
+
+
+def load_states(datasets: list) -> dict:
+    """
+    Carrega o estado salvo das páginas dos datasets informados.
+
+    Parâmetros:
+        datasets (list): Nomes dos datasets.
+
+    Retorna:
+        dict: {(dataset, year, option): {"content_hash", "etag", "last_modified"}}
+    """
+    placeholders = ",".join("?" for _ in datasets)
+    with connect("vitibrasil.db") as conn:
+        ensure_schema(conn, ["sync_state"])
+        rows = conn.execute(
+            f"SELECT dataset, year, option, content_hash, etag, last_modified FROM sync_state WHERE dataset IN ({placeholders})",
+            list(datasets),
+        ).fetchall()
+    return {
+        (row[0], row[1], row[2]): {"content_hash": row[3], "etag": row[4], "last_modified": row[5]}
+        for row in rows
+    }
+
+
+def conditional_headers(state: Optional[dict]) -> dict:
+    """
+    Monta os cabeçalhos If-None-Match/If-Modified-Since a partir do estado salvo da página.
+    """
+    headers = {}
+    if state and state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state and state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    return headers
+
+
+def hash_dataframe(df: pd.DataFrame) -> str:
+    """
+    Calcula o hash do conteúdo extraído da página.
+
+    O hash é feito sobre a tabela já extraída, e não sobre o HTML, para que mudanças
+    no layout do site que não alteram os dados não sejam tratadas como alteração.
+    """
+    return hashlib.sha256(df.to_csv(index=False).encode("utf-8")).hexdigest()
+
+
+def replace_slice(dataset: str, year: int, has_options: bool, df: pd.DataFrame) -> None:
+    """
+    Substitui no banco as linhas de uma página (dataset, ano, opção) pelas linhas novas.
+
+    Parâmetros:
+        dataset (str): Nome da tabela.
+        year (int): Ano da página.
+        has_options (bool): Se a aba tem sub-opções; nesse caso a fatia é (ano, produto).
+        df (pd.DataFrame): Dados novos da página.
+
+    Retorna:
+        None
+    """
+    with connect("vitibrasil.db") as conn:
+        ensure_schema(conn, [dataset])
+        if has_options:
+            product = df["Product"].iloc[0] if "Product" in df else None
+            conn.execute(f"DELETE FROM {dataset} WHERE Year = ? AND Product IS ?", (year, product))
+        else:
+            conn.execute(f"DELETE FROM {dataset} WHERE Year = ?", (year,))
+        parse_numeric_columns(df, dataset).to_sql(dataset, conn, if_exists="append", index=False)
+
+
+def save_state(
+    dataset: str,
+    year: int,
+    option: Optional[int],
+    content_hash: Optional[str],
+    response: httpx.Response,
+    changed: bool,
+    rows: Optional[int] = None,
+) -> None:
+    """
+    Registra o hash, o ETag e o Last-Modified da página e a data da verificação.
+
+    Parâmetros:
+        dataset (str): Nome do dataset.
+        year (int): Ano da página.
+        option (int): Opção da página.
+        content_hash (str): Hash do conteúdo; None mantém o hash salvo (resposta 304).
+        response (httpx.Response): Resposta do site.
+        changed (bool): Se o conteúdo mudou nesta verificação.
+        rows (int): Linhas extraídas da página; None mantém o valor salvo.
+
+    Retorna:
+        None
+    """
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with connect("vitibrasil.db") as conn:
+        ensure_schema(conn, ["sync_state"])
+        conn.execute('''
+            INSERT INTO sync_state (dataset, year, option, content_hash, etag, last_modified, checked_at, changed_at, row_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (dataset, year, option) DO UPDATE SET
+                content_hash = COALESCE(excluded.content_hash, content_hash),
+                etag = COALESCE(excluded.etag, etag),
+                last_modified = COALESCE(excluded.last_modified, last_modified),
+                checked_at = excluded.checked_at,
+                changed_at = COALESCE(excluded.changed_at, changed_at),
+                row_count = COALESCE(excluded.row_count, row_count)
+        ''', (
+            *page_key(dataset, year, option),
+            content_hash,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            now,
+            now if changed else None,
+            rows,
+        ))
+
+
+def is_empty_table(df: pd.DataFrame) -> bool:
+    """
+    Indica uma página que o site mostra com a tabela de dados, mas sem linhas (ex.: importação de
+    suco de uva nos anos sem registro). Falhas de acesso e páginas sem tabela chegam como um
+    DataFrame sem colunas.
+    """
+    return df.empty and len(df.columns) > 0
+
+
+def mark_empty_page(dataset: str, year: int, option: Optional[int], content_hash: str) -> None:
+    """
+    Registra em sync_state uma página com a tabela vazia (row_count = 0), coletada fora do
+    crawler (sem os cabeçalhos da resposta). A página passa a contar como presente no banco.
+    """
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with connect("vitibrasil.db") as conn:
+        ensure_schema(conn, ["sync_state"])
+        conn.execute('''
+            INSERT INTO sync_state (dataset, year, option, content_hash, checked_at, changed_at, row_count)
+            VALUES (?, ?, ?, ?, ?, ?, 0)
+            ON CONFLICT (dataset, year, option) DO UPDATE SET
+                content_hash = excluded.content_hash,
+                checked_at = excluded.checked_at,
+                changed_at = excluded.changed_at,
+                row_count = 0
+        ''', (*page_key(dataset, year, option), content_hash, now, now))
+
+
+def empty_years(dataset: str, option: Optional[int], years: list) -> set:
+    """
+    Anos, entre os pedidos, em que a página (dataset, opção) foi coletada com a tabela vazia.
+    """
+    with connect("vitibrasil.db", readonly=True) as conn:
+        rows = conn.execute(
+            "SELECT year FROM sync_state WHERE dataset = ? AND option = ? AND row_count = 0 AND year BETWEEN ? AND ?",
+            (dataset, option or 0, years[0], years[-1]),
+        )
+        return {row[0] for row in rows} & set(years)
@@ -0,0 +1,66 @@
+import lxml.html
+from typing import Iterator, NamedTuple, Optional
+
+# Tabela de dados e botões de sub-opção das páginas do Vitibrasil
+TABLE_XPATH = '//table[@class="tb_base tb_dados"]'
+OPTION_BUTTONS_XPATH = '//button[contains(concat(" ", normalize-space(@class), " "), " btn_sopt ")]'
+SEM_DEFINICAO_XPATH = './/th[@class="tb_base tb_dados"][. = "Sem definição "]'
+
+
+class Page(NamedTuple):
+    """
+    Partes de uma página do Vitibrasil usadas pelos scrapers.
+    """
+    table: Optional[lxml.html.HtmlElement]
+    options: list
+
+
+def load_page(html: str) -> Page:
+    """
+    Interpreta o HTML de uma página do Vitibrasil com o lxml e localiza a tabela de dados.
+
+    Parâmetros:
+        html (str): HTML da página.
+
+    Retorna:
+        Page: Tabela de dados (None se a página não tiver) e nomes das sub-opções, em minúsculas.
+    """
+    if not html or not html.strip():
+        return Page(None, [])
+    doc = lxml.html.document_fromstring(html)
+    tables = doc.xpath(TABLE_XPATH)
+    options = [button.text_content().strip().lower() for button in doc.xpath(OPTION_BUTTONS_XPATH)]
+    return Page(tables[0] if tables else None, options)
+
+
+def option_name(page: Page, option: int) -> Optional[str]:
+    """
+    Nome da sub-opção selecionada (ex.: "vinhos de mesa"), ou None se a página não a listar.
+    """
+    return page.options[option - 1] if len(page.options) >= option else None
+
+
+def table_rows(table: lxml.html.HtmlElement, width: int) -> Iterator[tuple]:
+    """
+    Percorre as linhas da tabela com exatamente `width` células <td>.
+
+    Parâmetros:
+        table (HtmlElement): Tabela de dados da página.
+        width (int): Número de células esperado na linha.
+
+    Retorna:
+        Iterator[tuple]: (classes da primeira célula, textos das células em minúsculas).
+    """
+    for row in table.iter("tr"):
+        cells = row.findall(".//td")
+        if len(cells) != width:
+            continue
+        classes = (cells[0].get("class") or "").split()
+        yield classes, [cell.text_content().strip().lower() for cell in cells]
+
+
+def has_sem_definicao(table: lxml.html.HtmlElement) -> bool:
+    """
+    Indica o layout "Sem definição" de processamento, em que a tabela não traz cultivos nem quantidades.
+    """
+    return bool(table.xpath(SEM_DEFINICAO_XPATH))
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import sqlite3
+import time
+import pandas as pd
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+from app.core import config
+from app.core.catalog import rebuild_catalogs
+from app.core.db import connect
+from app.services.cache import scraper_cache
+from app.services.datasets import OPTION_PRODUCTS
+from app.services import memory_engine, sync
+from app.services.snapshots import write_snapshots
+
+FIRST_YEAR = 1970
+
+# Páginas (dataset, opção, ano) sem tabela ou com falha: não são pedidas de novo ao site até o TTL do cache
+_empty_pages = {}
+
+
+def latest_year(dataset: str) -> int:
+    """
+    Último ano com linhas do dataset no vitibrasil.db, ou o ano anterior ao atual se a tabela
+    ainda não existe ou está vazia.
+    """
+    row = None
+    try:
+        with connect("vitibrasil.db", readonly=True) as conn:
+            row = conn.execute(f"SELECT MAX(Year) FROM {dataset}").fetchone()
+    except sqlite3.OperationalError:
+        pass
+    if row and row[0] is not None:
+        return row[0]
+    return datetime.now().year - 1
+
+
+def resolve_years(
+    year: Optional[int] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    years: Optional[list] = None,
+    dataset: Optional[str] = None,
+) -> Optional[list]:
+    """
+    Junta os filtros de ano das rotas de dados em uma lista ordenada de anos.
+
+    Parâmetros:
+        year (int): Ano único.
+        year_from (int): Primeiro ano do intervalo (padrão: 1970, se year_to for informado).
+        year_to (int): Último ano do intervalo (padrão, se year_from for informado: o último ano
+            do dataset no banco, para não pedir ao site anos que ainda não existem).
+        years (list): Lista de anos.
+        dataset (str): Dataset consultado, usado no padrão de year_to.
+
+    Retorna:
+        list: Anos pedidos, ou None se nenhum filtro de ano foi informado.
+
+    Raises:
+        ValueError: Intervalo invertido ou ano fora da série do Vitibrasil.
+    """
+    last_year = datetime.now().year
+    selected = set(years or [])
+    if year is not None:
+        selected.add(year)
+    if year_from is not None or year_to is not None:
+        start = FIRST_YEAR if year_from is None else year_from
+        if year_to is not None:
+            end = year_to
+        elif dataset is not None:
+            end = latest_year(dataset)
+        else:
+            end = last_year - 1
+        if start > end:
+            raise ValueError("year_from deve ser menor ou igual a year_to")
+        selected.update(range(start, end + 1))
+
+    if not selected:
+        return None
+    if min(selected) < FIRST_YEAR or max(selected) > last_year:
+        raise ValueError(f"Os anos devem estar entre {FIRST_YEAR} e {last_year}")
+    return sorted(selected)
+
+
+def years_in_db(dataset: str, years: list, option: Optional[int] = None) -> set:
+    """
+    Anos, entre os pedidos, que já têm linhas no vitibrasil.db (para o produto da sub-opção, se
+    informada), somados aos anos em que o site mostra a página com a tabela vazia.
+    """
+    query = f"SELECT DISTINCT Year FROM {dataset} WHERE Year BETWEEN ? AND ?"
+    params = [years[0], years[-1]]
+    if option is not None:
+        query += " AND Product = ?"
+        params.append(OPTION_PRODUCTS[dataset][option])
+    with connect("vitibrasil.db", readonly=True) as conn:
+        present = {row[0] for row in conn.execute(query, params)} & set(years)
+    return present | sync.empty_years(dataset, option, years)
+
+
+async def scrape_years(
+    dataset: str,
+    option: Optional[int],
+    years: list,
+    fetch: Callable[[Optional[int]], Awaitable[pd.DataFrame]],
+) -> dict:
+    """
+    Coleta do site, ao mesmo tempo, as páginas dos anos informados, passando pelo cache de páginas.
+
+    Parâmetros:
+        dataset (str): Nome do dataset.
+        option (int): Sub-opção da página, ou None.
+        years (list): Anos a coletar.
+        fetch (Callable): Função assíncrona que coleta um ano (ex.: lambda y: aget_exportacao(y, 1)).
+
+    Retorna:
+        dict: {ano: DataFrame}; DataFrame vazio quando a página não tem dados ou a coleta falhou.
+    """
+    semaphore = asyncio.Semaphore(config.CRAWLER_CONCURRENCY)
+
+    async def one(year: Optional[int]) -> pd.DataFrame:
+        async with semaphore:
+            return await scraper_cache.aget((dataset, option, year), lambda: fetch(year))
+
+    frames = await asyncio.gather(*(one(year) for year in years))
+    return dict(zip(years, frames))
+
+
+async def backfill_years(
+    dataset: str,
+    option: Optional[int],
+    years: list,
+    fetch: Callable[[Optional[int]], Awaitable[pd.DataFrame]],
+) -> int:
+    """
+    Coleta do site os anos que faltam no banco e grava as páginas encontradas.
+
+    Páginas com a tabela vazia ficam registradas em sync_state e não são pedidas de novo (o crawler
+    incremental as atualiza quando o site passar a ter dados). Páginas sem tabela ou com falha ficam
+    registradas por SCRAPER_CACHE_TTL segundos, para que consultas seguidas ao mesmo intervalo não
+    voltem a pedi-las ao site.
+
+    Parâmetros:
+        dataset (str): Nome do dataset.
+        option (int): Sub-opção da página, ou None.
+        years (list): Anos ausentes do banco.
+        fetch (Callable): Função assíncrona que coleta um ano.
+
+    Retorna:
+        int: Número de anos gravados no banco.
+    """
+    now = time.monotonic()
+    pending = [year for year in years if now - _empty_pages.get((dataset, option, year), -config.SCRAPER_CACHE_TTL) >= config.SCRAPER_CACHE_TTL]
+    if not pending:
+        return 0
+
+    logging.info(f"Coletando do site {len(pending)} anos ausentes do banco em '{dataset}'")
+    saved = 0
+    for year, df in (await scrape_years(dataset, option, pending, fetch)).items():
+        if sync.is_empty_table(df):
+            await asyncio.to_thread(sync.mark_empty_page, dataset, year, option, sync.hash_dataframe(df))
+            continue
+        if df.empty:
+            _empty_pages[(dataset, option, year)] = now
+            continue
+        await asyncio.to_thread(sync.replace_slice, dataset, year, option is not None, df)
+        saved += 1
+    if saved:
+        await asyncio.to_thread(rebuild_catalogs, [dataset])
+        await asyncio.to_thread(write_snapshots, [dataset])
+        await asyncio.to_thread(memory_engine.reload, [dataset])
+    return saved
+
+
+def concat_pages(pages: dict) -> pd.DataFrame:
+    """
+    Junta em um DataFrame as páginas coletadas por scrape_years, ignorando as vazias.
+    """
+    frames = [df for df in pages.values() if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+async def ensure_years(
+    dataset: str,
+    option: Optional[int],
+    years: list,
+    fetch: Callable[[Optional[int]], Awaitable[pd.DataFrame]],
+) -> int:
+    """
+    Garante que os anos pedidos estejam no banco antes da consulta, coletando do site os que faltam.
+
+    Retorna:
+        int: Número de anos gravados no banco (0 se nenhum faltava).
+    """
+    missing = sorted(set(years) - years_in_db(dataset, years, option))
+    if missing:
+        return await backfill_years(dataset, option, missing, fetch)
+    return 0
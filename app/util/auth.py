@@ -1,10 +1,17 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from typing import Optional
+from cachetools import LRUCache
 from passlib.context import CryptContext
 from bcrypt import hashpw, gensalt, checkpw
+from app.core import config
 
 SECRET_KEY = "chave"
 ALGORITHM = "HS256"
@@ -12,7 +19,8 @@ ACCESS_TOKEN_MINUTES = 30
 
 oauth2 = OAuth2PasswordBearer(tokenUrl="/login")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# O custo vale para as senhas novas; as já cadastradas guardam o próprio custo no hash
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config.BCRYPT_ROUNDS)
 
 #define
 def hash_pass(password: str) -> str:
@@ -22,20 +30,151 @@ def hash_pass(password: str) -> str:
 def verifica_pass(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+_password_pool = None
+_password_pool_pid = None
+_password_pool_lock = threading.Lock()
+
+
+def get_password_pool() -> ThreadPoolExecutor:
+    """
+    Retorna o pool de threads do bcrypt, com PASSWORD_HASH_WORKERS threads. O bcrypt libera o GIL,
+    então as threads calculam hashes em paralelo sem travar o event loop. O pool é recriado após um
+    fork (cada worker tem o seu).
+    """
+    global _password_pool, _password_pool_pid
+    with _password_pool_lock:
+        if _password_pool is None or _password_pool_pid != os.getpid():
+            _password_pool = ThreadPoolExecutor(max_workers=max(config.PASSWORD_HASH_WORKERS, 1), thread_name_prefix="bcrypt")
+            _password_pool_pid = os.getpid()
+        return _password_pool
+
+
+async def hash_pass_async(password: str) -> str:
+    """
+    hash_pass fora do event loop, no pool do bcrypt: as demais requisições seguem sendo atendidas
+    enquanto o hash é calculado.
+    """
+    return await asyncio.get_running_loop().run_in_executor(get_password_pool(), hash_pass, password)
+
+
+async def verifica_pass_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verifica_pass fora do event loop, no pool do bcrypt. Com todas as threads ocupadas, as
+    verificações esperam na fila do pool, sem ocupar o event loop.
+    """
+    return await asyncio.get_running_loop().run_in_executor(get_password_pool(), verifica_pass, plain_password, hashed_password)
+
+
+def close_password_pool() -> None:
+    """
+    Encerra o pool do bcrypt. Chamado no desligamento da aplicação.
+    """
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is not None:
+            _password_pool.shutdown(wait=True, cancel_futures=True)
+            _password_pool = None
+
 def cria_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"epx": expire.timestamp()})
+    # "exp" é validada pelo jwt.decode; o datetime em UTC é convertido para timestamp pelo jose
+    to_encode.update({"exp": expire})
     encode_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encode_jwt
 
-def verifica_token(token: str = Depends(oauth2)):
+class TokenCache:
+    """
+    Cache LRU dos tokens já verificados: {token: (usuário, expiração)}.
+
+    Um token em cache dispensa o jwt.decode (verificação HMAC) a cada requisição. A entrada vale
+    até a expiração do próprio token e sai antes disso pelo LRU ou por evict.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = LRUCache(maxsize=max(maxsize, 1))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[str]:
+        """
+        Usuário do token, se ele já foi verificado e ainda não expirou; None caso contrário.
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry[1] is not None and entry[1] <= time.time():
+                del self._entries[token]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token: str, username: str, expires: Optional[float]) -> None:
+        if self.maxsize <= 0 or (expires is not None and expires <= time.time()):
+            return
+        with self._lock:
+            self._entries[token] = (username, expires)
+
+    def evict(self, token: Optional[str] = None, username: Optional[str] = None) -> int:
+        """
+        Remove do cache um token, os tokens de um usuário ou, sem argumentos, todos. A próxima
+        requisição com esses tokens volta a passar pela verificação completa (ex.: após trocar a SECRET_KEY).
+        Não invalida os tokens: um token removido que ainda tem assinatura e expiração válidas é aceito.
+
+        Retorna:
+            int: Número de entradas removidas.
+        """
+        with self._lock:
+            if token is None and username is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            keys = [key for key, entry in self._entries.items() if key == token or entry[0] == username]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+token_cache = TokenCache(config.TOKEN_CACHE_MAXSIZE)
+
+def token_expiration(payload: dict) -> Optional[float]:
+    # tokens emitidos antes da correção do cria_token trazem a expiração em "epx", que o jwt.decode não confere
+    expires = payload.get("exp", payload.get("epx"))
+    return float(expires) if expires is not None else None
+
+async def verifica_token(token: str = Depends(oauth2)):
+    # caminho comum: token já verificado, uma busca no cache (assíncrona, sem passar pelo threadpool)
+    username = token_cache.get(token)
+    if username is not None:
+        return username
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="O token não é válido")
-        return username
     except JWTError:
         raise HTTPException(status_code=401, detail="O token não é válido")
+    username: str = payload.get("sub")
+    expires = token_expiration(payload)
+    if username is None or expires is None or expires <= time.time():
+        raise HTTPException(status_code=401, detail="O token não é válido")
+    token_cache.put(token, username, expires)
+    return username
 
+def evict_tokens(token: Optional[str] = None, username: Optional[str] = None) -> int:
+    """
+    Descarta do cache de tokens verificados um token, os de um usuário ou todos. É só uma remoção
+    do cache, não uma revogação: os tokens seguem válidos até expirar.
+    """
+    return token_cache.evict(token, username)
@@ -0,0 +1,116 @@
+import pandas as pd
+from app.core.schema import NUMERIC_COLUMNS
+from app.util.text import fold
+
+
+def parse_br_numbers(values: pd.Series) -> pd.Series:
+    """
+    Converte, de forma vetorizada, números no formato do site Vitibrasil para inteiros.
+
+    Parâmetros:
+        values (pd.Series): Valores como "217.208.604", "-" (zero), "nd" ou "*" (não disponível).
+
+    Retorna:
+        pd.Series: Série Int64, com <NA> para valores não disponíveis.
+    """
+    text = values.astype("string").str.strip()
+    text = text.mask(text == "-", "0").str.replace(".", "", regex=False)
+    return pd.to_numeric(text, errors="coerce").astype("Int64")
+
+
+def parse_numeric_columns(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    Converte as colunas numéricas de um DataFrame coletado do site para inteiros.
+
+    Parâmetros:
+        df (pd.DataFrame): Dados coletados do site.
+        table (str): Tabela de destino, que define as colunas numéricas.
+
+    Retorna:
+        pd.DataFrame: Cópia do DataFrame com as colunas numéricas convertidas.
+    """
+    df = df.copy()
+    for column in NUMERIC_COLUMNS[table]:
+        if column in df:
+            df[column] = parse_br_numbers(df[column])
+    return df
+
+
+def format_br_number(value) -> str:
+    """
+    Formata um inteiro no mesmo formato do site Vitibrasil ("217.208.604", "-" para zero, "nd" se ausente).
+    """
+    # inteiros (o caso comum, vindo do banco) dispensam o pd.isna, que custa mais que a formatação
+    if value is None or (not isinstance(value, int) and pd.isna(value)):
+        return "nd"
+    if value == 0:
+        return "-"
+    return f"{int(value):,}".replace(",", ".")
+
+
+def df_to_records(df: pd.DataFrame, table: str, numeric: bool) -> list:
+    """
+    Converte os dados coletados do site em registros para a resposta da API.
+
+    Parâmetros:
+        df (pd.DataFrame): Dados coletados do site (colunas numéricas em texto).
+        table (str): Tabela correspondente, que define as colunas numéricas.
+        numeric (bool): Se True, as colunas numéricas são devolvidas como números.
+
+    Retorna:
+        list: Lista de dicionários.
+    """
+    if numeric:
+        df = parse_numeric_columns(df, table)
+    # monta os registros a partir das colunas, sem o to_dict(orient="records"), bem mais lento
+    columns = list(df.columns)
+    values = [df[column].to_numpy(dtype=object, na_value=None).tolist() for column in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def build_records(columns: tuple, rows: list, table: str, numeric: bool) -> list:
+    """
+    Monta os registros da resposta direto das linhas do cursor (ou das colunas do motor em memória),
+    já com as colunas numéricas no formato pedido, em uma única passada.
+
+    Parâmetros:
+        columns (tuple): Nomes das colunas, na ordem das linhas (colunas a mais nas linhas são ignoradas).
+        rows (list): Linhas (tuplas), com as colunas numéricas como inteiros.
+        table (str): Tabela de origem, que define as colunas numéricas.
+        numeric (bool): Se False, os números são formatados no texto do site.
+
+    Retorna:
+        list: Lista de dicionários.
+    """
+    if numeric:
+        return [dict(zip(columns, row)) for row in rows]
+    numeric_columns = [(position, column) for position, column in enumerate(columns) if column in NUMERIC_COLUMNS[table]]
+    records = []
+    for row in rows:
+        record = dict(zip(columns, row))
+        for position, column in numeric_columns:
+            record[column] = format_br_number(row[position])
+        records.append(record)
+    return records
+
+
+def filter_contains(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """
+    Filtra os dados coletados do site (modo "live") com a mesma regra das consultas ao banco:
+    busca parcial, sem diferenciar maiúsculas nem acentos.
+
+    Parâmetros:
+        df (pd.DataFrame): Dados coletados do site.
+        filters (dict): {coluna: texto}; textos vazios são ignorados.
+
+    Retorna:
+        pd.DataFrame: Linhas que atendem a todos os filtros.
+    """
+    for column, text in filters.items():
+        if text and not df.empty:
+            # normaliza cada valor distinto uma vez, em vez de cada linha
+            folded = {value: fold(value) for value in df[column].dropna().unique()}
+            query = fold(text)
+            matches = {value for value, normalized in folded.items() if query in normalized}
+            df = df[df[column].isin(matches)]
+    return df
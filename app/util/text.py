@@ -0,0 +1,11 @@
+import unicodedata
+
+
+def fold(text: str) -> str:
+    """
+    Normaliza um texto para comparação: minúsculas, sem acentos e com os espaços simplificados
+    ("Viníferas" e "viniferas" -> "viniferas").
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
@@ -0,0 +1,284 @@
+"""
+Teste de carga da API, em processo: requisições/s e latências p50/p95/p99 por rota.
+
+Todas as rotas são exercitadas (signup, login, as cinco rotas de dados e as cinco */options),
+com tokens obtidos pelo próprio login e uma mistura de filtros como a dos clientes. As rotas de
+dados são medidas nos dois modos de atendimento: "db" (vitibrasil.db) e "live" (scraping),
+este contra o servidor local de benchmarks/mock_vitibrasil.py, a menos que --upstream seja informado.
+No modo db, a medição começa depois de uma consulta à série inteira de cada produto, que coleta
+uma vez os anos ausentes do banco (ver run_mode).
+
+A API roda em uma pasta temporária com uma cópia do vitibrasil.db, para não alterar os bancos
+do projeto, e o resultado sai em JSON para comparar execuções.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+import httpx
+import uvicorn
+from app.core import config
+from app.services.cache import scraper_cache
+from app.services.datasets import OPTION_PRODUCTS
+from app.util.auth import token_cache
+from benchmarks.mock_vitibrasil import create_app
+from main import app
+
+YEARS = range(1970, 2024)
+PASSWORD = "senha-benchmark"
+
+# Valores usados nos filtros opcionais das rotas de dados
+FILTERS = {
+    "producao": {"category": ["vinho de mesa", "suco", "derivados"], "product": ["tinto", "branco", "rosado"]},
+    "processamento": {"group": ["tintas", "brancas e rosadas"], "cultive": ["isabel", "bordo", "cabernet"]},
+    "comercializacao": {"group": ["vinho de mesa", "espumantes"], "product": ["tinto", "branco"]},
+    "importacao": {"country": ["argentina", "chile", "itália", "portugal"]},
+    "exportacao": {"country": ["paraguai", "estados unidos", "china", "alemanha"]},
+}
+
+
+def data_params(route: str) -> dict:
+    """
+    Sorteia os parâmetros de uma requisição a uma rota de dados: ano, produto quando obrigatório
+    e, em metade das requisições, um filtro opcional.
+    """
+    params = {"year": random.choice(YEARS)}
+    if route in OPTION_PRODUCTS:
+        params["product"] = random.choice(list(OPTION_PRODUCTS[route].values()))
+    if random.random() < 0.5:
+        name, values = random.choice(list(FILTERS[route].items()))
+        params[name] = random.choice(values)
+    if random.random() < 0.2:
+        params["numeric"] = "true"
+    return params
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(ms),
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+    }
+
+
+async def run_route(client: httpx.AsyncClient, make_request, total: int, concurrency: int) -> dict:
+    """
+    Executa `total` requisições com `concurrency` clientes simultâneos.
+
+    Parâmetros:
+        client (httpx.AsyncClient): Cliente ligado ao app.
+        make_request: Função (client, i) que envia a i-ésima requisição e retorna a resposta.
+        total (int): Número de requisições.
+        concurrency (int): Requisições simultâneas.
+
+    Retorna:
+        dict: requests, errors, rps, mean_ms, p50_ms, p95_ms e p99_ms.
+    """
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_mode(client: httpx.AsyncClient, mode: str, requests: int, auth_requests: int, concurrency: int, run_id: str) -> dict:
+    """
+    Mede todas as rotas em um modo de atendimento ("db" ou "live").
+    """
+    config.SERVING_MODE = mode
+    scraper_cache.invalidate()
+    results = {}
+
+    async def signup(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/signup", json={"username": f"bench-{run_id}-{mode}-{i}", "password": PASSWORD})
+
+    async def login(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/login", data={"username": f"bench-{run_id}-{mode}-{i % auth_requests}", "password": PASSWORD})
+
+    results["POST /signup"] = await run_route(client, signup, auth_requests, concurrency)
+    tokens = []
+
+    async def login_and_keep(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        response = await login(client, i)
+        if response.status_code == 200:
+            tokens.append(response.json()["access_token"])
+        return response
+
+    results["POST /login"] = await run_route(client, login_and_keep, auth_requests, concurrency)
+    if not tokens:
+        raise RuntimeError("Nenhum login bem-sucedido; não há token para as rotas de dados")
+
+    if mode == "db":
+        # uma consulta à série inteira de cada produto coleta do site, uma vez, os anos ausentes do banco
+        # (ex.: importação de suco de uva, que o site mostra com a tabela vazia) e os registra, como o
+        # crawler deixaria em produção; sem isso, as primeiras consultas a essas fatias mediriam o scraping
+        series = [(route, product) for route in FILTERS for product in OPTION_PRODUCTS.get(route, {None: None}).values()]
+
+        async def warm_up(client: httpx.AsyncClient, i: int) -> httpx.Response:
+            route, product = series[i]
+            params = {"year_from": YEARS[0], "year_to": YEARS[-1]}
+            if product is not None:
+                params["product"] = product
+            return await client.get(f"/{route}", params=params, headers={"Authorization": f"Bearer {tokens[0]}"})
+
+        results["aquecimento (séries completas)"] = await run_route(client, warm_up, len(series), concurrency)
+
+    for route in FILTERS:
+        async def options(client: httpx.AsyncClient, i: int, route: str = route) -> httpx.Response:
+            return await client.get(f"/{route}/options")
+
+        async def data(client: httpx.AsyncClient, i: int, route: str = route) -> httpx.Response:
+            headers = {"Authorization": f"Bearer {random.choice(tokens)}"}
+            return await client.get(f"/{route}", params=data_params(route), headers=headers)
+
+        results[f"GET /{route}/options"] = await run_route(client, options, requests, concurrency)
+        results[f"GET /{route}"] = await run_route(client, data, requests, concurrency)
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_upstream(db_path: str, latency: float, jitter: float) -> uvicorn.Server:
+    """
+    Sobe o servidor local do Vitibrasil em uma thread e aponta VITIBRASIL_URL para ele.
+    """
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(db_path, latency=latency, jitter=jitter), port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    config.VITIBRASIL_URL = f"http://127.0.0.1:{port}/index.php"
+    return server
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecida"
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            for mode in args.modes:
+                results[mode] = await run_mode(client, mode, args.requests, args.auth_requests, args.concurrency, args.run_id)
+    results["token_cache"] = token_cache.stats()
+    return results
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga em processo: requisições/s e p50/p95/p99 por rota.")
+    parser.add_argument("--modes", nargs="+", choices=["db", "live"], default=["db", "live"])
+    parser.add_argument("--requests", type=int, default=200, help="requisições por rota de dados e */options")
+    parser.add_argument("--auth-requests", type=int, default=20, help="requisições de signup e de login (bcrypt é lento de propósito)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--upstream", help="index.php usado no modo live; padrão: servidor local")
+    parser.add_argument("--upstream-latency", type=float, default=0.0, help="latência do servidor local, em segundos")
+    parser.add_argument("--upstream-jitter", type=float, default=0.0)
+    parser.add_argument("--db", default="vitibrasil.db")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+    args.run_id = datetime.now().strftime("%H%M%S")
+
+    random.seed(args.seed)
+    db_path = os.path.abspath(args.db)
+    output = os.path.abspath(args.output) if args.output else None
+    # os logs por requisição da API distorceriam as latências; as falhas aparecem na contagem de erros
+    logging.disable(logging.ERROR)
+    config.REFRESH_INTERVAL = 0
+
+    workdir = tempfile.mkdtemp(prefix="bench_api_")
+    shutil.copy(db_path, os.path.join(workdir, "vitibrasil.db"))
+    server = None
+    if args.upstream:
+        config.VITIBRASIL_URL = args.upstream
+    else:
+        # o modo db também coleta do site os anos ausentes do banco; o servidor local lê (e migra) a sua própria cópia
+        upstream_db = os.path.join(workdir, "upstream.db")
+        shutil.copy(db_path, upstream_db)
+        server = start_upstream(upstream_db, args.upstream_latency, args.upstream_jitter)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        if server is not None:
+            server.should_exit = True
+
+    token_stats = results.pop("token_cache")
+    for mode, routes in results.items():
+        print(f"\nModo {mode}")
+        for route, stats in routes.items():
+            print(
+                f"  {route:<28} {stats['rps']:8.1f} req/s  p50 {stats['p50_ms']:7.2f} ms  "
+                f"p95 {stats['p95_ms']:7.2f} ms  p99 {stats['p99_ms']:7.2f} ms  erros {stats['errors']}"
+            )
+    print(f"\nCache de tokens: {token_stats['hits']} acertos, {token_stats['misses']} falhas ({token_stats['hit_ratio']:.1%})")
+
+    if output:
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "requests": args.requests,
+                "auth_requests": args.auth_requests,
+                "concurrency": args.concurrency,
+                "upstream": args.upstream or "mock",
+                "upstream_latency": args.upstream_latency,
+                "seed": args.seed,
+            },
+            "results": results,
+            "token_cache": token_stats,
+        }
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    """
+        Para executar o teste de carga:
+        python -m benchmarks.bench_api --output api.json
+    """
+    main()
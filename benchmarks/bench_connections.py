@@ -0,0 +1,80 @@
+import argparse
+import json
+import sqlite3
+import statistics
+import time
+from app.core.db import close_pools, connect
+from app.core.migrations import migrate
+
+# Consultas típicas de uma requisição: filtro por ano (rotas de dados) e login
+QUERIES = {
+    "exportacao": ("vitibrasil.db", "SELECT Year, Country, Quantity_Kg, Value_USD, Product FROM exportacao WHERE Year = ? AND Product = ?", (2010, "vinhos de mesa")),
+    "producao": ("vitibrasil.db", "SELECT Year, Category, Product, Quantity_L FROM producao WHERE Year = ?", (2020,)),
+    "login": ("users.db", "SELECT password FROM users WHERE username = ?", ("usuario",)),
+}
+
+
+def per_request_connection(path: str, query: str, params: tuple) -> None:
+    # forma anterior das rotas: uma conexão nova por requisição
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    cursor.fetchall()
+    conn.close()
+
+
+def pooled_connection(path: str, query: str, params: tuple) -> None:
+    with connect(path, readonly=True) as conn:
+        conn.execute(query, params).fetchall()
+
+
+def measure(func, path: str, query: str, params: tuple, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path, query, params)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    timings.sort()
+    return {
+        "median_us": statistics.median(timings),
+        "p95_us": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def ensure_users_db() -> None:
+    with connect("users.db") as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE, password TEXT)")
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Custo por requisição: conexão nova vs. conexão do pool.")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--output", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+    # o vitibrasil.db versionado é o original (colunas em TEXT): converte e indexa, se ainda não foi feito
+    migrate()
+
+    ensure_users_db()
+    results = {}
+    for name, (path, query, params) in QUERIES.items():
+        pooled_connection(path, query, params)  # aquece o pool
+        results[name] = {
+            "per_request": measure(per_request_connection, path, query, params, args.repeat),
+            "pooled": measure(pooled_connection, path, query, params, args.repeat),
+        }
+        before, after = results[name]["per_request"], results[name]["pooled"]
+        print(f"{name}: {before['median_us']:.0f} us -> {after['median_us']:.0f} us (mediana), "
+              f"p95 {before['p95_us']:.0f} us -> {after['p95_us']:.0f} us")
+    close_pools()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    """
+        Para executar o benchmark:
+        python -m benchmarks.bench_connections
+    """
+    main()
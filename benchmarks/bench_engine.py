@@ -0,0 +1,68 @@
+import argparse
+import json
+import logging
+import statistics
+import time
+from app.core import config
+from app.core.migrations import migrate
+from app.services import memory_engine
+from app.services.queries import query_dataset
+
+# Consultas típicas das rotas de dados: (nome, dataset, filtros de query_dataset)
+QUERIES = [
+    ("exportacao ano+produto+país", "exportacao", {"exact": {"Product": "vinhos de mesa"}, "contains": {"Country": "paraguai"}, "years": [2020]}),
+    ("exportacao ano+produto", "exportacao", {"exact": {"Product": "vinhos de mesa"}, "years": [2020]}),
+    ("exportacao produto, 2000-2023", "exportacao", {"exact": {"Product": "espumantes"}, "years": list(range(2000, 2024))}),
+    ("importacao produto+país, todos os anos", "importacao", {"exact": {"Product": "vinhos de mesa"}, "contains": {"Country": "chile"}}),
+    ("processamento anos avulsos+grupo+cultivo", "processamento", {"exact": {"Product": "viníferas"}, "contains": {"GroupName": "tintas", "Cultive": "cab"}, "years": [2001, 2005, 2010]}),
+    ("producao categoria, todos os anos", "producao", {"contains": {"Category": "vinho de mesa"}}),
+    ("comercializacao ano+grupo", "comercializacao", {"contains": {"GroupName": "espumantes"}, "years": [2015]}),
+]
+
+
+def measure(dataset: str, filters: dict, repeat: int) -> dict:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = query_dataset(dataset, **filters)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return {"rows": len(rows), "p50_us": statistics.median(latencies), "mean_us": statistics.fmean(latencies)}
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Latência das consultas das rotas de dados: SQLite vs. motor em memória.")
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--output", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+    # o vitibrasil.db versionado é o original (colunas em TEXT): converte e indexa, se ainda não foi feito
+    migrate()
+
+    logging.disable(logging.INFO)
+    config.QUERY_ENGINE = "memory"
+    start = time.perf_counter()
+    memory_engine.reload()
+    print(f"Carga do motor em memória: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    results = {}
+    for name, dataset, filters in QUERIES:
+        results[name] = {}
+        for engine in ("sqlite", "memory"):
+            config.QUERY_ENGINE = engine
+            results[name][engine] = measure(dataset, filters, args.repeat)
+        sqlite, memory = results[name]["sqlite"], results[name]["memory"]
+        print(
+            f"{name:<44} {memory['rows']:>5} linhas  sqlite p50 {sqlite['p50_us']:8.1f} µs  "
+            f"memória p50 {memory['p50_us']:8.1f} µs  ({sqlite['p50_us'] / memory['p50_us']:4.1f}x)"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    """
+        Para executar o benchmark:
+        python -m benchmarks.bench_engine
+    """
+    main()
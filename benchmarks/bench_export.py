@@ -0,0 +1,78 @@
+import argparse
+import json
+import time
+import tracemalloc
+from app.core.migrations import migrate
+from app.services.export import EXPORT_FORMATS, export_stream
+from app.services.queries import DATASET_COLUMNS, query_dataset
+
+
+def materialized(dataset: str) -> int:
+    """
+    Caminho das rotas de dados sem paginação: todas as linhas em memória e um único JSON.
+    """
+    data = query_dataset(dataset)
+    return len(json.dumps({"success": True, "total": len(data), "data": data}).encode("utf-8"))
+
+
+def streamed(dataset: str, fmt: str, compress: bool) -> int:
+    return sum(len(chunk) for chunk in export_stream(dataset, fmt, compress))
+
+
+def measure(run, rows: int, repeat: int) -> dict:
+    """
+    Mede uma exportação completa: tempo (sem tracemalloc) e pico de memória (com tracemalloc).
+
+    Retorna:
+        dict: bytes, rows_per_s e peak_kib.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        size = run()
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"bytes": size, "rows_per_s": rows / elapsed, "peak_kib": peak / 1024}
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Velocidade e pico de memória das exportações, comparados à resposta JSON completa.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+    # o vitibrasil.db versionado é o original (colunas em TEXT): converte e indexa, se ainda não foi feito
+    migrate()
+
+    variants = {"json (materializado)": materialized}
+    for fmt in EXPORT_FORMATS:
+        variants[fmt] = lambda dataset, fmt=fmt: streamed(dataset, fmt, False)
+        variants[f"{fmt}.gz"] = lambda dataset, fmt=fmt: streamed(dataset, fmt, True)
+
+    results = {}
+    for dataset in DATASET_COLUMNS:
+        rows = len(query_dataset(dataset))
+        results[dataset] = {}
+        for name, run in variants.items():
+            stats = measure(lambda: run(dataset), rows, args.repeat)
+            results[dataset][name] = stats
+            print(
+                f"{dataset:<16} {name:<20} {rows:>6} linhas  {stats['bytes'] / 2**20:6.2f} MiB  "
+                f"{stats['rows_per_s']:9.0f} linhas/s  pico {stats['peak_kib']:9.1f} KiB"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    """
+        Para executar o benchmark:
+        python -m benchmarks.bench_export
+    """
+    main()
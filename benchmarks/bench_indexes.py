@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from app.core.migrations import migrate
+from app.core.schema import INDEXES, ensure_schema, index_name
+
+# Consultas feitas pelas rotas de dados (busca no banco) e pelas rotas */options
+QUERIES = {
+    "producao": ("SELECT Year, Product, Quantity_L FROM producao WHERE Year = ? AND Product LIKE ?", (2020, "tinto")),
+    "producao/options": ("SELECT DISTINCT Category FROM producao", ()),
+    "processamento": (
+        "SELECT Year, GroupName, Cultive, Quantity_Kg, Product FROM processamento "
+        "WHERE Year = ? AND GroupName LIKE ? AND Cultive LIKE ? AND Product LIKE ?",
+        (2003, "%tintas%", "%alfrocheiro%", "%viníferas%"),
+    ),
+    "processamento/options": ("SELECT DISTINCT Cultive FROM processamento", ()),
+    "comercializacao": (
+        "SELECT Year, GroupName, Product, Quantity_L FROM comercializacao WHERE Year = ? AND GroupName LIKE ? AND Product LIKE ?",
+        (2002, "vinho fino de mesa", "tinto"),
+    ),
+    "comercializacao/options": ("SELECT DISTINCT GroupName FROM comercializacao", ()),
+    "importacao": (
+        "SELECT Year, Country, Quantity_Kg, Value_USD, Product FROM importacao WHERE Year = ? AND Country LIKE ? AND Product LIKE ?",
+        (2002, "argentina", "vinhos de mesa"),
+    ),
+    "importacao/options": ("SELECT DISTINCT Country FROM importacao", ()),
+    "exportacao": (
+        "SELECT Year, Country, Quantity_Kg, Value_USD, Product FROM exportacao WHERE Year = ? AND Country LIKE ? AND Product LIKE ?",
+        (2010, "alemanha", "vinhos de mesa"),
+    ),
+    "exportacao/options": ("SELECT DISTINCT Country FROM exportacao", ()),
+    "exportacao/product": ("SELECT Year, Country, Value_USD FROM exportacao WHERE Product = ? AND Year BETWEEN ? AND ?", ("espumantes", 2000, 2020)),
+}
+
+
+def measure(conn: sqlite3.Connection, repeat: int) -> dict:
+    """
+    Executa cada consulta e retorna o plano (EXPLAIN QUERY PLAN) e a latência em milissegundos.
+    """
+    results = {}
+    for name, (query, params) in QUERIES.items():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(query, params).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = {"plan": plan, "median_ms": statistics.median(timings), "min_ms": min(timings)}
+    return results
+
+
+def drop_indexes(conn: sqlite3.Connection) -> None:
+    for table, indexes in INDEXES.items():
+        for columns in indexes:
+            conn.execute(f"DROP INDEX IF EXISTS {index_name(table, columns)}")
+    conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+    conn.commit()
+
+
+def run(db_path: str, repeat: int) -> dict:
+    """
+    Compara planos e latências sem e com os índices, numa cópia do banco informado.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "vitibrasil.db")
+        shutil.copy(db_path, copy)
+        # a cópia é migrada primeiro (colunas INTEGER), para medir as consultas sobre o esquema atual
+        migrate(copy)
+        conn = sqlite3.connect(copy)
+
+        drop_indexes(conn)
+        before = measure(conn, repeat)
+
+        with conn:
+            ensure_schema(conn)
+        conn.execute("ANALYZE")
+        after = measure(conn, repeat)
+        conn.close()
+
+    return {name: {"before": before[name], "after": after[name]} for name in QUERIES}
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN e latência das consultas, sem e com índices.")
+    parser.add_argument("--db", default="vitibrasil.db")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    results = run(args.db, args.repeat)
+    for name, result in results.items():
+        before, after = result["before"], result["after"]
+        speedup = before["median_ms"] / after["median_ms"] if after["median_ms"] else float("inf")
+        print(f"\n{name}: {before['median_ms']:.3f} ms -> {after['median_ms']:.3f} ms ({speedup:.1f}x)")
+        print(f"  antes:  {' | '.join(before['plan'])}")
+        print(f"  depois: {' | '.join(after['plan'])}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    """
+        Para executar o benchmark no banco distribuído com o projeto:
+        python -m benchmarks.bench_indexes --output indexes.json
+    """
+    main()
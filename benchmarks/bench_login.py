@@ -0,0 +1,171 @@
+"""
+Teste de carga do login, em processo: logins/s por concorrência e a latência das rotas de dados
+enquanto logins acontecem ao mesmo tempo.
+
+Compara o caminho anterior (bcrypt chamado direto no handler async, travando o event loop durante
+cada verificação) com o atual (bcrypt no pool de threads de app/util/auth.py). A latência das rotas
+de dados é medida sem logins, como referência, e com `--login-concurrency` clientes fazendo login
+sem parar nos dois caminhos. Com uma CPU, os logins/s dos dois caminhos ficam parecidos (o bcrypt
+é o gargalo), e a latência do login no caminho anterior parece menor porque a espera acontece antes
+do handler começar, com o event loop ocupado; a diferença aparece nas rotas de dados.
+
+A API roda em uma pasta temporária com uma cópia do vitibrasil.db, como no bench_api.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+import httpx
+from app.core import config
+from app.routers import vitibrasil
+from app.util import auth
+from benchmarks.bench_api import FILTERS, PASSWORD, data_params, run_route
+from main import app
+
+USERS = 8
+
+
+async def inline_verifica_pass(plain_password: str, hashed_password: str) -> bool:
+    # caminho anterior: a verificação roda no próprio event loop
+    return auth.verifica_pass(plain_password, hashed_password)
+
+
+def use_pool(enabled: bool) -> None:
+    vitibrasil.verifica_pass_async = auth.verifica_pass_async if enabled else inline_verifica_pass
+
+
+async def create_users(client: httpx.AsyncClient, run_id: str) -> list:
+    usernames = [f"bench-login-{run_id}-{i}" for i in range(USERS)]
+    for username in usernames:
+        await client.post("/signup", json={"username": username, "password": PASSWORD})
+    return usernames
+
+
+async def login_throughput(client: httpx.AsyncClient, usernames: list, total: int, concurrency: int) -> dict:
+    async def login(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/login", data={"username": usernames[i % len(usernames)], "password": PASSWORD})
+
+    return await run_route(client, login, total, concurrency)
+
+
+async def data_latency(client: httpx.AsyncClient, token: str, usernames: list, requests: int, concurrency: int, login_concurrency: int) -> dict:
+    """
+    Latências das rotas de dados com `login_concurrency` clientes fazendo login sem parar (0 = sem logins).
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    routes = list(FILTERS)
+    stop = asyncio.Event()
+    logins = 0
+
+    async def data(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        route = routes[i % len(routes)]
+        return await client.get(f"/{route}", params=data_params(route), headers=headers)
+
+    async def login_loop(worker: int) -> None:
+        nonlocal logins
+        while not stop.is_set():
+            await client.post("/login", data={"username": usernames[worker % len(usernames)], "password": PASSWORD})
+            logins += 1
+            # um cliente real chega pela rede; sem isso, no caminho anterior o login em processo nunca cederia o event loop
+            await asyncio.sleep(0)
+
+    loopers = [asyncio.create_task(login_loop(worker)) for worker in range(login_concurrency)]
+    # deixa os logins começarem antes da medição
+    await asyncio.sleep(0.05 if login_concurrency else 0)
+    start = time.perf_counter()
+    try:
+        stats = await run_route(client, data, requests, concurrency)
+    finally:
+        stop.set()
+        await asyncio.gather(*loopers)
+    stats["logins_per_s"] = logins / (time.perf_counter() - start)
+    return stats
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results = {"login": {}, "data": {}}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=None) as client:
+            usernames = await create_users(client, args.run_id)
+            response = await client.post("/login", data={"username": usernames[0], "password": PASSWORD})
+            token = response.json()["access_token"]
+
+            for pool in (False, True):
+                use_pool(pool)
+                path = "pool" if pool else "inline"
+                for concurrency in args.concurrency:
+                    total = max(args.logins, concurrency)
+                    results["login"][f"{path} c={concurrency}"] = await login_throughput(client, usernames, total, concurrency)
+
+            use_pool(True)
+            results["data"]["sem logins"] = await data_latency(client, token, usernames, args.requests, args.data_concurrency, 0)
+            for pool in (False, True):
+                use_pool(pool)
+                name = f"{'pool' if pool else 'inline'} + {args.login_concurrency} logins"
+                results["data"][name] = await data_latency(client, token, usernames, args.requests, args.data_concurrency, args.login_concurrency)
+            use_pool(True)
+    return results
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Logins/s e latência das rotas de dados sob logins simultâneos: bcrypt no event loop vs. no pool.")
+    parser.add_argument("--rounds", type=int, default=config.BCRYPT_ROUNDS, help="custo do bcrypt das senhas criadas pelo benchmark")
+    parser.add_argument("--workers", type=int, default=config.PASSWORD_HASH_WORKERS, help="threads do pool do bcrypt")
+    parser.add_argument("--logins", type=int, default=16, help="logins por medição de throughput")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=200, help="requisições às rotas de dados por medição")
+    parser.add_argument("--data-concurrency", type=int, default=4)
+    parser.add_argument("--login-concurrency", type=int, default=4, help="clientes fazendo login durante a medição das rotas de dados")
+    parser.add_argument("--db", default="vitibrasil.db")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+    args.run_id = datetime.now().strftime("%H%M%S")
+
+    random.seed(args.seed)
+    db_path = os.path.abspath(args.db)
+    output = os.path.abspath(args.output) if args.output else None
+    logging.disable(logging.ERROR)
+    config.REFRESH_INTERVAL = 0
+    config.SERVING_MODE = "db"
+    config.PASSWORD_HASH_WORKERS = args.workers
+    auth.pwd_context.update(bcrypt__rounds=args.rounds)
+
+    workdir = tempfile.mkdtemp(prefix="bench_login_")
+    shutil.copy(db_path, os.path.join(workdir, "vitibrasil.db"))
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"bcrypt rounds={args.rounds}, {args.workers} threads no pool, {os.cpu_count()} CPUs")
+    for name, stats in results["login"].items():
+        print(f"  login {name:<16} {stats['rps']:7.2f} logins/s  p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  erros {stats['errors']}")
+    for name, stats in results["data"].items():
+        print(
+            f"  dados {name:<22} {stats['rps']:8.1f} req/s  p50 {stats['p50_ms']:7.2f} ms  p95 {stats['p95_ms']:8.2f} ms  "
+            f"p99 {stats['p99_ms']:8.2f} ms  ({stats['logins_per_s']:.1f} logins/s)  erros {stats['errors']}"
+        )
+
+    if output:
+        report = {"meta": {"rounds": args.rounds, "workers": args.workers, "cpus": os.cpu_count()}, "results": results}
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    """
+        Para executar o benchmark:
+        python -m benchmarks.bench_login --output login.json
+    """
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import json
+import logging
+import sys
+import time
+import tracemalloc
+import pandas as pd
+from app.services.datasets import DATASETS, parse_page
+from benchmarks import legacy_parsers
+from benchmarks.fixtures import CAPTURED_DIR, FIXTURES_DIR, load_corpus
+
+
+def legacy_parse(name: str, html: str, year: int, option) -> pd.DataFrame:
+    parse = getattr(legacy_parsers, f"parse_{name}")
+    return parse(html, year) if option is None else parse(html, year, option)
+
+
+def lxml_parse(name: str, html: str, year: int, option) -> pd.DataFrame:
+    return parse_page(DATASETS[name], html, year, option)
+
+
+PARSERS = {"bs4": legacy_parse, "lxml": lxml_parse}
+
+
+def measure(parse, pages: list, repeat: int) -> dict:
+    """
+    Mede um parser sobre as páginas: velocidade sem tracemalloc e memória com tracemalloc.
+
+    Retorna:
+        dict: pages_per_s, cpu_ms_per_page, alloc_kib_per_page (média do pico alocado
+            durante o parsing de cada página) e peak_kib (maior pico entre as páginas).
+            O tracemalloc só enxerga alocações feitas pelo Python: a árvore do libxml2
+            criada pelo lxml não entra nas contas de memória.
+    """
+    wall = cpu = 0.0
+    for _ in range(repeat):
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        for page in pages:
+            parse(page["dataset"], page["html"], page["year"], page["option"])
+        wall += time.perf_counter() - start_wall
+        cpu += time.process_time() - start_cpu
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for page in pages:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            parse(page["dataset"], page["html"], page["year"], page["option"])
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    parsed = len(pages) * repeat
+    return {
+        "pages_per_s": parsed / wall,
+        "cpu_ms_per_page": cpu * 1000 / parsed,
+        "alloc_kib_per_page": sum(peaks) / len(peaks) / 1024,
+        "peak_kib": max(peaks) / 1024,
+    }
+
+
+def check(pages: list) -> list:
+    """
+    Confere o extrator lxml contra o manifesto do corpus e contra os parsers antigos.
+
+    Retorna:
+        list: Descrição das páginas com divergência (vazia se tudo confere).
+    """
+    errors = []
+    for page in pages:
+        args = (page["dataset"], page["html"], page["year"], page["option"])
+        df = lxml_parse(*args)
+        if len(df) != page["rows"]:
+            errors.append(f"{page['file']}: {len(df)} linhas, esperado {page['rows']}")
+            continue
+        if df.empty:
+            # sem linhas, o parser antigo devolve um DataFrame sem colunas; as linhas já conferem
+            continue
+        try:
+            pd.testing.assert_frame_equal(df, legacy_parse(*args), check_column_type=False, check_index_type=False)
+        except AssertionError as e:
+            errors.append(f"{page['file']}: diferente do parser antigo ({e})")
+    return errors
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Páginas/s, alocações e pico de memória dos parsers, sobre o corpus offline.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="pasta do corpus (python -m benchmarks.fixtures)")
+    parser.add_argument("--captured", default=CAPTURED_DIR, help="pasta das páginas reais (python -m benchmarks.fixtures --capture)")
+    parser.add_argument("--parsers", nargs="+", choices=list(PARSERS), default=list(PARSERS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+
+    # a página sem tabela do corpus gera um aviso a cada parsing
+    logging.disable(logging.WARNING)
+    pages = load_corpus(args.fixtures)
+    # as páginas reais só entram na conferência: as medições seguem comparáveis entre execuções
+    captured = load_corpus(args.captured)
+    for page in captured:
+        page["file"] = f"captured/{page['file']}"
+    if not captured:
+        print(f"AVISO: nenhuma página real em {args.captured}; capture com python -m benchmarks.fixtures --capture")
+    errors = check(pages + captured)
+    for error in errors:
+        print(f"ERRO: {error}")
+
+    results = {}
+    for name in DATASETS:
+        selected = [page for page in pages if page["dataset"] == name]
+        results[name] = {}
+        for parser_name in args.parsers:
+            stats = measure(PARSERS[parser_name], selected, args.repeat)
+            results[name][parser_name] = stats
+            print(
+                f"{name:<16} {parser_name:<5} {len(selected):>3} páginas  {stats['pages_per_s']:8.1f} páginas/s  "
+                f"{stats['cpu_ms_per_page']:6.2f} ms CPU/página  {stats['alloc_kib_per_page']:8.1f} KiB/página  "
+                f"pico {stats['peak_kib']:8.1f} KiB"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    """
+        Para executar o benchmark:
+        python -m benchmarks.bench_parsers
+    """
+    main()
@@ -0,0 +1,164 @@
+"""
+Micro-benchmark da serialização das respostas das rotas de dados: tempo e pico de memória para
+os maiores corpos de exportação e processamento (todos os anos do produto com mais linhas).
+
+Compara o caminho anterior (registros montados, formatados em uma segunda passada e serializados
+pelo json da biblioteca padrão no JSONResponse) com o atual (registros montados e formatados na
+mesma passada, direto do cursor ou das colunas do motor em memória, e serializados com orjson no
+ORJSONResponse), nos dois motores de consulta e no caminho do modo "live" (DataFrame do scraping).
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+import pandas as pd
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.core import config
+from app.core.db import connect
+from app.core.migrations import migrate
+from app.core.schema import NUMERIC_COLUMNS
+from app.services import memory_engine
+from app.services.queries import query_dataset
+from app.util.helpers import df_to_records, format_br_number
+
+DATASETS = ("exportacao", "processamento")
+
+
+def largest_product(dataset: str) -> str:
+    with connect("vitibrasil.db", readonly=True) as conn:
+        return conn.execute(f"SELECT Product FROM {dataset} GROUP BY Product ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+
+
+def legacy_df_to_records(df: pd.DataFrame, table: str, numeric: bool) -> list:
+    """
+    df_to_records antes do caminho atual: to_dict(orient="records") sobre o DataFrame inteiro.
+    """
+    if numeric:
+        df = df.copy()
+        for column in NUMERIC_COLUMNS[table]:
+            text = df[column].astype("string").str.strip()
+            text = text.mask(text == "-", "0").str.replace(".", "", regex=False)
+            df[column] = pd.to_numeric(text, errors="coerce").astype("Int64")
+        df = df.astype(object).where(df.notna(), None)
+    return df.to_dict(orient="records")
+
+
+def legacy_format_records(data: list, table: str, numeric: bool) -> list:
+    """
+    Segunda passada do caminho anterior: formata as colunas numéricas de registros já montados.
+    """
+    if numeric:
+        return data
+    columns = NUMERIC_COLUMNS[table]
+    for row in data:
+        for column in columns:
+            if column in row:
+                row[column] = format_br_number(row[column])
+    return data
+
+
+def site_frame(dataset: str, product: str) -> pd.DataFrame:
+    """
+    DataFrame como o dos scrapers: as linhas do banco com os números no texto do site.
+    """
+    df = pd.DataFrame(query_dataset(dataset, exact={"Product": product}))
+    for column in NUMERIC_COLUMNS[dataset]:
+        df[column] = [format_br_number(value) for value in df[column]]
+    return df
+
+
+def envelope(data: list) -> dict:
+    return {"success": True, "total": len(data), "data": data, "next": None, "updated_at": "2024-01-01T00:00:00+00:00"}
+
+
+def paths(dataset: str, product: str, numeric: bool) -> dict:
+    """
+    Funções que produzem o corpo da resposta, do resultado da consulta (ou do DataFrame) aos bytes.
+    """
+    exact = {"Product": product}
+    df = site_frame(dataset, product)
+
+    def legacy_db() -> bytes:
+        data = legacy_format_records(query_dataset(dataset, exact=exact), dataset, numeric)
+        return JSONResponse(envelope(data)).body
+
+    def current_db() -> bytes:
+        return ORJSONResponse(envelope(query_dataset(dataset, exact=exact, numeric=numeric))).body
+
+    def legacy_live() -> bytes:
+        return JSONResponse(envelope(legacy_df_to_records(df, dataset, numeric))).body
+
+    def current_live() -> bytes:
+        return ORJSONResponse(envelope(df_to_records(df, dataset, numeric))).body
+
+    return {
+        "db/sqlite anterior": ("sqlite", legacy_db),
+        "db/sqlite atual": ("sqlite", current_db),
+        "db/memory anterior": ("memory", legacy_db),
+        "db/memory atual": ("memory", current_db),
+        "live anterior": ("sqlite", legacy_live),
+        "live atual": ("sqlite", current_live),
+    }
+
+
+def measure(run, repeat: int) -> dict:
+    """
+    Tempo mediano (sem tracemalloc) e pico de memória alocada (com tracemalloc) de uma serialização.
+    """
+    run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(run())
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"bytes": size, "ms": statistics.median(times) * 1000, "peak_kib": peak / 1024}
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Tempo e memória da serialização das maiores respostas das rotas de dados.")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--output", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argv)
+    # o vitibrasil.db versionado é o original (colunas em TEXT): converte e indexa, se ainda não foi feito
+    migrate()
+
+    results = {}
+    engine = config.QUERY_ENGINE
+    try:
+        for dataset in DATASETS:
+            product = largest_product(dataset)
+            rows = len(query_dataset(dataset, exact={"Product": product}))
+            for numeric in (False, True):
+                key = f"{dataset} numeric={str(numeric).lower()}"
+                results[key] = {}
+                for name, (query_engine, run) in paths(dataset, product, numeric).items():
+                    config.QUERY_ENGINE = query_engine
+                    memory_engine.reload([dataset])
+                    stats = measure(run, args.repeat)
+                    results[key][name] = stats
+                    print(
+                        f"{key:<30} {name:<20} {rows:>6} linhas  {stats['bytes'] / 2**20:5.2f} MiB  "
+                        f"{stats['ms']:8.1f} ms  pico {stats['peak_kib']:9.1f} KiB"
+                    )
+    finally:
+        config.QUERY_ENGINE = engine
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    """
+        Para executar o benchmark:
+        python -m benchmarks.bench_render
+    """
+    main()
@@ -0,0 +1,183 @@
+"""
+Corpus de páginas do Vitibrasil salvas em disco, para medir e conferir os parsers sem acesso ao site.
+
+As páginas são geradas a partir do vitibrasil.db no layout do site (benchmarks/site_pages.py) e
+ficam em benchmarks/fixtures/, com um manifest.json descrevendo cada página e quantas linhas
+os parsers devem extrair dela.
+
+Como essas páginas saem do nosso próprio renderizador, benchmarks/fixtures/captured/ guarda
+também páginas baixadas do site real, uma por layout de tabela (python -m benchmarks.fixtures
+--capture). É nelas que uma mudança no HTML do Vitibrasil aparece.
+"""
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from app.core import config
+from app.core.migrations import migrate
+from app.services.datasets import DATASETS, page_url
+from app.services.http_client import fetch_html
+from benchmarks.site_pages import fetch_slice, render_page
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+CAPTURED_DIR = os.path.join(FIXTURES_DIR, "captured")
+MANIFEST = "manifest.json"
+SITE_URL = "http://vitibrasil.cnpuv.embrapa.br/index.php"
+
+# Uma página real por layout de tabela do site: (dataset, ano, opção, layout)
+CAPTURE_PAGES = (
+    ("producao", 2023, None, "padrao"),
+    ("processamento", 2023, 1, "padrao"),
+    ("processamento", 2023, 4, "sem_definicao"),
+    ("comercializacao", 2023, None, "padrao"),
+    ("importacao", 2023, 1, "padrao"),
+    ("exportacao", 2023, 1, "padrao"),
+)
+
+# Anos representativos: início da série, meio e o último ano completo
+FIXTURE_YEARS = (1970, 1995, 2023)
+
+
+def fixture_name(dataset: str, year: int, option, layout: str = "padrao") -> str:
+    opcao = DATASETS[dataset].opcao
+    suffix = f"_subopt_0{option}" if option else ""
+    layout = "" if layout == "padrao" else f"_{layout}"
+    return f"{dataset}_{opcao}{suffix}_{year}{layout}.html"
+
+
+def build_corpus(db_path: str = "vitibrasil.db", directory: str = FIXTURES_DIR) -> dict:
+    """
+    Gera as páginas do corpus e o manifest.json.
+
+    Além do layout padrão de cada opcao/subopcao em FIXTURE_YEARS, inclui o layout
+    "Sem definição" de processamento e uma página sem tabela de dados. As fatias sem linhas no
+    banco (ex.: importação de suco de uva) saem com a tabela vazia, como o site as mostra.
+
+    Parâmetros:
+        db_path (str): Banco de onde vêm os dados.
+        directory (str): Pasta onde as páginas são salvas.
+
+    Retorna:
+        dict: Manifesto {arquivo: {dataset, year, option, layout, rows}}.
+    """
+    os.makedirs(directory, exist_ok=True)
+    migrate(db_path)
+    manifest = {}
+
+    def add(dataset: str, year: int, option, layout: str, html: str, rows: int) -> None:
+        name = fixture_name(dataset, year, option, layout)
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        manifest[name] = {"dataset": dataset, "year": year, "option": option, "layout": layout, "rows": rows}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        for name, dataset in DATASETS.items():
+            for year in FIXTURE_YEARS:
+                for option in dataset.options:
+                    rows = fetch_slice(conn, name, year, option)
+                    add(name, year, option, "padrao", render_page(name, year, option, rows), len(rows))
+
+        year = FIXTURE_YEARS[-1]
+        rows = fetch_slice(conn, "processamento", year, 4)
+        add("processamento", year, 4, "sem_definicao", render_page("processamento", year, 4, rows, sem_definicao=True), len(rows))
+        add("processamento", year, 1, "sem_tabela", render_page("processamento", year, 1, None), 0)
+    finally:
+        conn.close()
+
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def capture_pages(db_path: str = "vitibrasil.db", directory: str = CAPTURED_DIR, url: str = SITE_URL) -> dict:
+    """
+    Baixa do site Vitibrasil as páginas de CAPTURE_PAGES, como vieram, e grava o manifest.json delas.
+
+    As linhas esperadas vêm do vitibrasil.db (a fatia da página no banco), não dos parsers,
+    para que a conferência não dependa do código que ela confere.
+
+    Parâmetros:
+        db_path (str): Banco de onde vêm as linhas esperadas.
+        directory (str): Pasta onde as páginas são salvas.
+        url (str): index.php do site.
+
+    Retorna:
+        dict: Manifesto {arquivo: {dataset, year, option, layout, rows, url, captured_at}}.
+    """
+    os.makedirs(directory, exist_ok=True)
+    migrate(db_path)
+    config.VITIBRASIL_URL = url
+    manifest = {}
+    conn = sqlite3.connect(db_path)
+    try:
+        for dataset, year, option, layout in CAPTURE_PAGES:
+            page = page_url(DATASETS[dataset], year, option)
+            html = fetch_html(page)
+            name = fixture_name(dataset, year, option, layout)
+            with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+                f.write(html)
+            manifest[name] = {
+                "dataset": dataset,
+                "year": year,
+                "option": option,
+                "layout": layout,
+                "rows": len(fetch_slice(conn, dataset, year, option)),
+                "url": page,
+                "captured_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+    finally:
+        conn.close()
+
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def load_corpus(directory: str = FIXTURES_DIR) -> list:
+    """
+    Lê as páginas do corpus. Uma pasta sem manifest.json (páginas reais ainda não capturadas)
+    resulta em uma lista vazia.
+
+    Retorna:
+        list: Dicionários do manifesto, acrescidos da chave "html".
+    """
+    if not os.path.exists(os.path.join(directory, MANIFEST)):
+        return []
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    pages = []
+    for name, entry in manifest.items():
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            pages.append(dict(entry, file=name, html=f.read()))
+    return pages
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Gera o corpus de páginas do Vitibrasil a partir do vitibrasil.db.")
+    parser.add_argument("--db", default="vitibrasil.db")
+    parser.add_argument("--output", help="pasta do corpus (padrão: benchmarks/fixtures, ou fixtures/captured com --capture)")
+    parser.add_argument("--capture", action="store_true", help="baixa do site real uma página por layout de tabela")
+    parser.add_argument("--url", default=SITE_URL, help="index.php do site, com --capture")
+    args = parser.parse_args(argv)
+
+    if args.capture:
+        output = args.output or CAPTURED_DIR
+        manifest = capture_pages(args.db, output, args.url)
+    else:
+        output = args.output or FIXTURES_DIR
+        manifest = build_corpus(args.db, output)
+    print(f"{len(manifest)} páginas salvas em {output}")
+
+
+if __name__ == "__main__":
+    """
+        Para gerar novamente o corpus de páginas:
+        python -m benchmarks.fixtures
+
+        Para capturar novamente as páginas reais do site:
+        python -m benchmarks.fixtures --capture
+    """
+    main()
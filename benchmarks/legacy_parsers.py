@@ -0,0 +1,261 @@
+"""
+Parsers com BeautifulSoup usados pelos scrapers antes de app/services/table_extractor.py.
+
+Mantidos apenas como referência para o benchmark de parsing e para conferir que a
+extração com lxml produz os mesmos dados.
+"""
+import logging
+import pandas as pd
+from bs4 import BeautifulSoup
+
+
+def parse_producao(html: str, year: int) -> pd.DataFrame:
+    """
+    Extrai a tabela de producao do HTML de uma página do Vitibrasil.
+
+    Parâmetros:
+        html (str): HTML da página.
+        year (int): Ano da página.
+    
+    Retorna:
+        pd.DataFrame: Dados da tabela.
+    """
+    soup = BeautifulSoup(html, "html.parser") 
+    table = soup.find("table", class_="tb_base tb_dados")
+    
+    if not table:
+        return pd.DataFrame()
+
+    rows = table.find_all("tr")
+    data = []
+    for row in rows:
+        cols = row.find_all("td")
+        if len(cols) == 2:
+            if "tb_item" in cols[0].get("class", []):
+                current_product = cols[0].text.strip().lower()
+                total_quantity = cols[1].text.strip().lower()
+                data.append({
+                    "Year": year,
+                    "Category": current_product,
+                    "Product": "todos da categoria",
+                    "Quantity_L": total_quantity
+                })
+                continue
+            
+            quantity = cols[1].text.strip().lower()
+            subProduct = cols[0].text.strip().lower()
+            data.append({
+                "Year": year,
+                "Category": current_product if 'current_product' in locals() else None,
+                "Product": subProduct,
+                "Quantity_L": quantity
+            })
+
+    return pd.DataFrame(data)
+
+
+def parse_processamento(html: str, year: int, option: int) -> pd.DataFrame:
+    """
+    Extrai a tabela de processamento do HTML de uma página do Vitibrasil.
+
+    Parâmetros:
+        html (str): HTML da página.
+        year (int): Ano da página.
+        option (int): Opção do produto da página.
+            
+    Retorna:
+        pd.DataFrame: Dados da tabela.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_="tb_base tb_dados")
+    
+    if not table: 
+        product_tags = soup.find_all("button", class_="btn_sopt")
+        logging.warning(f"Table not found for year {year}, option {option} (produto: {product_tags[option-1].text.strip().lower() if len(product_tags) >= option else 'desconhecido'})")
+        return pd.DataFrame()
+    
+    product_tags = soup.find_all("button", class_="btn_sopt")
+    if len(product_tags) >= option:
+        product = product_tags[option-1].text.strip().lower()
+    else:
+        product = None
+        
+    rows = table.find_all("tr")
+    data = []
+
+    group = None
+    col_sem_definicao = table.find_all("th",class_="tb_base tb_dados", string="Sem definição ")
+
+    for row in rows:
+        cols = row.find_all("td")
+        if len(cols) != 2:
+            continue
+
+        col1_class = cols[0].get("class", [])
+
+        if "tb_item" in col1_class:
+            group = cols[0].text.strip().lower()
+            cultive = group
+            quantity = cols[1].text.strip().lower()
+        elif "tb_subitem" in col1_class:
+            cultive = cols[0].text.strip().lower()
+            quantity = cols[1].text.strip().lower()
+        else:
+            continue
+        
+        if col_sem_definicao != []:
+            data.append({
+                "Year": year, 
+                "GroupName": group
+            })
+        else:
+                data.append({
+                "Year": year, 
+                "GroupName": group, 
+                "Cultive": cultive,
+                "Quantity_Kg": quantity,
+                "Product": product
+            })
+
+    return pd.DataFrame(data)
+
+
+def parse_comercializacao(html: str, year: int) -> pd.DataFrame:
+    """
+    Extrai a tabela de comercialização do HTML de uma página do Vitibrasil.
+
+    Parâmetros:
+        html (str): HTML da página.
+        year (int): Ano da página.
+
+    Retorna:
+        pd.DataFrame: Dados da tabela.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_="tb_base tb_dados")
+    
+    if not table:
+        return pd.DataFrame()
+    
+    rows = table.find_all("tr")
+    data = []
+    group = None
+
+    for row in rows:
+        cols = row.find_all("td")
+        if len(cols) != 2:
+            continue
+
+        col1_class = cols[0].get("class", []) 
+
+        if "tb_item" in col1_class: 
+            group = cols[0].text.strip().lower()
+            product = group
+            quantity = cols[1].text.strip().lower()
+        elif "tb_subitem" in col1_class: 
+            product = cols[0].text.strip().lower()
+            quantity = cols[1].text.strip().lower()
+        else:
+            continue
+
+        data.append({
+            "Year": year, 
+            "GroupName": group, 
+            "Product": product,
+            "Quantity_L": quantity
+        })
+
+    return pd.DataFrame(data)
+
+
+def parse_importacao(html: str, year: int, option: int) -> pd.DataFrame:
+    """
+    Extrai a tabela de importação do HTML de uma página do Vitibrasil.
+
+    Parâmetros:
+        html (str): HTML da página.
+        year (int): Ano da página.
+        option (int): Opção do produto da página.
+
+    Retorna:
+        pd.DataFrame: Dados da tabela.
+    """
+    data = []
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_="tb_base tb_dados")
+    
+    if not table: 
+        product_tags = soup.find_all("button", class_="btn_sopt")
+        logging.warning(f"Table not found for year {year}, option {option} (produto: {product_tags[option-1].text.strip().lower() if len(product_tags) >= option else 'desconhecido'})")
+        return pd.DataFrame()
+
+    product_tags = soup.find_all("button", class_="btn_sopt")
+    if len(product_tags) >= option:
+        product = product_tags[option-1].text.strip().lower()
+    else:
+        product = None
+    
+    rows = table.find_all("tr")
+    for row in rows:
+        cols = row.find_all("td")
+        if len(cols) != 3:
+            continue
+        
+        country = cols[0].text.strip().lower()
+        quantity = cols[1].text.strip().lower()
+        value = cols[2].text.strip().lower()
+        
+        data.append({
+            "Year": year,
+            "Country": country, 
+            "Quantity_Kg": quantity, 
+            "Value_USD": value,
+            "Product": product
+        })
+    return pd.DataFrame(data)
+
+
+def parse_exportacao(html: str, year: int, option: int) -> pd.DataFrame:
+    """
+    Extrai a tabela de exportação do HTML de uma página do Vitibrasil.
+
+    Parâmetros:
+        html (str): HTML da página.
+        year (int): Ano da página.
+        option (int): Opção do produto da página.
+
+    Retorna:
+        pd.DataFrame: Dados da tabela.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_="tb_base tb_dados")
+    product_tags = soup.find_all("button", class_="btn_sopt")
+    if len(product_tags) >= option:
+        product = product_tags[option-1].text.strip().lower()
+    else:
+        product = None
+        
+    if not table:
+        return pd.DataFrame()
+    
+    rows = table.find_all("tr")
+    data = [] 
+
+    for row in rows:
+        cols = row.find_all("td")
+        if len(cols) != 3:
+            continue
+
+        country = cols[0].text.strip().lower()
+        quantity = cols[1].text.strip().lower()
+        value = cols[2].text.strip().lower()
+
+        data.append({
+            "Year": year,
+            "Country": country, 
+            "Quantity_Kg": quantity, 
+            "Value_USD": value,
+            "Product": product
+        })
+
+    return pd.DataFrame(data)
@@ -0,0 +1,163 @@
+"""
+Servidor local que imita o index.php do site Vitibrasil, para testes de carga sem acessar a Embrapa.
+
+Responde à mesma interface (index.php?ano=...&opcao=...&subopcao=...) com as páginas do corpus
+em benchmarks/fixtures/ ou, para os demais anos, com páginas geradas a partir do vitibrasil.db.
+Latência, taxa de erros e limite de requisições por segundo são configuráveis.
+
+Para apontar a API e o crawler para o servidor local (o servidor lê de uma cópia do banco,
+já que o crawler regrava o vitibrasil.db):
+    cp vitibrasil.db /tmp/vitibrasil.mock.db
+    python -m benchmarks.mock_vitibrasil --db /tmp/vitibrasil.mock.db --latency 0.2
+    VITIBRASIL_URL=http://127.0.0.1:8081/index.php uvicorn main:app
+    VITIBRASIL_URL=http://127.0.0.1:8081/index.php python -m app.services.crawler --rebuild
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Optional
+import uvicorn
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import HTMLResponse, Response
+from app.core.migrations import migrate
+from app.services.datasets import DATASETS
+from benchmarks.fixtures import FIXTURES_DIR, fixture_name
+from benchmarks.site_pages import fetch_slice, render_page
+
+DATASETS_BY_OPCAO = {dataset.opcao: name for name, dataset in DATASETS.items()}
+
+
+class TokenBucket:
+    """
+    Limite de requisições por segundo, com rajadas de até `burst` requisições.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def allow(self) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+def create_app(
+    db_path: str = "vitibrasil.db",
+    fixtures: str = FIXTURES_DIR,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    rate: float = 0.0,
+    burst: int = 10,
+) -> FastAPI:
+    """
+    Cria o app do servidor local.
+
+    Parâmetros:
+        db_path (str): Banco usado para gerar as páginas que não estão no corpus.
+        fixtures (str): Pasta do corpus de páginas.
+        latency (float): Atraso fixo, em segundos, de cada resposta.
+        jitter (float): Atraso adicional aleatório, entre 0 e `jitter` segundos.
+        error_rate (float): Fração das requisições respondidas com erro 503.
+        rate (float): Requisições por segundo aceitas (0 = sem limite); as excedentes recebem 429.
+        burst (int): Requisições aceitas de uma vez antes do limite valer.
+
+    Retorna:
+        FastAPI: App a ser servido pelo uvicorn.
+    """
+    app = FastAPI(title="Vitibrasil (servidor local)")
+    bucket = TokenBucket(rate, burst)
+    # as páginas são geradas das colunas já convertidas para INTEGER
+    migrate(db_path)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    app.state.stats = {"requests": 0, "throttled": 0, "errors": 0, "not_modified": 0}
+
+    @lru_cache(maxsize=2048)
+    def page(dataset: str, year: int, option: Optional[int]) -> str:
+        path = os.path.join(fixtures, fixture_name(dataset, year, option))
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        rows = fetch_slice(conn, dataset, year, option)
+        # fatias sem linhas no banco (ex.: importação de suco de uva) saem com a tabela vazia, como no site
+        return render_page(dataset, year, option, rows)
+
+    @app.get("/index.php")
+    async def index(
+        request: Request,
+        ano: int = Query(2023),
+        opcao: str = Query("opt_02"),
+        subopcao: Optional[str] = Query(None),
+    ) -> Response:
+        stats = app.state.stats
+        stats["requests"] += 1
+        if not bucket.allow():
+            stats["throttled"] += 1
+            return Response(status_code=429, headers={"Retry-After": "1"})
+
+        delay = latency + random.uniform(0, jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if error_rate and random.random() < error_rate:
+            stats["errors"] += 1
+            return Response(status_code=503)
+
+        dataset = DATASETS_BY_OPCAO.get(opcao)
+        if dataset is None:
+            return HTMLResponse("<html><body></body></html>")
+        options = DATASETS[dataset].options
+        option = None
+        if options != (None,):
+            option = int(subopcao.rsplit("_", 1)[-1]) if subopcao else options[0]
+
+        html = page(dataset, ano, option)
+        etag = f'"{hashlib.md5(html.encode("utf-8")).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            stats["not_modified"] += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        return HTMLResponse(html, headers={"ETag": etag})
+
+    @app.get("/stats")
+    async def get_stats() -> dict:
+        return app.state.stats
+
+    return app
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Servidor local que imita o site Vitibrasil.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--db", default="vitibrasil.db")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--latency", type=float, default=0.0, help="atraso fixo por resposta, em segundos")
+    parser.add_argument("--jitter", type=float, default=0.0, help="atraso aleatório adicional, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas 503")
+    parser.add_argument("--rate", type=float, default=0.0, help="requisições por segundo aceitas; as demais recebem 429")
+    parser.add_argument("--burst", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    app = create_app(args.db, args.fixtures, args.latency, args.jitter, args.error_rate, args.rate, args.burst)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    """
+        Para subir o servidor local:
+        python -m benchmarks.mock_vitibrasil --latency 0.2 --jitter 0.1 --error-rate 0.02 --rate 20
+    """
+    main()
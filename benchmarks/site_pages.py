@@ -0,0 +1,181 @@
+"""
+Gera páginas no layout do site Vitibrasil a partir dos dados do vitibrasil.db.
+
+Usado pelos benchmarks, que não podem depender do acesso ao site. As páginas seguem a
+estrutura lida pelos scrapers: tabela "tb_base tb_dados" com linhas "tb_item"/"tb_subitem"
+e os botões "btn_sopt" das sub-opções.
+"""
+import sqlite3
+from html import escape
+from typing import Optional
+from app.core.migrations import migrate
+from app.services.datasets import DATASETS, OPTION_PRODUCTS
+from app.util.helpers import format_br_number
+
+TABS = [
+    ("opt_01", "Apresentação"),
+    ("opt_02", "Produção"),
+    ("opt_03", "Processamento"),
+    ("opt_04", "Comercialização"),
+    ("opt_05", "Importação"),
+    ("opt_06", "Exportação"),
+    ("opt_07", "Publicação"),
+]
+
+TITLES = {
+    "producao": "Produção de vinhos, sucos e derivados do Rio Grande do Sul",
+    "processamento": "Quantidade de uvas processadas no Rio Grande do Sul",
+    "comercializacao": "Comercialização de vinhos e derivados no Rio Grande do Sul",
+    "importacao": "Importação de derivados de uva",
+    "exportacao": "Exportação de derivados de uva",
+}
+
+HEADERS = {
+    "producao": ("Produto", "Quantidade (L.)"),
+    "processamento": ("Cultivar", "Quantidade (Kg)"),
+    "comercializacao": ("Produto", "Quantidade (L.)"),
+    "importacao": ("Países", "Quantidade (Kg)", "Valor (US$)"),
+    "exportacao": ("Países", "Quantidade (Kg)", "Valor (US$)"),
+}
+
+
+def fetch_slice(conn: sqlite3.Connection, dataset: str, year: int, option: Optional[int]) -> list:
+    """
+    Linhas de uma página (dataset, ano, opção), na ordem em que foram coletadas.
+    """
+    query = {
+        "producao": "SELECT Category, Product, Quantity_L FROM producao WHERE Year = ?",
+        "processamento": "SELECT GroupName, Cultive, Quantity_Kg FROM processamento WHERE Year = ? AND Product = ?",
+        "comercializacao": "SELECT GroupName, Product, Quantity_L FROM comercializacao WHERE Year = ?",
+        "importacao": "SELECT Country, Quantity_Kg, Value_USD FROM importacao WHERE Year = ? AND Product = ?",
+        "exportacao": "SELECT Country, Quantity_Kg, Value_USD FROM exportacao WHERE Year = ? AND Product = ?",
+    }[dataset] + " ORDER BY id"
+    params = (year,) if option is None else (year, OPTION_PRODUCTS[dataset][option])
+    return conn.execute(query, params).fetchall()
+
+
+def render_rows(dataset: str, rows: list) -> str:
+    lines = []
+    for row in rows:
+        if dataset in ("importacao", "exportacao"):
+            country, quantity, value = row
+            lines.append(f"<tr><td>{escape(country.title())}</td><td>{format_br_number(quantity)}</td><td>{format_br_number(value)}</td></tr>")
+            continue
+
+        group, name, quantity = row
+        # a linha do grupo traz o total do grupo; os itens vêm logo abaixo
+        is_item = name == "todos da categoria" if dataset == "producao" else name == group
+        css = "tb_item" if is_item else "tb_subitem"
+        label = group.upper() if is_item else name.title()
+        lines.append(f'<tr><td class="{css}">{escape(label)}</td><td class="{css}">{format_br_number(quantity)}</td></tr>')
+    return "\n".join(lines)
+
+
+def render_table(dataset: str, rows: Optional[list], sem_definicao: bool = False) -> str:
+    """
+    Monta a tabela de dados da página. Com rows=[], a tabela sai como o site a mostra quando a fatia
+    não tem registros (cabeçalho e total, sem linhas); com rows=None, a página traz apenas um aviso.
+    """
+    if rows is None:
+        return '<p class="text_center">Não há dados disponíveis para o ano selecionado.</p>'
+
+    if sem_definicao:
+        # layout de processamento em que o site não define cultivares para a sub-opção
+        labels = ("Sem definição ",) + HEADERS[dataset][1:]
+        header = "".join(f'<th class="tb_base tb_dados">{escape(label)}</th>' for label in labels)
+    else:
+        header = "".join(f"<th>{escape(label)}</th>" for label in HEADERS[dataset])
+    total = "" if dataset == "producao" else f'<tfoot class="tb_total"><tr><td>Total</td><td colspan="{len(HEADERS[dataset]) - 1}">-</td></tr></tfoot>'
+    return f"""<table class="tb_base tb_dados">
+<thead><tr>{header}</tr></thead>
+<tbody>
+{render_rows(dataset, rows)}
+</tbody>
+{total}
+</table>"""
+
+
+def render_page(dataset: str, year: int, option: Optional[int], rows: Optional[list], sem_definicao: bool = False) -> str:
+    """
+    Monta o HTML da página (dataset, ano, opção) com as linhas informadas.
+
+    Parâmetros:
+        dataset (str): Nome do dataset.
+        year (int): Ano da página.
+        option (int): Sub-opção da página, ou None.
+        rows (list): Linhas retornadas por fetch_slice, ou None para uma página sem tabela.
+        sem_definicao (bool): Usa o layout "Sem definição" de processamento.
+
+    Retorna:
+        str: HTML da página.
+    """
+    opcao = DATASETS[dataset].opcao
+    tabs = "\n".join(
+        f'<button type="submit" value="{value}" name="opcao" class="btn_opt">{label}</button>'
+        for value, label in TABS
+    )
+    options = "\n".join(
+        f'<button type="submit" value="subopt_0{number}" name="subopcao" class="btn_sopt">{name.capitalize()}</button>'
+        for number, name in OPTION_PRODUCTS.get(dataset, {}).items()
+    )
+    years = "".join(f'<option value="{y}">{y}</option>' for y in range(1970, 2024))
+
+    return f"""<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>Banco de dados de uva, vinho e derivados</title>
+<link rel="stylesheet" href="css/estilos.css">
+<script src="js/jquery.js"></script>
+</head>
+<body>
+<table class="tb_base tb_header no_print">
+<tr><td><img src="img/logo_embrapa.png" alt="Embrapa"></td><td class="col_center"><h1>Banco de dados de uva, vinho e derivados</h1></td></tr>
+</table>
+<form method="post" action="index.php">
+<table class="tb_base tb_menu no_print"><tr><td>
+{tabs}
+</td></tr></table>
+<table class="tb_base tb_content">
+<tr><td class="col_left no_print">
+<input type="hidden" name="opcao" value="{opcao}">
+{options}
+</td>
+<td class="col_right">
+<div class="content_center">
+<p class="text_center">{TITLES[dataset]} [{year}]</p>
+<label class="lbl_pesq">Ano: [1970-2023]</label>
+<select name="ano" class="text_pesq">{years}</select>
+<button type="submit" class="btn_pesq">OK</button>
+{render_table(dataset, rows, sem_definicao)}
+<p class="text_center">Fonte: Embrapa Uva e Vinho</p>
+</div>
+</td></tr>
+</table>
+</form>
+<div class="footer no_print"><p>Embrapa Uva e Vinho - Rua Livramento, 515 - Bento Gonçalves, RS</p></div>
+</body>
+</html>
+"""
+
+
+def sample_pages(db_path: str = "vitibrasil.db", years: range = range(2015, 2024)) -> list:
+    """
+    Gera as páginas de todos os datasets e sub-opções para os anos informados.
+
+    Retorna:
+        list: Tuplas (dataset, ano, opção, html), apenas das páginas com dados no banco.
+    """
+    pages = []
+    migrate(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        for name, dataset in DATASETS.items():
+            for year in years:
+                for option in dataset.options:
+                    rows = fetch_slice(conn, name, year, option)
+                    if rows:
+                        pages.append((name, year, option, render_page(name, year, option, rows)))
+    finally:
+        conn.close()
+    return pages
@@ -2,12 +2,32 @@ import logging
 import nest_asyncio
 import uvicorn
 from app.core import init_db
+from app.core.db import close_pools
 from app.routers import vitibrasil
+from app.services import memory_engine
+from app.services.cache_stats import start_stats_logger, stop_stats_logger
+from app.services.http_client import close_clients
+from app.services.refresher import start_refresher, stop_refresher
+from app.util.auth import close_password_pool
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import gunicorn
 
 nest_asyncio.apply()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    memory_engine.reload()
+    start_refresher()
+    start_stats_logger()
+    yield
+    await stop_stats_logger()
+    await stop_refresher()
+    await close_clients()
+    close_pools()
+    close_password_pool()
+
 app = FastAPI(
     title="Vitivinicultura API",
     description="TechChallenge Fase 1 - Machine Learning Engineering na FIAP. API desenvolvido para fornecer informações sobre da Vitivinicultura do site Vitibrasil.",
@@ -15,7 +35,8 @@ app = FastAPI(
         "name": "Pedro Costa e Marina Oliveira",
         "url": "https://github.com/pecosta23/TechChallengeFase1"
     },
-    version ="1.0.0"
+    version ="1.0.0",
+    lifespan=lifespan
 )
 
 